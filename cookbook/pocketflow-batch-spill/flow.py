@@ -0,0 +1,10 @@
+from pocketflow import Flow
+from nodes import ScoreReviews, SpillScoreReviews
+
+def create_in_memory_flow():
+    """Collects every result in a Python list before post."""
+    return Flow(start=ScoreReviews())
+
+def create_spill_flow(segment_size=10_000, spill_dir=None):
+    """Streams results to on-disk segments and hands post a lazy view."""
+    return Flow(start=SpillScoreReviews(segment_size=segment_size, spill_dir=spill_dir))
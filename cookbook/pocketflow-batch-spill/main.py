@@ -0,0 +1,37 @@
+import sys
+import time
+import tracemalloc
+
+from flow import create_in_memory_flow, create_spill_flow
+
+def measure(create_flow, num_records):
+    """Times one run, then repeats it under tracemalloc to get peak memory."""
+    shared = {"num_records": num_records}
+    start = time.perf_counter()
+    create_flow().run(shared)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    create_flow().run({"num_records": num_records})
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return shared["average_score"], peak / 2**20, elapsed
+
+def main():
+    num_records = 200_000
+    for arg in sys.argv[1:]:
+        if arg.startswith("--records="):
+            num_records = int(arg.split("=", 1)[1])
+
+    print(f"Scoring {num_records:,} reviews\n")
+
+    avg, peak, elapsed = measure(create_in_memory_flow, num_records)
+    print("=== BatchNode (results in a list) ===")
+    print(f"Average score: {avg:.3f}, peak memory: {peak:.1f} MB, took {elapsed:.2f}s\n")
+
+    avg, peak, elapsed = measure(create_spill_flow, num_records)
+    print("=== SpillBatchNode (results on disk) ===")
+    print(f"Average score: {avg:.3f}, peak memory: {peak:.1f} MB, took {elapsed:.2f}s")
+
+if __name__ == "__main__":
+    main()
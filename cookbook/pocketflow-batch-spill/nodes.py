@@ -0,0 +1,44 @@
+from pocketflow import BatchNode
+from sink import SpillBatchNode
+
+def generate_records(n):
+    """Yields synthetic review records one at a time."""
+    for i in range(n):
+        yield {"id": i, "text": f"Review #{i}: " + "great product " * (i % 7 + 1)}
+
+def score_record(record):
+    """Stands in for an LLM call that returns a sizeable result per item."""
+    words = record["text"].split()
+    return {"id": record["id"], "score": len(words) % 5 + 1, "tokens": words}
+
+class ScoreReviews(BatchNode):
+    """Plain BatchNode: every result is kept in a list until post."""
+
+    def prep(self, shared):
+        return generate_records(shared["num_records"])
+
+    def exec(self, record):
+        return score_record(record)
+
+    def post(self, shared, prep_res, exec_res_list):
+        shared["average_score"] = sum(r["score"] for r in exec_res_list) / len(exec_res_list)
+        return "default"
+
+class SpillScoreReviews(SpillBatchNode):
+    """Same node, but results are spilled to disk segment by segment."""
+
+    def prep(self, shared):
+        return generate_records(shared["num_records"])
+
+    def exec(self, record):
+        return score_record(record)
+
+    def post(self, shared, prep_res, exec_res_list):
+        # exec_res_list is a SpillView: iterating it decodes one record at a time
+        total = 0
+        for r in exec_res_list:
+            total += r["score"]
+        shared["average_score"] = total / len(exec_res_list)
+        shared["last_review"] = exec_res_list[-1]["id"]
+        exec_res_list.cleanup()
+        return "default"
@@ -0,0 +1,164 @@
+import json
+import mmap
+import os
+import shutil
+import sys
+import tempfile
+from array import array
+from bisect import bisect_right
+from contextlib import contextmanager
+
+from pocketflow import BatchNode, AsyncBatchNode
+
+OFFSETS_SUFFIX = ".offsets"   # a segment's record offsets, native uint64
+
+@contextmanager
+def _mapped(path):
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        yield mm
+
+class JsonCodec:
+    """Compact JSON. Works for anything json can encode."""
+    name = "json"
+    def dumps(self, obj): return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+    def loads(self, data): return json.loads(data)
+
+class MsgpackCodec:
+    """Smaller and faster than JSON; needs `pip install msgpack`."""
+    name = "msgpack"
+    def __init__(self):
+        import msgpack
+        self._msgpack = msgpack
+    def dumps(self, obj): return self._msgpack.packb(obj, use_bin_type=True)
+    def loads(self, data): return self._msgpack.unpackb(data, raw=False)
+
+class SpillSink:
+    """
+    Append-only on-disk store for batch results.
+
+    Results are written to numbered segment files of at most `segment_size`
+    records each. Every record is stored as a length prefix followed by the
+    encoded bytes, so binary codecs work too. Each record's 8-byte offset
+    goes to the segment's offset table, which is written next to the
+    segment when it is full, so only the open segment's file handle and
+    offsets stay in memory.
+    """
+
+    def __init__(self, directory=None, segment_size=10_000, codec=None):
+        self.directory = directory or tempfile.mkdtemp(prefix="pocketflow-spill-")
+        os.makedirs(self.directory, exist_ok=True)
+        self.segment_size = segment_size
+        self.codec = codec or JsonCodec()
+        self._segments = []   # list of (path, record count) for finished segments
+        self._file = None
+        self._offsets = array("Q")
+
+    def append(self, result):
+        if self._file is None or len(self._offsets) >= self.segment_size:
+            self._roll()
+        data = self.codec.dumps(result)
+        self._offsets.append(self._file.tell())
+        self._file.write(len(data).to_bytes(4, "little"))
+        self._file.write(data)
+
+    def close(self):
+        """Flush the open segment and return a lazy view over every result."""
+        self._finish()
+        return SpillView(self._segments, self.codec, self.directory)
+
+    def _roll(self):
+        self._finish()
+        self._path = os.path.join(self.directory, f"segment-{len(self._segments):06d}.{self.codec.name}")
+        self._file = open(self._path, "wb")
+
+    def _finish(self):
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        with open(self._path + OFFSETS_SUFFIX, "wb") as f:
+            self._offsets.tofile(f)
+        self._segments.append((self._path, len(self._offsets)))
+        self._offsets = array("Q")
+
+class SpillView:
+    """
+    Read-only, lazily decoded sequence over spilled results.
+
+    Iteration memory-maps one segment and its offset table at a time, and
+    indexing maps only the segment that holds the record, so reading back
+    costs one segment of address space rather than the whole result set.
+    """
+
+    def __init__(self, segments, codec, directory):
+        self._segments = segments
+        self._codec = codec
+        self.directory = directory
+        self._starts = []
+        total = 0
+        for _, count in segments:
+            self._starts.append(total)
+            total += count
+        self._len = total
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        for path, count in self._segments:
+            if not count:
+                continue
+            with _mapped(path + OFFSETS_SUFFIX) as table, _mapped(path) as mm, memoryview(table).cast("Q") as offsets:
+                for off in offsets:
+                    yield self._read(mm, off)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._len))]
+        if i < 0:
+            i += self._len
+        if not 0 <= i < self._len:
+            raise IndexError("SpillView index out of range")
+        seg = bisect_right(self._starts, i) - 1
+        path, _ = self._segments[seg]
+        k = i - self._starts[seg]
+        with _mapped(path + OFFSETS_SUFFIX) as table, _mapped(path) as mm:
+            return self._read(mm, int.from_bytes(table[8 * k:8 * k + 8], sys.byteorder))
+
+    def cleanup(self):
+        """Delete the segment files."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _read(self, mm, off):
+        size = int.from_bytes(mm[off:off + 4], "little")
+        return self._codec.loads(mm[off + 4:off + 4 + size])
+
+class SpillBatchNode(BatchNode):
+    """
+    BatchNode that streams each exec result to a SpillSink instead of a list.
+    `post` receives a SpillView. Return a generator from `prep` to keep the
+    inputs lazy as well.
+    """
+
+    def __init__(self, max_retries=1, wait=0, spill_dir=None, segment_size=10_000, codec=None):
+        super().__init__(max_retries=max_retries, wait=wait)
+        self.spill_dir, self.segment_size, self.codec = spill_dir, segment_size, codec
+
+    def _exec(self, items):
+        sink = SpillSink(self.spill_dir, self.segment_size, self.codec)
+        for item in (items or []):
+            sink.append(super(BatchNode, self)._exec(item))
+        return sink.close()
+
+class AsyncSpillBatchNode(AsyncBatchNode):
+    """Async version of SpillBatchNode; items still run one at a time."""
+
+    def __init__(self, max_retries=1, wait=0, spill_dir=None, segment_size=10_000, codec=None):
+        super().__init__(max_retries=max_retries, wait=wait)
+        self.spill_dir, self.segment_size, self.codec = spill_dir, segment_size, codec
+
+    async def _exec(self, items):
+        sink = SpillSink(self.spill_dir, self.segment_size, self.codec)
+        for item in (items or []):
+            sink.append(await super(AsyncBatchNode, self)._exec(item))
+        return sink.close()
@@ -0,0 +1,70 @@
+"""
+Compare the NumPy index, with float32, float16 and int8 storage, with faiss.IndexFlatL2.
+
+    python benchmark_index.py
+    python benchmark_index.py --sizes=1k,10k,100k --dim=1536 --queries=200
+
+For each size it reports the memory used by the vectors, the time to add
+them one at a time (how the chat memory grows), single-query latency,
+batched QPS, and how many neighbours match the FAISS index.
+"""
+import argparse
+import time
+
+import numpy as np
+import faiss
+
+from utils.vector_index import NumpyIndex
+
+def parse_size(s):
+    s = s.strip().lower()
+    for suffix, mult in (("m", 1_000_000), ("k", 1_000)):
+        if s.endswith(suffix):
+            return int(float(s[:-1]) * mult)
+    return int(s)
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def add_one_by_one(index, vectors):
+    for v in vectors:
+        index.add(v.reshape(1, -1))
+
+def single_queries(index, queries, k):
+    for q in queries:
+        index.search(q.reshape(1, -1), k)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1k,10k,100k")
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1234)
+    print(f"dim={args.dim}, k={args.k}, {args.queries} queries, faiss using {faiss.omp_get_max_threads()} thread(s)")
+    print(f"{'vectors':>9} {'index':<13} {'MB':>6} {'add 1-by-1 s':>12} {'1 query ms':>11} {'batch QPS':>11} {'same':>6}")
+    for n in map(parse_size, args.sizes.split(",")):
+        vectors = rng.standard_normal((n, args.dim), dtype=np.float32)
+        queries = rng.standard_normal((args.queries, args.dim), dtype=np.float32)
+
+        expected = None
+        indexes = [("faiss", faiss.IndexFlatL2(args.dim))]
+        indexes += [(f"numpy {dtype}", NumpyIndex(args.dim, dtype=dtype)) for dtype in ("float32", "float16", "int8")]
+        for name, index in indexes:
+            _, add_s = timed(lambda: add_one_by_one(index, vectors))
+            _, single_s = timed(lambda: single_queries(index, queries, args.k))
+            (distances, indices), batch_s = timed(lambda: index.search(queries, args.k))
+            if expected is None:
+                expected = indices
+            nbytes = index.nbytes if isinstance(index, NumpyIndex) else index.ntotal * index.code_size
+            print(f"{n:>9,} {name:<13} {nbytes / 2**20:>6,.1f} {add_s:>12.2f} {1000 * single_s / len(queries):>11.3f} "
+                  f"{len(queries) / batch_s:>11,.0f} {(indices == expected).mean():>6.1%}")
+        indexes.clear()
+        print()
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,193 @@
 import numpy as np
-import faiss
 
-def create_index(dimension=1536):
-    return faiss.IndexFlatL2(dimension)
+try:
+    import faiss
+except ImportError:  # fall back to the NumPy index
+    faiss = None
+
+class NumpyIndex:
+    """Exact vector index in plain NumPy, for hosts that can't install FAISS
+
+    It has the parts of the FAISS index interface that the functions below
+    use (`ntotal`, `add`, `search`, `reset`), so either can back them.
+
+    Vectors live in one matrix that doubles its capacity when full, so
+    adding them one at a time costs amortised O(1) copies. Squared norms
+    are kept beside it, and a search is one matrix multiply per block of
+    queries followed by an `argpartition` top-k.
+
+    The matrix can hold float16 or int8 codes instead of float32, for 2x
+    or 4x less memory. int8 codes are scaled per vector (the largest
+    component maps to 127), so they need no training and vectors can still
+    be added one at a time. Distances are computed to the decoded vectors.
+
+    Args:
+        dimension: Size of the vectors
+        metric: "l2" returns squared L2 distances, like faiss.IndexFlatL2.
+            "cosine" normalises vectors when they are added and returns
+            1 - cosine similarity, so smaller is still closer.
+        capacity: Rows to allocate up front
+        dtype: "float32", "float16" or "int8" storage
+    """
+
+    # Largest (queries x vectors) score block computed at once, in elements
+    block_elements = 1 << 24
+
+    def __init__(self, dimension, metric="l2", capacity=1024, dtype="float32"):
+        if metric not in ("l2", "cosine"):
+            raise ValueError(f"Unknown metric: {metric}")
+        if dtype not in ("float32", "float16", "int8"):
+            raise ValueError(f"Unknown dtype: {dtype}")
+        self.d = dimension
+        self.metric = metric
+        self.dtype = np.dtype(dtype)
+        self.ntotal = 0
+        self._data = np.empty((max(capacity, 1), dimension), dtype=self.dtype)
+        self._sqnorms = np.empty(max(capacity, 1), dtype=np.float32)
+        self._scales = np.empty(max(capacity, 1), dtype=np.float32) if dtype == "int8" else None
+
+    @property
+    def vectors(self):
+        """The stored vectors (normalised for cosine), read-only; decoded to float32 for float16 and int8"""
+        if self.dtype != np.float32:
+            return self._decode(0, self.ntotal)
+        view = self._data[:self.ntotal]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def nbytes(self):
+        """Memory used by the stored vectors"""
+        per_row = self._data.itemsize * self.d + 4 + (4 if self._scales is not None else 0)
+        return self.ntotal * per_row
+
+    def _decode(self, start, end):
+        block = self._data[start:end].astype(np.float32)
+        if self._scales is not None:
+            block *= self._scales[start:end, None]
+        return block
+
+    def _as_matrix(self, x):
+        x = np.ascontiguousarray(x, dtype=np.float32).reshape(-1, self.d)
+        if self.metric == "cosine":
+            norms = np.linalg.norm(x, axis=1, keepdims=True)
+            x = x / np.maximum(norms, np.finfo(np.float32).tiny)
+        return x
+
+    def _reserve(self, n):
+        if n <= len(self._data):
+            return
+        capacity = max(n, 2 * len(self._data))
+        data = np.empty((capacity, self.d), dtype=self.dtype)
+        data[:self.ntotal] = self._data[:self.ntotal]
+        sqnorms = np.empty(capacity, dtype=np.float32)
+        sqnorms[:self.ntotal] = self._sqnorms[:self.ntotal]
+        self._data, self._sqnorms = data, sqnorms
+        if self._scales is not None:
+            scales = np.empty(capacity, dtype=np.float32)
+            scales[:self.ntotal] = self._scales[:self.ntotal]
+            self._scales = scales
+
+    def add(self, x):
+        """Append one vector or a (n, d) batch"""
+        x = self._as_matrix(x)
+        start, end = self.ntotal, self.ntotal + len(x)
+        self._reserve(end)
+        if self._scales is not None:
+            scales = np.abs(x).max(axis=1) / 127
+            scales[scales == 0] = 1
+            self._scales[start:end] = scales
+            self._data[start:end] = np.rint(x / scales[:, None])
+        else:
+            self._data[start:end] = x
+        decoded = self._decode(start, end)
+        self._sqnorms[start:end] = np.einsum("ij,ij->i", decoded, decoded)
+        self.ntotal = end
+
+    def reset(self):
+        self.ntotal = 0
+
+    def search(self, x, k):
+        """Return (distances, indices), each shaped (n_queries, k), closest first"""
+        queries = self._as_matrix(x)
+        nq, n = len(queries), self.ntotal
+        distances = np.full((nq, k), np.inf, dtype=np.float32)
+        indices = np.full((nq, k), -1, dtype=np.int64)
+        kk = min(k, n)
+        if kk == 0:
+            return distances, indices
+
+        sqnorms = self._sqnorms[:n]
+        # float16 and int8 codes are decoded a block of rows at a time, so
+        # the matmul runs in float32 BLAS without a full float32 copy
+        data = self._data[:n] if self.dtype == np.float32 else None
+        rows = max(1, self.block_elements // self.d)
+        step = max(1, self.block_elements // n)
+        for start in range(0, nq, step):
+            q = queries[start:start + step]
+            # Both metrics rank by the largest inner product (minus half the
+            # stored norm for L2), so one matmul scores the whole block
+            if data is not None:
+                scores = q @ data.T
+            else:
+                scores = np.empty((len(q), n), dtype=np.float32)
+                for row in range(0, n, rows):
+                    scores[:, row:row + rows] = q @ self._decode(row, min(row + rows, n)).T
+            if self.metric == "l2":
+                scores -= 0.5 * sqnorms
+            if kk < n:
+                top = np.argpartition(-scores, kk - 1, axis=1)[:, :kk]
+            else:
+                top = np.broadcast_to(np.arange(n), (len(q), n))
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            order = np.argsort(-top_scores, axis=1, kind="stable")
+            top = np.take_along_axis(top, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+            if self.metric == "l2":
+                qnorms = np.einsum("ij,ij->i", q, q)[:, None]
+                dist = np.maximum(qnorms - 2 * top_scores, 0)
+            else:
+                dist = 1 - top_scores
+            distances[start:start + len(q), :kk] = dist
+            indices[start:start + len(q), :kk] = top
+        return distances, indices
+
+def create_index(dimension=1536, kind="flat", storage="float32"):
+    """Create an empty L2 index that vectors can be added to one at a time
+    
+    Args:
+        dimension: Size of the vectors
+        kind: "flat" (exact, O(N) per search), "hnsw" (approximate, fast
+            for large memories) or "numpy" (exact, no FAISS needed). "flat"
+            uses the NumPy index when FAISS isn't installed. IVF indexes are
+            left out because they must be trained on a sample of vectors
+            before the first add.
+        storage: "float32", "float16" (half the memory) or "int8" (a
+            quarter, NumPy index only: FAISS's int8 quantizer must be
+            trained before the first add, like IVF). Product quantization
+            is left out for the same reason.
+    """
+    if storage not in ("float32", "float16", "int8"):
+        raise ValueError(f"Unknown storage: {storage}")
+    if kind == "numpy" or (kind == "flat" and (faiss is None or storage == "int8")):
+        return NumpyIndex(dimension, dtype=storage)
+    if faiss is None:
+        raise ImportError(f"faiss is required for kind={kind!r}; install faiss-cpu or use kind='numpy'")
+    if storage == "int8":
+        raise ValueError("int8 storage needs kind='flat' or kind='numpy'")
+    if kind == "flat":
+        if storage == "float16":
+            return faiss.IndexScalarQuantizer(dimension, faiss.ScalarQuantizer.QT_fp16)
+        return faiss.IndexFlatL2(dimension)
+    if kind == "hnsw":
+        if storage == "float16":
+            index = faiss.IndexHNSWSQ(dimension, faiss.ScalarQuantizer.QT_fp16, 32)
+        else:
+            index = faiss.IndexHNSWFlat(dimension, 32)
+        index.hnsw.efSearch = 64
+        return index
+    raise ValueError(f"Unknown index kind: {kind}")
 
 def add_vector(index, vector):
     # Make sure the vector is a numpy array with the right shape for FAISS
@@ -18,7 +203,7 @@ def search_vectors(index, query_vector, k=1):
     """Search for the k most similar vectors to the query vector
     
     Args:
-        index: The FAISS index
+        index: The FAISS or NumPy index
         query_vector: The query vector (numpy array or list)
         k: Number of results to return (default: 1)
         
@@ -0,0 +1,163 @@
+import asyncio
+import contextvars
+from collections import deque
+from contextlib import asynccontextmanager
+
+from pocketflow import AsyncNode, AsyncParallelBatchNode, AsyncParallelBatchFlow
+
+# The budget and the branch path of the code that is currently running.
+# asyncio.gather wraps every coroutine in a Task, and every Task copies the
+# context when it is created, so nested parallel constructs inherit both.
+_budget = contextvars.ContextVar("pocketflow_budget", default=None)
+_branch = contextvars.ContextVar("pocketflow_branch", default=())
+
+class ConcurrencyBudget:
+    """
+    A global cap on in-flight exec_async calls, shared by every nested
+    parallel construct that runs under it.
+
+    Waiters are queued per branch (the path of outer batch items that led to
+    the call) and freed slots are handed out round-robin across branches, so
+    an outer branch with many inner items cannot starve its siblings. The
+    budget is work-conserving: a slot never stays idle while anyone waits.
+    """
+
+    def __init__(self, limit):
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        self.limit = limit
+        self.in_flight = 0
+        self.peak = 0
+        self._waiters = {}        # branch -> deque of futures
+        self._turns = deque()     # branches with waiters, in round-robin order
+
+    async def acquire(self, branch=()):
+        if self.in_flight < self.limit and not self._turns:
+            self._take()
+            return
+        fut = asyncio.get_running_loop().create_future()
+        if branch not in self._waiters:
+            self._waiters[branch] = deque()
+            self._turns.append(branch)
+        self._waiters[branch].append(fut)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # The slot was handed over just before we were cancelled
+                self.release()
+            else:
+                self._forget(branch, fut)
+            raise
+
+    def release(self):
+        self.in_flight -= 1
+        while self._turns:
+            branch = self._turns.popleft()
+            queue = self._waiters[branch]
+            fut = queue.popleft()
+            if queue:
+                self._turns.append(branch)
+            else:
+                del self._waiters[branch]
+            if not fut.done():
+                self._take()
+                fut.set_result(None)
+                return
+
+    @asynccontextmanager
+    async def slot(self):
+        await self.acquire(_branch.get())
+        try:
+            yield
+        finally:
+            self.release()
+
+    def _take(self):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+
+    def _forget(self, branch, fut):
+        queue = self._waiters.get(branch)
+        if queue is None or fut not in queue:
+            return
+        queue.remove(fut)
+        if not queue:
+            del self._waiters[branch]
+            self._turns.remove(branch)
+
+def current_budget():
+    """Return the budget inherited from the enclosing flow, if any."""
+    return _budget.get()
+
+class BudgetedAsyncNode(AsyncNode):
+    """
+    AsyncNode whose every exec_async attempt holds one slot of the inherited
+    budget. The slot is released during the retry wait so other work can run.
+
+    `max_concurrency` opens a new budget when the node runs outside of one.
+    """
+
+    def __init__(self, max_retries=1, wait=0, max_concurrency=None):
+        super().__init__(max_retries=max_retries, wait=wait)
+        self.max_concurrency = max_concurrency
+
+    async def _exec_one(self, prep_res):
+        budget = _budget.get()
+        for i in range(self.max_retries):
+            try:
+                if budget is None:
+                    return await self.exec_async(prep_res)
+                async with budget.slot():
+                    return await self.exec_async(prep_res)
+            except Exception as e:
+                if i == self.max_retries - 1:
+                    return await self.exec_fallback_async(prep_res, e)
+                if self.wait > 0:
+                    await asyncio.sleep(self.wait)
+
+    async def _exec(self, prep_res):
+        return await self._exec_one(prep_res)
+
+    async def _run_async(self, shared):
+        if _budget.get() is not None or self.max_concurrency is None:
+            return await super()._run_async(shared)
+        token = _budget.set(ConcurrencyBudget(self.max_concurrency))
+        try:
+            return await super()._run_async(shared)
+        finally:
+            _budget.reset(token)
+
+class BudgetedParallelBatchNode(BudgetedAsyncNode, AsyncParallelBatchNode):
+    """AsyncParallelBatchNode that gathers all items but only runs as many
+    exec_async calls as the inherited budget allows."""
+
+    async def _exec(self, items):
+        return await asyncio.gather(*(self._exec_one(i) for i in items))
+
+class BudgetedParallelBatchFlow(AsyncParallelBatchFlow):
+    """
+    AsyncParallelBatchFlow that runs each batch item in its own branch of the
+    inherited budget. Pass `max_concurrency` on the outermost flow to set the
+    cap for every nested parallel node and flow.
+    """
+
+    def __init__(self, start=None, max_concurrency=None):
+        super().__init__(start=start)
+        self.max_concurrency = max_concurrency
+
+    async def _orch_branch(self, shared, params, key):
+        _branch.set(_branch.get() + (key,))
+        return await self._orch_async(shared, params)
+
+    async def _run_async(self, shared):
+        token = None
+        if _budget.get() is None and self.max_concurrency is not None:
+            token = _budget.set(ConcurrencyBudget(self.max_concurrency))
+        try:
+            pr = await self.prep_async(shared) or []
+            await asyncio.gather(*(self._orch_branch(shared, {**self.params, **bp}, i) for i, bp in enumerate(pr)))
+            return await self.post_async(shared, pr, None)
+        finally:
+            if token is not None:
+                _budget.reset(token)
@@ -0,0 +1,24 @@
+from pocketflow import AsyncFlow, AsyncParallelBatchFlow
+from budget import BudgetedParallelBatchFlow
+from nodes import SummarizeChunks, BudgetedSummarizeChunks
+
+class SummarizeDocs(AsyncParallelBatchFlow):
+    """Runs the per-document sub-flow for every document in parallel."""
+
+    async def prep_async(self, shared):
+        return [{"doc": doc} for doc in shared["docs"]]
+
+class BudgetedSummarizeDocs(BudgetedParallelBatchFlow):
+    """Same outer flow; every document becomes one branch of the budget."""
+
+    async def prep_async(self, shared):
+        return [{"doc": doc} for doc in shared["docs"]]
+
+def create_unbounded_flow():
+    """N documents x M chunks all gather at once."""
+    return SummarizeDocs(start=AsyncFlow(start=SummarizeChunks()))
+
+def create_budgeted_flow(max_concurrency=64):
+    """The same graph, capped at `max_concurrency` in-flight calls at every depth."""
+    inner = AsyncFlow(start=BudgetedSummarizeChunks())
+    return BudgetedSummarizeDocs(start=inner, max_concurrency=max_concurrency)
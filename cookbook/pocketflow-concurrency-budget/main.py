@@ -0,0 +1,36 @@
+import asyncio
+import sys
+import time
+
+from flow import create_unbounded_flow, create_budgeted_flow
+from utils import counter
+
+async def run(flow, docs, chunks_per_doc):
+    shared = {"docs": docs, "chunks_per_doc": chunks_per_doc, "summaries": {}}
+    counter.peak = 0
+    start = time.perf_counter()
+    await flow.run_async(shared)
+    elapsed = time.perf_counter() - start
+    total = sum(len(s) for s in shared["summaries"].values())
+    return total, counter.peak, elapsed
+
+async def main():
+    max_concurrency = 64
+    for arg in sys.argv[1:]:
+        if arg.startswith("--limit="):
+            max_concurrency = int(arg.split("=", 1)[1])
+
+    docs = [f"doc_{i}" for i in range(20)]
+    chunks_per_doc = 30
+    print(f"Summarizing {len(docs)} documents x {chunks_per_doc} chunks\n")
+
+    total, peak, elapsed = await run(create_unbounded_flow(), docs, chunks_per_doc)
+    print("=== AsyncParallelBatchFlow + AsyncParallelBatchNode ===")
+    print(f"Summaries: {total}, peak in-flight calls: {peak}, took {elapsed:.2f}s\n")
+
+    total, peak, elapsed = await run(create_budgeted_flow(max_concurrency), docs, chunks_per_doc)
+    print(f"=== Budgeted flow (max_concurrency={max_concurrency}) ===")
+    print(f"Summaries: {total}, peak in-flight calls: {peak}, took {elapsed:.2f}s")
+
+if __name__ == "__main__":
+    asyncio.run(main())
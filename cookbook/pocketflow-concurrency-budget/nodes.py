@@ -0,0 +1,31 @@
+from pocketflow import AsyncParallelBatchNode
+from budget import BudgetedParallelBatchNode
+from utils import call_llm_async
+
+class SummarizeChunks(AsyncParallelBatchNode):
+    """Summarizes every chunk of one document in parallel (no budget)."""
+
+    async def prep_async(self, shared):
+        doc = self.params["doc"]
+        return [f"{doc} / chunk {i}" for i in range(shared["chunks_per_doc"])]
+
+    async def exec_async(self, chunk):
+        return await call_llm_async(chunk)
+
+    async def post_async(self, shared, prep_res, exec_res_list):
+        shared["summaries"][self.params["doc"]] = exec_res_list
+        return "default"
+
+class BudgetedSummarizeChunks(BudgetedParallelBatchNode):
+    """Same node, but each exec_async call holds a slot of the inherited budget."""
+
+    async def prep_async(self, shared):
+        doc = self.params["doc"]
+        return [f"{doc} / chunk {i}" for i in range(shared["chunks_per_doc"])]
+
+    async def exec_async(self, chunk):
+        return await call_llm_async(chunk)
+
+    async def post_async(self, shared, prep_res, exec_res_list):
+        shared["summaries"][self.params["doc"]] = exec_res_list
+        return "default"
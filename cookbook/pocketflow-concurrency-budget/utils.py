@@ -0,0 +1,31 @@
+import asyncio
+import random
+
+class InFlightCounter:
+    """Tracks how many simulated LLM calls are running at the same time."""
+
+    def __init__(self):
+        self.current = 0
+        self.peak = 0
+
+    def enter(self):
+        self.current += 1
+        self.peak = max(self.peak, self.current)
+
+    def exit(self):
+        self.current -= 1
+
+counter = InFlightCounter()
+
+async def call_llm_async(prompt):
+    """Simulates an async LLM call that takes 50-150 ms."""
+    counter.enter()
+    try:
+        await asyncio.sleep(random.uniform(0.05, 0.15))
+        return f"Summary({len(prompt)} chars)"
+    finally:
+        counter.exit()
+
+if __name__ == "__main__":
+    print(asyncio.run(call_llm_async("Hello world")))
+    print(f"Peak in-flight calls: {counter.peak}")
@@ -0,0 +1,38 @@
+import asyncio
+import copy
+
+from pocketflow import AsyncFlow, AsyncParallelBatchFlow
+
+from nodes import SummarizeDocument
+from scoped import ScopedParallelBatchFlow, add_deltas, append_items
+
+class DocumentBatch:
+    async def prep_async(self, shared):
+        return [{"doc_id": doc_id} for doc_id in shared["corpus"]]
+
+class SharedDictFlow(DocumentBatch, AsyncParallelBatchFlow):
+    """Every branch mutates the same dict."""
+
+class DeepCopyFlow(DocumentBatch, AsyncParallelBatchFlow):
+    """The usual workaround: deep-copy the state per branch and merge by hand."""
+
+    async def _run_async(self, shared):
+        pr = await self.prep_async(shared) or []
+        copies = [copy.deepcopy(shared) for _ in pr]
+        await asyncio.gather(*(self._orch_async(c, {**self.params, **bp}) for c, bp in zip(copies, pr)))
+        tokens, done = shared["stats"]["tokens"], len(shared["processed"])
+        for c in copies:
+            shared["summaries"].update(c["summaries"])
+            shared["stats"]["tokens"] += c["stats"]["tokens"] - tokens
+            shared["stats"]["calls"] += 1
+            shared["processed"] += c["processed"][done:]
+        return await self.post_async(shared, pr, None)
+
+class ScopedFlow(DocumentBatch, ScopedParallelBatchFlow):
+    """Copy-on-write views, merged at the join."""
+
+def create_flow(kind):
+    start = AsyncFlow(start=SummarizeDocument())
+    if kind == "scoped":
+        return ScopedFlow(start=start, merge={"tokens": add_deltas, "calls": add_deltas, "processed": append_items})
+    return {"shared": SharedDictFlow, "deepcopy": DeepCopyFlow}[kind](start=start)
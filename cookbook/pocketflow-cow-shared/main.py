@@ -0,0 +1,41 @@
+import asyncio
+import sys
+import time
+
+from flow import create_flow
+
+def make_shared(num_docs, index_size):
+    corpus = {f"doc-{i}": f"Document {i} " + "lorem ipsum dolor sit amet " * (i % 20 + 1) for i in range(num_docs)}
+    return {
+        "corpus": corpus,
+        "index": {f"term-{i}": [i, i + 1, i + 2] for i in range(index_size)},  # large state no branch writes
+        "summaries": {},
+        "stats": {"tokens": 0, "calls": 0},
+        "processed": [],
+    }
+
+async def run(kind, num_docs, index_size):
+    shared = make_shared(num_docs, index_size)
+    expected = sum(len(f"Summarize: {t}".split()) for t in shared["corpus"].values())
+    start = time.perf_counter()
+    await create_flow(kind).run_async(shared)
+    elapsed = time.perf_counter() - start
+    stats = shared["stats"]
+    ok = stats["tokens"] == expected and len(shared["summaries"]) == len(shared["processed"]) == num_docs
+    print(f"=== {kind} ===")
+    print(f"tokens: {stats['tokens']:,} (expected {expected:,}), calls: {stats['calls']}, summaries: {len(shared['summaries'])}")
+    print(f"{'correct' if ok else 'WRONG'}, took {elapsed:.2f}s\n")
+
+def main():
+    num_docs, index_size = 500, 5_000
+    for arg in sys.argv[1:]:
+        if arg.startswith("--docs="):
+            num_docs = int(arg.split("=", 1)[1])
+        elif arg.startswith("--index="):
+            index_size = int(arg.split("=", 1)[1])
+    print(f"{num_docs} concurrent branches over a shared store with a {index_size:,}-entry index\n")
+    for kind in ("shared", "deepcopy", "scoped"):
+        asyncio.run(run(kind, num_docs, index_size))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+from pocketflow import AsyncNode
+
+from utils import call_llm, append_audit_log
+
+class SummarizeDocument(AsyncNode):
+    async def prep_async(self, shared):
+        return self.params["doc_id"], shared["corpus"][self.params["doc_id"]]
+
+    async def exec_async(self, prep_res):
+        _, text = prep_res
+        return await call_llm(f"Summarize: {text}")
+
+    async def post_async(self, shared, prep_res, exec_res):
+        doc_id, _ = prep_res
+        summary, tokens = exec_res
+        shared["summaries"][doc_id] = summary
+        # Read-modify-write across an await: a lost update when branches share one dict
+        stats = shared["stats"]
+        total = stats["tokens"]
+        await append_audit_log(doc_id)
+        stats["tokens"] = total + tokens
+        stats["calls"] += 1
+        shared["processed"].append(doc_id)
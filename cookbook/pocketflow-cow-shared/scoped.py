@@ -0,0 +1,254 @@
+import asyncio
+from collections.abc import MutableMapping, MutableSequence, MutableSet
+
+from pocketflow import AsyncParallelBatchFlow
+
+class _Sentinel:
+    def __init__(self, name): self.name = name
+    def __repr__(self): return self.name
+
+MISSING = _Sentinel("MISSING")  # the key did not exist before the branches ran
+DELETED = _Sentinel("DELETED")  # a branch deleted the key
+
+class MergeConflict(Exception):
+    def __init__(self, path, values):
+        self.path, self.values = path, values
+        super().__init__(f"{len(values)} branches wrote {'.'.join(map(str, path))}")
+
+class _CopyOnWrite:
+    """
+    Stands in for a parent's list or set: reads go to the parent's object,
+    and the first mutation copies it, so read-only branches copy nothing.
+    `dirty` is set once the branch has its own copy.
+    """
+
+    def __init__(self, value):
+        self._value, self.dirty = value, False
+
+    def _own(self):
+        if not self.dirty:
+            self._value, self.dirty = self._value.copy(), True
+        return self._value
+
+    def __len__(self): return len(self._value)
+    def __iter__(self): return iter(self._value)
+    def __contains__(self, item): return item in self._value
+    def __eq__(self, other): return self._value == (other._value if isinstance(other, _CopyOnWrite) else other)
+    def __repr__(self): return repr(self._value)
+    def copy(self): return self._value.copy()
+
+class _CopyOnWriteList(_CopyOnWrite, MutableSequence):
+    def __getitem__(self, i): return self._value[i]
+    def __setitem__(self, i, item): self._own()[i] = item
+    def __delitem__(self, i): del self._own()[i]
+    def __add__(self, other): return self._value + list(other)
+    def __iadd__(self, items):
+        self.extend(items)
+        return self._value
+    def insert(self, i, item): self._own().insert(i, item)
+    def append(self, item): self._own().append(item)
+    def extend(self, items): self._own().extend(items)
+    def sort(self, **kwargs): self._own().sort(**kwargs)
+
+class _CopyOnWriteSet(_CopyOnWrite, MutableSet):
+    @classmethod
+    def _from_iterable(cls, items): return set(items)  # result of |, &, -, ^
+    def add(self, item): self._own().add(item)
+    def discard(self, item): self._own().discard(item)
+    def update(self, *items): self._own().update(*items)
+    # In-place operators hand back the owned set, so `view[k] |= ...` stores a plain set
+    def _in_place(self, op, items):
+        op(self._own(), set(items))
+        return self._value
+    def __ior__(self, items): return self._in_place(set.__ior__, items)
+    def __iand__(self, items): return self._in_place(set.__iand__, items)
+    def __isub__(self, items): return self._in_place(set.__isub__, items)
+    def __ixor__(self, items): return self._in_place(set.__ixor__, items)
+
+def _unwrap(value):
+    """The plain list or set behind a proxy, so proxies never leak into a store."""
+    if isinstance(value, _CopyOnWrite):
+        return value._value if value.dirty else value._value.copy()
+    return value
+
+class ScopedShared(MutableMapping):
+    """
+    Copy-on-write view of a shared store for one concurrent branch.
+
+    Reads fall through to the parent. Writes and deletes go to a branch-local
+    overlay, so a branch costs O(keys it writes), plus one copy of each list
+    or set it mutates, not O(state). Nested dicts
+    are returned as nested views. Lists and sets are returned as proxies over
+    the parent's object, which copy it on their first mutation, so in-place
+    `.append()` / `.add()` stay branch-local and reading copies nothing.
+    Other mutable values (objects, arrays) must be replaced, not mutated in
+    place.
+    """
+
+    def __init__(self, parent):
+        self._parent = parent
+        self._writes, self._deleted, self._children = {}, set(), {}
+        self._proxies = {}  # key -> _CopyOnWrite over the parent's list or set
+
+    def __getitem__(self, key):
+        if key in self._writes:
+            return self._writes[key]
+        if key in self._deleted:
+            raise KeyError(key)
+        if key in self._children:
+            return self._children[key]
+        if key in self._proxies:
+            return self._proxies[key]
+        value = self._parent[key]
+        if isinstance(value, (dict, ScopedShared)):
+            value = self._children[key] = ScopedShared(value)
+        elif isinstance(value, (list, _CopyOnWriteList)):
+            value = self._proxies[key] = _CopyOnWriteList(value)
+        elif isinstance(value, (set, _CopyOnWriteSet)):
+            value = self._proxies[key] = _CopyOnWriteSet(value)
+        return value
+
+    def __setitem__(self, key, value):
+        self._deleted.discard(key)
+        self._children.pop(key, None)
+        self._proxies.pop(key, None)
+        self._writes[key] = _unwrap(value)
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self._writes.pop(key, None)
+        self._children.pop(key, None)
+        self._proxies.pop(key, None)
+        if key in self._parent:
+            self._deleted.add(key)
+
+    def __contains__(self, key):
+        if key in self._writes or key in self._children or key in self._proxies:
+            return True
+        return key not in self._deleted and key in self._parent
+
+    def __iter__(self):
+        seen = set()
+        for key in self._parent:
+            if key not in self._deleted:
+                seen.add(key)
+                yield key
+        for key in self._writes:
+            if key not in seen:
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        writes = list(self._writes) + [k for k, p in self._proxies.items() if p.dirty]
+        return f"ScopedShared(writes={writes}, deleted={sorted(map(str, self._deleted))}, children={list(self._children)})"
+
+    def changes(self):
+        """
+        Keys this branch changed: assigned keys in write order, then dicts,
+        lists and sets changed in place, then deletions. Values are the new
+        value, DELETED, or a nested ScopedShared for a dict changed in place.
+        Costs O(keys touched); nothing is compared with the parent.
+        """
+        out = dict(self._writes)
+        for key, child in self._children.items():
+            if child.changes():
+                out[key] = child
+        for key, proxy in self._proxies.items():
+            if proxy.dirty:
+                out[key] = proxy._value
+        for key in self._deleted:
+            out[key] = DELETED
+        return out
+
+    def to_dict(self):
+        """A plain dict with this branch's view of the state."""
+        def plain(v):
+            if isinstance(v, ScopedShared):
+                return v.to_dict()
+            return v.copy() if isinstance(v, _CopyOnWrite) else v
+        return {k: plain(self[k]) for k in self}
+
+# ---- merge policies: (path, base, values) -> merged value ----------------------
+# `base` is the value before the branches ran (or MISSING), `values` is what each
+# branch that changed the key left behind, in batch order (may include DELETED).
+
+def last_write_wins(path, base, values):
+    return values[-1]
+
+def fail_on_conflict(path, base, values):
+    if len(values) > 1:
+        raise MergeConflict(path, values)
+    return values[0]
+
+def append_items(path, base, values):
+    """
+    For append-only lists: keep base, then each branch's new items in batch
+    order. A branch that deleted the key adds nothing; if every branch that
+    changed the key deleted it, it is deleted.
+    """
+    if all(v is DELETED for v in values):
+        return DELETED
+    base = [] if base is MISSING else base
+    merged = list(base)
+    for v in values:
+        if v is not DELETED:
+            merged.extend(v[len(base):])
+    return merged
+
+def add_deltas(path, base, values):
+    """For counters: apply each branch's increment to the base value."""
+    base = 0 if base is MISSING else base
+    return base + sum(v - base for v in values if v is not DELETED)
+
+def _policy(merge, path):
+    if callable(merge):
+        return merge
+    return merge.get(path, merge.get(path[-1], last_write_wins))
+
+def merge_views(target, views, merge=last_write_wins, _path=()):
+    """
+    Apply the overlays of `views` to `target`.
+
+    merge: one policy for every key, or a dict mapping a key name or a key
+    path tuple such as ("stats", "tokens") to a policy. Unlisted keys use
+    last_write_wins. Dicts changed in place by every branch are merged key
+    by key; any other value goes through the policy.
+    """
+    changes = [v.changes() for v in views]
+    keys = dict.fromkeys(k for c in changes for k in c)
+    for key in keys:
+        path = _path + (key,)
+        values = [c[key] for c in changes if key in c]
+        base = target[key] if key in target else MISSING
+        if isinstance(base, MutableMapping) and all(isinstance(v, ScopedShared) for v in values):
+            merge_views(base, values, merge, path)
+            continue
+        values = [v.to_dict() if isinstance(v, ScopedShared) else v for v in values]
+        merged = _policy(merge, path)(path, base, values)
+        if merged is DELETED:
+            if key in target:
+                del target[key]
+        else:
+            target[key] = _unwrap(merged)
+
+class ScopedParallelBatchFlow(AsyncParallelBatchFlow):
+    """
+    AsyncParallelBatchFlow that gives every branch its own ScopedShared view.
+    When all branches are done, their writes are merged into `shared` in batch
+    order with `merge` (see merge_views), before post_async runs. If any
+    branch raises, nothing is merged.
+    """
+
+    def __init__(self, start=None, merge=last_write_wins):
+        super().__init__(start=start)
+        self.merge = merge
+
+    async def _run_async(self, shared):
+        pr = await self.prep_async(shared) or []
+        views = [ScopedShared(shared) for _ in pr]
+        await asyncio.gather(*(self._orch_async(v, {**self.params, **bp}) for v, bp in zip(views, pr)))
+        merge_views(shared, views, self.merge)
+        return await self.post_async(shared, pr, None)
@@ -0,0 +1,45 @@
+import unittest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from scoped import ScopedShared, merge_views, append_items
+
+class TestCopyOnWriteProxies(unittest.TestCase):
+    def test_augmented_list_assignment_merges_a_plain_list(self):
+        parent = {"xs": [1, 2]}
+        view = ScopedShared(parent)
+        view["xs"] += [3]
+        merge_views(parent, [view])
+        self.assertIs(type(parent["xs"]), list)
+        self.assertEqual(parent["xs"], [1, 2, 3])
+
+    def test_augmented_set_assignment_merges_a_plain_set(self):
+        parent = {"s": {1}}
+        view = ScopedShared(parent)
+        view["s"] |= {2}
+        view["t"] = view["s"]
+        merge_views(parent, [view])
+        self.assertIs(type(parent["s"]), set)
+        self.assertIs(type(parent["t"]), set)
+        self.assertEqual(parent["s"], {1, 2})
+
+    def test_set_operators_return_plain_sets(self):
+        view = ScopedShared({"s": {1, 2}})
+        for result in (view["s"] | {3}, view["s"] & {2}, view["s"] - {1}, view["s"] ^ {3}):
+            self.assertIs(type(result), set)
+        self.assertEqual(view["s"] | {3}, {1, 2, 3})
+        self.assertEqual(view.changes(), {})
+
+    def test_reads_do_not_copy_and_branches_stay_isolated(self):
+        parent = {"xs": [1]}
+        a, b = ScopedShared(parent), ScopedShared(parent)
+        a["xs"].append(2)
+        self.assertEqual(b["xs"], [1])
+        self.assertEqual(parent["xs"], [1])
+        merge_views(parent, [a, b], append_items)
+        self.assertEqual(parent["xs"], [1, 2])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,11 @@
+import asyncio
+
+async def call_llm(prompt):
+    """Simulated async LLM call: returns a summary and its token count."""
+    await asyncio.sleep(0.01)
+    words = prompt.split()
+    return " ".join(words[:8]) + "...", len(words)
+
+async def append_audit_log(entry):
+    """Simulated async write to an external audit log."""
+    await asyncio.sleep(0)
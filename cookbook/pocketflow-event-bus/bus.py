@@ -0,0 +1,187 @@
+import asyncio
+
+class TopicClosed(Exception):
+    """Raised by get/drain once a topic is closed and its backlog consumed, and by publish after close."""
+
+_CLOSED = object()  # internal end-of-topic marker, queued behind pending messages
+
+class Request:
+    """A message that expects an answer. Handlers call reply() or fail() exactly once."""
+
+    def __init__(self, payload, future):
+        self.payload, self._future = payload, future
+
+    def reply(self, value):
+        if not self._future.done():  # the requester may have timed out already
+            self._future.set_result(value)
+
+    def fail(self, exc):
+        if not self._future.done():
+            self._future.set_exception(exc)
+
+    def __repr__(self):
+        return f"Request({self.payload!r})"
+
+class _Channel:
+    """One bounded queue: a single subscriber's, or one shared by a consumer group."""
+
+    def __init__(self, maxsize):
+        self.queue = asyncio.Queue(maxsize)
+        self.high_water = self.dropped = 0
+
+    async def put(self, message, overflow, timeout):
+        """Returns False if the message itself was dropped."""
+        q = self.queue
+        if q.full() and overflow != "block":
+            self.dropped += 1
+            if overflow == "drop_newest":
+                return False
+            q.get_nowait()  # drop_oldest: evict the stalest message instead
+            q.put_nowait(message)
+            return True
+        if timeout is None:
+            await q.put(message)
+        else:
+            await asyncio.wait_for(q.put(message), timeout)
+        self.high_water = max(self.high_water, q.qsize())
+        return True
+
+class Topic:
+    def __init__(self, name, type=None, maxsize=100, overflow="block"):
+        if overflow not in ("block", "drop_oldest", "drop_newest"):
+            raise ValueError(f"unknown overflow policy: {overflow!r}")
+        self.name, self.type, self.maxsize, self.overflow = name, type, maxsize, overflow
+        self.channels, self.groups, self.closed = [], {}, False
+        self.published = self.delivered = self.dropped = 0
+
+    def check(self, payload):
+        if self.type is not None and not isinstance(payload, self.type):
+            raise TypeError(f"topic {self.name!r} expects {self.type.__name__}, got {type(payload).__name__}")
+
+class Subscription:
+    """Handle on a channel. Messages published after subscribing are delivered in order."""
+
+    def __init__(self, bus, topic, channel, group=None):
+        self._bus, self.topic, self._channel, self.group = bus, topic, channel, group
+
+    async def get(self, timeout=None):
+        """Next message; waits without polling. Raises TopicClosed or asyncio.TimeoutError."""
+        q = self._channel.queue
+        item = await (q.get() if timeout is None else asyncio.wait_for(q.get(), timeout))
+        if item is _CLOSED:
+            q.put_nowait(_CLOSED)  # leave it for other members of a group
+            raise TopicClosed(self.topic.name)
+        return item
+
+    async def drain(self, max_items=100, timeout=None):
+        """Wait for one message, then take whatever else is queued, up to max_items."""
+        batch = [await self.get(timeout)]
+        q = self._channel.queue
+        while len(batch) < max_items and not q.empty():
+            item = q.get_nowait()
+            if item is _CLOSED:
+                q.put_nowait(_CLOSED)
+                break
+            batch.append(item)
+        return batch
+
+    def unsubscribe(self):
+        self._bus._remove(self)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return await self.get()
+        except TopicClosed:
+            raise StopAsyncIteration
+
+class EventBus:
+    """
+    In-process pub/sub for concurrent AsyncFlows.
+
+    - Topics are typed and bounded: publish() type-checks the payload and
+      waits while a subscriber's queue is full (or drops, per `overflow`).
+    - Every subscription receives every message (fan-out). Subscriptions
+      that share a `group` share one queue, so each message goes to one
+      member (competing consumers).
+    - request() publishes a Request and awaits its reply, with a timeout.
+    - close() queues an end marker behind pending messages, replacing string
+      sentinels: consumers see TopicClosed once the backlog is drained.
+    """
+
+    def __init__(self):
+        self.topics = {}
+
+    def topic(self, name, type=None, maxsize=100, overflow="block"):
+        if name not in self.topics:
+            self.topics[name] = Topic(name, type, maxsize, overflow)
+        return self.topics[name]
+
+    def _get(self, name):
+        try:
+            return self.topics[name]
+        except KeyError:
+            raise KeyError(f"unknown topic {name!r}; declare it with bus.topic()") from None
+
+    def subscribe(self, name, maxsize=None, group=None):
+        t = self._get(name)
+        if group is not None and group in t.groups:
+            return Subscription(self, t, t.groups[group], group)
+        channel = _Channel(t.maxsize if maxsize is None else maxsize)
+        if t.closed:
+            channel.queue.put_nowait(_CLOSED)
+        t.channels.append(channel)
+        if group is not None:
+            t.groups[group] = channel
+        return Subscription(self, t, channel, group)
+
+    def _remove(self, sub):
+        t = sub.topic
+        if sub._channel in t.channels:
+            t.channels.remove(sub._channel)
+        if sub.group is not None:
+            t.groups.pop(sub.group, None)
+
+    async def publish(self, name, message, timeout=None):
+        """Deliver to every channel; returns how many accepted it. Blocks on full queues."""
+        t = self._get(name)
+        t.check(message.payload if isinstance(message, Request) else message)
+        if t.closed:
+            raise TopicClosed(name)
+        t.published += 1
+        accepted = 0
+        for channel in list(t.channels):
+            accepted += await channel.put(message, t.overflow, timeout)
+        if not t.channels:
+            t.dropped += 1  # nobody listening
+        t.delivered += accepted
+        return accepted
+
+    async def request(self, name, payload, timeout=None):
+        """Publish a Request and wait for the first reply. Raises asyncio.TimeoutError."""
+        future = asyncio.get_running_loop().create_future()
+        async def ask():
+            if not await self.publish(name, Request(payload, future)):
+                raise LookupError(f"no subscriber accepted the request on {name!r}")
+            return await future
+        try:
+            return await asyncio.wait_for(ask(), timeout)
+        finally:
+            future.cancel()  # a late reply() becomes a no-op
+
+    async def close(self, name):
+        t = self._get(name)
+        if t.closed:
+            return
+        t.closed = True
+        for channel in list(t.channels):
+            await channel.queue.put(_CLOSED)
+
+    def stats(self):
+        return {name: {"published": t.published, "delivered": t.delivered,
+                       "dropped": t.dropped + sum(c.dropped for c in t.channels),
+                       "subscribers": len(t.channels), "maxsize": t.maxsize,
+                       "high_water": max((c.high_water for c in t.channels), default=0)}
+                for name, t in self.topics.items()}
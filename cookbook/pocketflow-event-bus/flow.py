@@ -0,0 +1,17 @@
+from pocketflow import AsyncFlow
+
+from nodes import Stop, AsyncHinter, AsyncGuesser, Dispatcher, Worker, Reviewer, Collect
+
+def create_agent_flow(node):
+    """Loop a node on "continue" until it returns "end"."""
+    node - "continue" >> node
+    node - "end" >> Stop()
+    return AsyncFlow(start=node)
+
+def create_taboo_flows():
+    return create_agent_flow(AsyncHinter()), create_agent_flow(AsyncGuesser())
+
+def create_research_flows(num_workers):
+    workers = [create_agent_flow(Worker()) for _ in range(num_workers)]
+    consumers = [AsyncFlow(start=Reviewer()), AsyncFlow(start=Collect("collector", "answers")), AsyncFlow(start=Collect("auditor", "audit_log"))]
+    return AsyncFlow(start=Dispatcher()), workers, consumers
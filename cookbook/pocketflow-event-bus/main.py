@@ -0,0 +1,61 @@
+import asyncio
+import time
+
+from bus import EventBus
+from flow import create_taboo_flows, create_research_flows
+
+async def taboo():
+    bus = EventBus()
+    bus.topic("hints", type=str, maxsize=1)
+    bus.topic("guesses", type=str, maxsize=1)
+    shared = {
+        "bus": bus,
+        "target_word": "nostalgic",
+        "forbidden_words": ["memory", "past", "remember", "feeling", "longing"],
+        # Subscribe before anything is published
+        "inboxes": {"hinter": bus.subscribe("guesses"), "guesser": bus.subscribe("hints")},
+    }
+    print("=== Taboo, on the bus ===")
+    await bus.publish("guesses", "")  # the hinter opens the game
+    await asyncio.gather(*(f.run_async(shared) for f in create_taboo_flows()))
+    print()
+
+async def research_team(num_questions=400, num_workers=24):
+    bus = EventBus()
+    bus.topic("tasks", type=str, maxsize=16)
+    bus.topic("review", type=str, maxsize=32)
+    bus.topic("answers", type=tuple, maxsize=64)
+    shared = {
+        "bus": bus,
+        "questions": [f"question {i}" for i in range(num_questions)],
+        "batch_sizes": [],
+        "inboxes": {
+            "workers": bus.subscribe("tasks", group="workers"),  # competing consumers
+            "reviewer": bus.subscribe("review"),
+            "collector": bus.subscribe("answers"),               # fan-out: both get every answer
+            "auditor": bus.subscribe("answers"),
+        },
+    }
+    print(f"=== Research team: {num_questions} questions, {num_workers} workers ===")
+    dispatcher, workers, consumers = create_research_flows(num_workers)
+    start = time.perf_counter()
+    background = asyncio.gather(*(f.run_async(shared) for f in consumers))
+    await asyncio.gather(dispatcher.run_async(shared), *(w.run_async(shared) for w in workers))
+    await bus.close("review")
+    await bus.close("answers")
+    await background
+    elapsed = time.perf_counter() - start
+
+    unreviewed = sum(1 for _, verdict in shared["answers"] if verdict == "unreviewed")
+    sizes = shared["batch_sizes"]
+    print(f"answers: {len(shared['answers'])}, audited: {len(shared['audit_log'])}, unreviewed (timed out): {unreviewed}")
+    print(f"worker batches: {len(sizes)}, avg size {sum(sizes) / len(sizes):.1f}, took {elapsed:.2f}s")
+    for name, s in bus.stats().items():
+        print(f"  {name:8} published={s['published']:4} delivered={s['delivered']:4} dropped={s['dropped']} high_water={s['high_water']}/{s['maxsize']}")
+
+async def main():
+    await taboo()
+    await research_team()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,126 @@
+import asyncio
+
+from pocketflow import AsyncNode
+
+from bus import TopicClosed
+from utils import call_llm, answer_questions, review_answer
+
+class Stop(AsyncNode):
+    """Terminal node for an agent's "end" action."""
+
+# ---- Taboo: the multi-agent example on the bus ----------------------------------
+
+class AsyncHinter(AsyncNode):
+    async def prep_async(self, shared):
+        try:
+            guess = await shared["inboxes"]["hinter"].get()  # "guesses" topic
+        except TopicClosed:
+            return None
+        return shared["target_word"], shared["forbidden_words"], guess
+
+    async def exec_async(self, inputs):
+        if inputs is None:
+            return None
+        target, forbidden, guess = inputs
+        hint = await call_llm(f"Generate hint for '{target}'\nForbidden words: {forbidden}\nLast guess: {guess}")
+        print(f"Hinter: Here's your hint - {hint}")
+        return hint
+
+    async def post_async(self, shared, prep_res, exec_res):
+        if exec_res is None:
+            return "end"
+        await shared["bus"].publish("hints", exec_res)
+        return "continue"
+
+class AsyncGuesser(AsyncNode):
+    async def prep_async(self, shared):
+        return await shared["inboxes"]["guesser"].get()  # "hints" topic
+
+    async def exec_async(self, hint):
+        guess = await call_llm(f"Given hint: {hint}, make a new guess.")
+        print(f"Guesser: I guess it's - {guess}")
+        return guess
+
+    async def post_async(self, shared, prep_res, exec_res):
+        if exec_res.lower() == shared["target_word"].lower():
+            print("Game Over - Correct guess!")
+            await shared["bus"].close("guesses")  # the hinter sees TopicClosed
+            return "end"
+        await shared["bus"].publish("guesses", exec_res)
+        return "continue"
+
+# ---- Research team: dispatcher, worker pool, reviewer, fan-out consumers ---------
+
+class Dispatcher(AsyncNode):
+    async def prep_async(self, shared):
+        return shared["bus"], shared["questions"]
+
+    async def exec_async(self, prep_res):
+        bus, questions = prep_res
+        for q in questions:
+            await bus.publish("tasks", q)  # waits while the task queue is full
+        await bus.close("tasks")
+
+class Worker(AsyncNode):
+    """One of several workers sharing the "workers" consumer group on "tasks"."""
+
+    async def prep_async(self, shared):
+        try:
+            batch = await shared["inboxes"]["workers"].drain(max_items=4)
+        except TopicClosed:
+            return None
+        return shared["bus"], batch
+
+    async def exec_async(self, prep_res):
+        if prep_res is None:
+            return None
+        bus, questions = prep_res
+        reviewed = []
+        for answer in await answer_questions(questions):
+            try:
+                verdict = await bus.request("review", answer, timeout=0.05)
+            except asyncio.TimeoutError:
+                verdict = "unreviewed"
+            reviewed.append((answer, verdict))
+        return reviewed
+
+    async def post_async(self, shared, prep_res, exec_res):
+        if exec_res is None:
+            return "end"
+        shared["batch_sizes"].append(len(exec_res))
+        for item in exec_res:
+            await shared["bus"].publish("answers", item)
+        return "continue"
+
+class Reviewer(AsyncNode):
+    """Serves review requests until the "review" topic is closed."""
+
+    async def prep_async(self, shared):
+        return shared["inboxes"]["reviewer"]
+
+    async def exec_async(self, inbox):
+        pending = []
+        async for request in inbox:
+            # Reply from a task so one slow review doesn't hold up the others
+            pending.append(asyncio.create_task(self._review(request, slow=len(pending) % 10 == 9)))
+        await asyncio.gather(*pending)
+        return len(pending)
+
+    async def _review(self, request, slow):
+        request.reply(await review_answer(request.payload, slow))
+
+class Collect(AsyncNode):
+    """Consumes one subscription of the "answers" topic into shared[key]."""
+
+    def __init__(self, inbox, key):
+        super().__init__()
+        self.inbox, self.key = inbox, key
+
+    async def prep_async(self, shared):
+        return shared["inboxes"][self.inbox]
+
+    async def exec_async(self, inbox):
+        return [item async for item in inbox]
+
+    async def post_async(self, shared, prep_res, exec_res):
+        shared[self.key] = exec_res
@@ -0,0 +1,22 @@
+import asyncio
+import itertools
+
+_hints = itertools.cycle(["Sentiment for earlier times", "Yearning for days gone by", "Wistful about bygone days, adjective"])
+_guesses = iter(["Nostalgia", "Reminiscence", "Nostalgic"])
+
+async def call_llm(prompt):
+    """Simulated LLM for the Taboo game: canned hints and a guesser that gets there on the third try."""
+    await asyncio.sleep(0.01)
+    if prompt.startswith("Generate hint"):
+        return next(_hints)
+    return next(_guesses, "Nostalgic")
+
+async def answer_questions(questions):
+    """Simulated batched LLM call: one round trip answers the whole batch."""
+    await asyncio.sleep(0.02)
+    return [f"Answer to {q!r}" for q in questions]
+
+async def review_answer(answer, slow=False):
+    """Simulated reviewer LLM; some reviews take longer than the requester will wait."""
+    await asyncio.sleep(0.2 if slow else 0.005)
+    return "approved"
@@ -0,0 +1,123 @@
+import warnings
+
+from pocketflow import Flow, BatchFlow, AsyncNode
+
+class _Vertex:
+    __slots__ = ("obj", "kind", "run", "start", "succ")
+
+    def __init__(self, obj, kind):
+        self.obj, self.kind = obj, kind
+        self.run = obj._run          # used for leaves
+        self.start, self.succ = None, {}
+
+class _Frame:
+    __slots__ = ("vertex", "params", "scope", "prep_res", "batches", "node", "action")
+
+_LEAF, _FLOW, _BATCH = 0, 1, 2
+_END = object()
+
+def _kind(obj):
+    """How the plan treats a graph node. Flows with custom orchestration stay opaque leaves."""
+    cls = type(obj)
+    if isinstance(obj, AsyncNode):
+        raise TypeError(f"{cls.__name__} is async; flatten only compiles sync flows")
+    if not isinstance(obj, Flow) or cls._orch is not Flow._orch or cls.get_next_node is not Flow.get_next_node:
+        return _LEAF
+    if cls._run is Flow._run:
+        return _FLOW
+    if cls._run is BatchFlow._run:
+        return _BATCH
+    return _LEAF
+
+class FlatPlan:
+    """
+    A flow graph compiled into one flat table of vertices, executed by a
+    single loop with an explicit stack instead of nested _run -> _orch calls.
+
+    Each nested Flow/BatchFlow still runs its own prep and post, and params
+    are scoped exactly as in Flow._orch: a flow's params are its parent's
+    scope, a plain flow's children see a copy of them, and each batch item
+    sees {**flow.params, **item}.
+
+    Nodes run in place rather than as copy.copy() clones, so they must keep
+    per-run state in `shared`, not on `self` (see pocketflow-low-alloc).
+    Flow subclasses that override _orch, _run or get_next_node are not
+    inlined; they run as opaque leaves through their own _run.
+    """
+
+    def __init__(self, flow):
+        if _kind(flow) == _LEAF:
+            raise TypeError(f"{type(flow).__name__} is not a Flow or BatchFlow that can be flattened")
+        self._vertices = {}
+        self.root = self._compile(flow)
+
+    def _compile(self, obj):
+        v = self._vertices.get(id(obj))
+        if v is not None:
+            return v
+        v = self._vertices[id(obj)] = _Vertex(obj, _kind(obj))
+        if v.kind != _LEAF and obj.start_node is not None:
+            v.start = self._compile(obj.start_node)
+        v.succ = {action: self._compile(nxt) for action, nxt in obj.successors.items()}
+        return v
+
+    def __len__(self):
+        return len(self._vertices)
+
+    def stats(self):
+        kinds = [v.kind for v in self._vertices.values()]
+        return {"vertices": len(kinds), "leaves": kinds.count(_LEAF), "flows": kinds.count(_FLOW), "batch_flows": kinds.count(_BATCH)}
+
+    def run(self, shared):
+        """Same contract as Flow.run: returns the root flow's post() result."""
+        if self.root.obj.successors:
+            warnings.warn("Node won't run successors. Use Flow.")
+        stack = [self._enter(self.root, shared)]
+        while True:
+            f = stack[-1]
+            v = f.node
+            if v is None:                        # this orchestration has finished
+                if f.batches is not None:
+                    bp = next(f.batches, _END)
+                    if bp is not _END:
+                        f.scope, f.node = {**f.params, **bp}, f.vertex.start
+                        continue
+                flow = f.vertex.obj
+                flow.set_params(f.params)        # in case a recursive run of the same flow replaced them
+                res = flow.post(shared, f.prep_res, None if f.batches is not None else f.action)
+                stack.pop()
+                if not stack:
+                    return res
+                parent = stack[-1]
+                parent.action, parent.node = res, self._next(parent.node, res)
+                continue
+            v.obj.set_params(f.scope)
+            if v.kind == _LEAF:
+                f.action = v.run(shared)
+                f.node = self._next(v, f.action)
+            else:
+                stack.append(self._enter(v, shared))
+
+    @staticmethod
+    def _enter(v, shared):
+        f = _Frame()
+        f.vertex, f.params, f.action = v, v.obj.params, None
+        prep_res = v.obj.prep(shared)
+        if v.kind == _BATCH:
+            f.prep_res = prep_res or []
+            f.batches, f.node, f.scope = iter(f.prep_res), None, None
+        else:
+            f.prep_res, f.batches = prep_res, None
+            f.scope, f.node = {**f.params}, v.start
+        return f
+
+    @staticmethod
+    def _next(v, action):
+        nxt = v.succ.get(action or "default")
+        if nxt is None and v.succ:
+            warnings.warn(f"Flow ends: '{action}' not found in {list(v.succ)}")
+        return nxt
+
+def flatten(flow):
+    """Compile `flow` into a FlatPlan. Recompile after rewiring the graph."""
+    return FlatPlan(flow)
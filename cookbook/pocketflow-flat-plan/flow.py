@@ -0,0 +1,46 @@
+from pocketflow import Flow, BatchFlow
+
+from nodes import LoadGrades, CalculateAverage
+
+class LevelBatchFlow(BatchFlow):
+    """
+    One batch item per child of the current group, e.g. the classes of a
+    school. The group name is built from the enclosing levels' params.
+    """
+
+    def __init__(self, start, level, fanout):
+        super().__init__(start=start)
+        self.level, self.fanout = level, fanout
+
+    def prep(self, shared):
+        prefix = self.params.get("class", "")
+        return [{"class": f"{prefix}{self.level}{i}."} for i in range(self.fanout)]
+
+    def post(self, shared, prep_res, exec_res):
+        shared["groups_done"][self.level] += 1
+
+class ClassBatchFlow(BatchFlow):
+    """One batch item per student in the current class."""
+
+    def __init__(self, start, students):
+        super().__init__(start=start)
+        self.students = [{"student": f"student_{s}"} for s in range(students)]
+
+    def prep(self, shared):
+        return self.students
+
+    def post(self, shared, prep_res, exec_res):
+        shared["groups_done"]["class"] += 1
+
+def create_flow(fanouts, students):
+    """
+    Flow(load >> calc) wrapped in a ClassBatchFlow, then one LevelBatchFlow
+    per entry of `fanouts`, outermost first, e.g. [2, 10, 10] builds
+    Region(District(School(Class(Flow)))).
+    """
+    load, calc = LoadGrades(), CalculateAverage()
+    load - "calculate" >> calc
+    flow = ClassBatchFlow(start=Flow(start=load), students=students)
+    for depth, fanout in reversed(list(enumerate(fanouts))):
+        flow = LevelBatchFlow(start=flow, level="L" + str(depth), fanout=fanout)
+    return flow
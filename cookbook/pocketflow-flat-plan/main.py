@@ -0,0 +1,53 @@
+import itertools
+import sys
+import time
+
+from flatten import flatten
+from flow import create_flow
+
+LAYOUTS = [[100], [10, 10], [5, 5, 4], [5, 5, 2, 2]]  # 100 classes, nested 3 to 6 flows deep
+
+def class_names(fanouts):
+    for path in itertools.product(*(range(n) for n in fanouts)):
+        yield "".join(f"L{depth}{i}." for depth, i in enumerate(path))
+
+def make_shared(fanouts, students):
+    gradebook = {
+        c: {f"student_{s}": [7.0 + (s % 3), 8.0, 9.0 - (n % 2)] for s in range(students)}
+        for n, c in enumerate(class_names(fanouts))
+    }
+    return {"gradebook": gradebook}
+
+def reset(shared, fanouts):
+    shared["totals"] = dict.fromkeys(shared["gradebook"], 0.0)
+    shared["groups_done"] = {"class": 0, **{f"L{d}": 0 for d in range(len(fanouts))}}
+
+def timed_run(runner, shared, fanouts, repeat=3):
+    """Best of `repeat` runs, plus the results of the last one."""
+    best = float("inf")
+    for _ in range(repeat):
+        reset(shared, fanouts)
+        start = time.perf_counter()
+        runner(shared)
+        best = min(best, time.perf_counter() - start)
+    return best, shared["totals"], dict(shared["groups_done"])
+
+def main():
+    students = 1000
+    for arg in sys.argv[1:]:
+        if arg.startswith("--students="):
+            students = int(arg.split("=", 1)[1])
+
+    print(f"100 classes x {students} students, nested Flow -> ClassBatchFlow -> levels\n")
+    print(f"{'depth':>5}  {'nested':>9}  {'flat':>9}  {'speedup':>7}")
+    for fanouts in LAYOUTS:
+        shared = make_shared(fanouts, students)
+        nested_time, nested_totals, nested_groups = timed_run(create_flow(fanouts, students).run, shared, fanouts)
+        plan = flatten(create_flow(fanouts, students))
+        flat_time, flat_totals, flat_groups = timed_run(plan.run, shared, fanouts)
+        assert nested_totals == flat_totals and nested_groups == flat_groups, "flat plan changed the results"
+        print(f"{len(fanouts) + 2:>5}  {nested_time:>8.2f}s  {flat_time:>8.2f}s  {nested_time / flat_time:>6.2f}x")
+    print(f"\nPlan for the deepest layout: {plan.stats()}")
+
+if __name__ == "__main__":
+    main()
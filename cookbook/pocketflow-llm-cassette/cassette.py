@@ -0,0 +1,173 @@
+import asyncio
+import functools
+import hashlib
+import inspect
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+
+class CassetteMiss(KeyError):
+    """Raised in replay mode when a request was never recorded."""
+
+class LogNormalLatency:
+    """
+    Synthetic latency with a given median and p95, the typical long-tailed
+    shape of LLM API calls. Seeded, so every replay sleeps the same sequence.
+    """
+
+    def __init__(self, median, p95, seed=0):
+        self.mu = math.log(median)
+        self.sigma = (math.log(p95) - self.mu) / 1.645
+        self._rng = random.Random(seed)
+
+    def __call__(self, recorded):
+        return self._rng.lognormvariate(self.mu, self.sigma)
+
+def _normalise(value):
+    """Make a request JSON-able and insensitive to incidental whitespace."""
+    if isinstance(value, str):
+        return re.sub(r"\s+", " ", value).strip()
+    if isinstance(value, dict):
+        return {str(k): _normalise(v) for k, v in sorted(value.items())}
+    if isinstance(value, (list, tuple)):
+        return [_normalise(v) for v in value]
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    return repr(value)
+
+def _encode(value):
+    """JSON-encode responses, keeping NumPy arrays (e.g. embeddings) intact."""
+    if type(value).__name__ == "ndarray":
+        return {"__ndarray__": value.tolist(), "dtype": str(value.dtype)}
+    if isinstance(value, (list, tuple)):
+        return [_encode(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _encode(v) for k, v in value.items()}
+    return value
+
+def _decode(value):
+    if isinstance(value, dict) and "__ndarray__" in value:
+        import numpy as np
+        return np.array(value["__ndarray__"], dtype=value["dtype"])
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _decode(v) for k, v in value.items()}
+    return value
+
+class Cassette:
+    """
+    Records calls to utility functions such as call_llm / get_embedding into
+    a JSONL file and replays them offline.
+
+    mode:
+      "record"  always call through and append the response
+      "replay"  never call through; unknown requests raise CassetteMiss
+      "auto"    replay when recorded, otherwise call through and record
+    latency:
+      "recorded" sleep as long as the original call took (default)
+      None       return immediately
+      callable   f(recorded_seconds) -> seconds, e.g. LogNormalLatency(...)
+
+    Requests are keyed by function name plus normalised arguments. If the
+    same request was recorded several times, replays cycle through the
+    responses in recording order.
+    """
+
+    def __init__(self, path, mode="auto", latency="recorded"):
+        if mode not in ("record", "replay", "auto"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path, self.mode, self.latency = path, mode, latency
+        self.hits = self.misses = 0
+        self._entries = {}   # key -> list of (response, latency)
+        self._cursor = {}    # key -> next entry to replay
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        e = json.loads(line)
+                        self._entries.setdefault(e["key"], []).append((e["response"], e["latency"]))
+
+    def wrap(self, fn, name=None):
+        """Wrap a sync or async function. `name` defaults to the function's name."""
+        name = name or fn.__name__
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                key, request = self._key(name, args, kwargs)
+                hit = self._lookup(key)
+                if hit is not None:
+                    response, delay = hit
+                    if delay: await asyncio.sleep(delay)
+                    return _decode(response)
+                start = time.perf_counter()
+                result = await fn(*args, **kwargs)
+                self._record(key, name, request, result, time.perf_counter() - start)
+                return result
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key, request = self._key(name, args, kwargs)
+            hit = self._lookup(key)
+            if hit is not None:
+                response, delay = hit
+                if delay: time.sleep(delay)
+                return _decode(response)
+            start = time.perf_counter()
+            result = fn(*args, **kwargs)
+            self._record(key, name, request, result, time.perf_counter() - start)
+            return result
+        return wrapper
+
+    def __call__(self, fn):
+        return self.wrap(fn)
+
+    def patch(self, module, *names):
+        """Replace module-level functions in place, e.g. tape.patch(nodes, "call_llm").
+        Needed because nodes usually bind `from utils import call_llm` at import time."""
+        for n in names:
+            setattr(module, n, self.wrap(getattr(module, n), name=n))
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "recorded": sum(len(v) for v in self._entries.values())}
+
+    def _key(self, name, args, kwargs):
+        request = _normalise({"fn": name, "args": list(args), "kwargs": kwargs})
+        blob = json.dumps(request, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest(), request
+
+    def _lookup(self, key):
+        """Returns (response, seconds to sleep) to replay, or None to call through."""
+        with self._lock:
+            entries = self._entries.get(key)
+            if self.mode == "record" or not entries:
+                if self.mode == "replay":
+                    self.misses += 1
+                    raise CassetteMiss(key)
+                self.misses += 1
+                return None
+            i = self._cursor.get(key, 0)
+            self._cursor[key] = (i + 1) % len(entries)
+            self.hits += 1
+            response, recorded = entries[i]
+        if self.latency is None:
+            return response, 0
+        if self.latency == "recorded":
+            return response, recorded
+        return response, self.latency(recorded)
+
+    def _record(self, key, name, request, result, latency):
+        response = _encode(result)
+        line = json.dumps({"key": key, "fn": name, "request": request, "response": response, "latency": round(latency, 6)})
+        with self._lock:
+            self._entries.setdefault(key, []).append((response, latency))
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
@@ -0,0 +1,8 @@
+from pocketflow import Flow
+from nodes import EmbedQuestions, AnswerQuestions
+
+def create_qa_flow():
+    """Embed the questions, then answer them."""
+    embed, answer = EmbedQuestions(), AnswerQuestions()
+    embed >> answer
+    return Flow(start=embed)
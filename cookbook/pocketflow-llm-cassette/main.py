@@ -0,0 +1,59 @@
+import os
+import time
+
+import nodes
+from cassette import Cassette, LogNormalLatency
+from flow import create_qa_flow
+
+CASSETTE = os.path.join("cassettes", "qa.jsonl")
+QUESTIONS = [
+    "What is PocketFlow?",
+    "How do I install PocketFlow?",
+    "What is a BatchFlow?",
+    "How do nodes pass data?",
+    "What is   an AsyncNode?",
+]
+
+def run(tape, questions=QUESTIONS):
+    """Runs the flow with nodes.call_llm / nodes.get_embedding going through `tape`."""
+    originals = nodes.call_llm, nodes.get_embedding
+    tape.patch(nodes, "call_llm", "get_embedding")
+    try:
+        shared = {"questions": questions}
+        start = time.perf_counter()
+        create_qa_flow().run(shared)
+        return shared["answers"], time.perf_counter() - start
+    finally:
+        nodes.call_llm, nodes.get_embedding = originals
+
+def main():
+    if os.path.exists(CASSETTE):
+        os.remove(CASSETTE)
+
+    print("=== 1. Record (calls the 'remote' API) ===")
+    recorded, t = run(Cassette(CASSETTE, mode="record"))
+    print(f"took {t:.2f}s, first answer: {recorded[0]!r}\n")
+
+    print("=== 2. Replay with recorded latency ===")
+    tape = Cassette(CASSETTE, mode="replay")
+    answers, t = run(tape)
+    print(f"took {t:.2f}s, identical answers: {answers == recorded}, {tape.stats()}\n")
+
+    print("=== 3. Replay with no latency (pure framework overhead) ===")
+    answers, t = run(Cassette(CASSETTE, mode="replay", latency=None))
+    print(f"took {t * 1000:.2f}ms, identical answers: {answers == recorded}\n")
+
+    print("=== 4. Replay with synthetic latency (median 150ms, p95 600ms), twice ===")
+    for _ in range(2):
+        _, t = run(Cassette(CASSETTE, mode="replay", latency=LogNormalLatency(0.15, 0.6, seed=42)))
+        print(f"took {t:.3f}s")
+
+    # Whitespace differences don't matter: "What is an AsyncNode?" hits the
+    # recording of "What is   an AsyncNode?"
+    print("\n=== 5. Normalised keys ===")
+    tape = Cassette(CASSETTE, mode="replay", latency=None)
+    answers, _ = run(tape, ["What is an AsyncNode?"])
+    print(f"{answers[0]!r}, {tape.stats()}")
+
+if __name__ == "__main__":
+    main()
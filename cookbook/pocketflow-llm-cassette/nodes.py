@@ -0,0 +1,26 @@
+from pocketflow import BatchNode
+from utils import call_llm, get_embedding
+
+class EmbedQuestions(BatchNode):
+    """Embeds every question."""
+
+    def prep(self, shared):
+        return shared["questions"]
+
+    def exec(self, question):
+        return get_embedding(question)
+
+    def post(self, shared, prep_res, exec_res_list):
+        shared["embeddings"] = exec_res_list
+
+class AnswerQuestions(BatchNode):
+    """Answers every question with one LLM call each."""
+
+    def prep(self, shared):
+        return shared["questions"]
+
+    def exec(self, question):
+        return call_llm(f"{question}\n\nAnswer briefly.")
+
+    def post(self, shared, prep_res, exec_res_list):
+        shared["answers"] = exec_res_list
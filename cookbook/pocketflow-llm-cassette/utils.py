@@ -0,0 +1,28 @@
+import hashlib
+import random
+import time
+
+# Stand-ins for the OpenAI-backed helpers used across the cookbook, so this
+# demo runs without an API key. They behave like a remote API: slow, with
+# jittery latency, and non-deterministic answers.
+
+def call_llm(prompt):
+    time.sleep(random.uniform(0.1, 0.4))
+    return f"Answer #{random.randint(1, 999)} to: {prompt.splitlines()[0]}"
+
+def get_embedding(text):
+    time.sleep(random.uniform(0.02, 0.08))
+    digest = hashlib.sha256(text.encode("utf-8")).digest()
+    return [b / 255 for b in digest[:8]]
+
+# With an API key, use the real helpers instead, e.g.:
+#
+# from openai import OpenAI
+# def call_llm(prompt):
+#     client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY", "your-api-key"))
+#     r = client.chat.completions.create(model="gpt-4o", messages=[{"role": "user", "content": prompt}])
+#     return r.choices[0].message.content
+
+if __name__ == "__main__":
+    print(call_llm("What is PocketFlow?"))
+    print(get_embedding("What is PocketFlow?"))
@@ -0,0 +1,14 @@
+from pocketflow import Flow, AsyncFlow
+from nodes import DecideAction, SearchWeb, AnswerQuestion, EmbedQuery, RetrieveDocument, GenerateAnswer
+
+def create_agent_flow():
+    decide, search, answer = DecideAction(), SearchWeb(), AnswerQuestion()
+    decide - "search" >> search
+    decide - "answer" >> answer
+    search - "decide" >> decide
+    return Flow(start=decide)
+
+def create_rag_flow():
+    embed, retrieve, generate = EmbedQuery(), RetrieveDocument(), GenerateAnswer()
+    embed >> retrieve >> generate
+    return AsyncFlow(start=embed)
@@ -0,0 +1,273 @@
+import asyncio
+import contextvars
+import os
+import random
+import resource
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from pocketflow import AsyncNode, Flow
+
+# Per-node timings of the invocation that is currently running
+_timings = contextvars.ContextVar("pocketflow_load_timings", default=None)
+
+def percentile(values, q):
+    if not values:
+        return float("nan")
+    s = sorted(values)
+    return s[min(len(s) - 1, int(q * len(s)))]
+
+def walk_graph(start):
+    """Every node reachable from `start`, descending into nested flows."""
+    seen, stack = [], [start]
+    while stack:
+        node = stack.pop()
+        if node is None or any(node is s for s in seen):
+            continue
+        seen.append(node)
+        stack.extend(node.successors.values())
+        if isinstance(node, Flow):
+            stack.append(node.start_node)
+    return seen
+
+class NodeTimer:
+    """
+    Times each node class in a flow graph by wrapping its _run / _run_async
+    at class level for the duration of a test. Class level, because flows
+    copy.copy every node they run, so instance-level wrappers would stay
+    bound to the original object.
+    """
+
+    def __init__(self, flow):
+        self.classes = {type(n) for n in walk_graph(flow)} - {type(flow)}
+        self._saved = []
+
+    def __enter__(self):
+        patches = []
+        for cls in self.classes:
+            name = "_run_async" if issubclass(cls, AsyncNode) else "_run"
+            # Read every original before patching any, so a subclass never wraps its parent's wrapper
+            patches.append((cls, name, getattr(cls, name), cls.__dict__.get(name)))
+        for cls, name, orig, own in patches:
+            setattr(cls, name, self._wrap(cls.__name__, orig, name == "_run_async"))
+            self._saved.append((cls, name, own))
+        return self
+
+    def __exit__(self, *exc):
+        for cls, name, own in self._saved:
+            if own is None:
+                delattr(cls, name)
+            else:
+                setattr(cls, name, own)
+        self._saved.clear()
+
+    @staticmethod
+    def _wrap(label, orig, is_async):
+        def record(start):
+            timings = _timings.get()
+            if timings is not None:
+                timings.append((label, time.perf_counter() - start))
+        if is_async:
+            async def timed_async(self, shared):
+                start = time.perf_counter()
+                try: return await orig(self, shared)
+                finally: record(start)
+            return timed_async
+        def timed(self, shared):
+            start = time.perf_counter()
+            try: return orig(self, shared)
+            finally: record(start)
+        return timed
+
+def read_rss():
+    """Current resident set size in bytes (Linux), else the process's peak so far."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+class RssSampler:
+    """Samples RSS on a background thread and keeps the peak."""
+
+    def __init__(self, interval=0.01):
+        self.interval, self.peak = interval, read_rss()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, read_rss())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, read_rss())
+
+async def _monitor_loop_lag(lags, interval=0.005):
+    """Measures how late the event loop wakes a sleeping task."""
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+class LevelResult:
+    """Everything measured at one concurrency level (or arrival rate)."""
+
+    def __init__(self, level, latencies, errors, elapsed, node_times, lags, peak_rss):
+        self.level, self.latencies, self.errors, self.elapsed = level, latencies, errors, elapsed
+        self.node_times, self.lags, self.peak_rss = node_times, lags, peak_rss
+        self.throughput = len(latencies) / elapsed if elapsed else 0.0
+
+    def row(self):
+        l, lag = self.latencies, self.lags
+        return {
+            "level": self.level,
+            "ok": len(l),
+            "errors": self.errors,
+            "throughput": self.throughput,
+            "p50": percentile(l, 0.50), "p95": percentile(l, 0.95), "p99": percentile(l, 0.99),
+            "loop_lag_p99": percentile(lag, 0.99) if lag else None,
+            "peak_rss_mb": self.peak_rss / 2**20,
+        }
+
+    def node_rows(self):
+        return {name: {"calls": len(t), "mean": statistics.fmean(t), "p50": percentile(t, 0.5),
+                       "p95": percentile(t, 0.95), "p99": percentile(t, 0.99)}
+                for name, t in sorted(self.node_times.items())}
+
+class LoadTest:
+    """
+    Drives many concurrent runs of a flow and measures them.
+
+    flow_factory: () -> Flow. A fresh flow per run, like create_agent_flow.
+    make_shared:  (i) -> dict. The shared store for run number i.
+    mode:         "closed": `level` workers, each starting a new run when
+                  its previous one finishes. "open": runs arrive as a
+                  Poisson process at `level` runs/sec, whether or not
+                  earlier ones have finished. Latency is measured from the
+                  scheduled arrival, so queueing delay is not hidden.
+    requests:     runs per level.
+
+    Async flows run on one event loop (and report event-loop lag); sync
+    flows run on a thread pool.
+    """
+
+    def __init__(self, flow_factory, make_shared, mode="closed", requests=200, seed=0):
+        if mode not in ("closed", "open"):
+            raise ValueError("mode must be 'closed' or 'open'")
+        self.flow_factory, self.make_shared = flow_factory, make_shared
+        self.mode, self.requests, self.seed = mode, requests, seed
+        self.is_async = isinstance(flow_factory(), AsyncNode)
+
+    def sweep(self, levels):
+        return [self.run_level(level) for level in levels]
+
+    def run_level(self, level):
+        latencies, errors, node_times, lags = [], [0], {}, []
+        with NodeTimer(self.flow_factory()), RssSampler() as rss:
+            start = time.perf_counter()
+            if self.is_async:
+                asyncio.run(self._run_async(level, latencies, errors, node_times, lags))
+            else:
+                self._run_threads(level, latencies, errors, node_times)
+            elapsed = time.perf_counter() - start
+        return LevelResult(level, latencies, errors[0], elapsed, node_times, lags, rss.peak)
+
+    def _arrivals(self, rate):
+        rng, t = random.Random(self.seed), 0.0
+        for _ in range(self.requests):
+            t += rng.expovariate(rate)
+            yield t
+
+    def _collect(self, timings, node_times):
+        for name, seconds in timings:
+            node_times.setdefault(name, []).append(seconds)
+
+    # ---- async flows ---------------------------------------------------
+    async def _one_async(self, i, t0, latencies, errors, node_times):
+        timings = []
+        _timings.set(timings)
+        try:
+            await self.flow_factory().run_async(self.make_shared(i))
+            latencies.append(time.perf_counter() - t0)
+        except Exception:
+            errors[0] += 1
+        self._collect(timings, node_times)
+
+    async def _run_async(self, level, latencies, errors, node_times, lags):
+        monitor = asyncio.create_task(_monitor_loop_lag(lags))
+        try:
+            if self.mode == "closed":
+                counter = iter(range(self.requests))
+                async def worker():
+                    for i in counter:
+                        await self._one_async(i, time.perf_counter(), latencies, errors, node_times)
+                await asyncio.gather(*(worker() for _ in range(level)))
+            else:
+                base, tasks = time.perf_counter(), []
+                for i, at in enumerate(self._arrivals(level)):
+                    await asyncio.sleep(max(0.0, base + at - time.perf_counter()))
+                    tasks.append(asyncio.create_task(self._one_async(i, base + at, latencies, errors, node_times)))
+                await asyncio.gather(*tasks)
+        finally:
+            monitor.cancel()
+
+    # ---- sync flows ----------------------------------------------------
+    def _one_sync(self, i, t0, latencies, errors, node_times):
+        timings = []
+        _timings.set(timings)
+        try:
+            self.flow_factory().run(self.make_shared(i))
+            latencies.append(time.perf_counter() - t0)
+        except Exception:
+            errors[0] += 1
+        self._collect(timings, node_times)
+
+    def _run_threads(self, level, latencies, errors, node_times):
+        # list.append and dict.setdefault are atomic under the GIL
+        if self.mode == "closed":
+            with ThreadPoolExecutor(max_workers=level) as pool:
+                counter = iter(range(self.requests))
+                def worker():
+                    for i in counter:
+                        self._one_sync(i, time.perf_counter(), latencies, errors, node_times)
+                for _ in range(level):
+                    pool.submit(worker)
+        else:
+            base = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=min(self.requests, 512)) as pool:
+                for i, at in enumerate(self._arrivals(level)):
+                    time.sleep(max(0.0, base + at - time.perf_counter()))
+                    pool.submit(self._one_sync, i, base + at, latencies, errors, node_times)
+
+def find_knee(results, min_gain=0.10):
+    """The last level whose throughput still grew by at least `min_gain` over the previous one."""
+    knee = results[0]
+    for prev, cur in zip(results, results[1:]):
+        if cur.throughput < prev.throughput * (1 + min_gain):
+            break
+        knee = cur
+    return knee
+
+def format_report(results, title=""):
+    ms = lambda s: f"{s * 1000:8.1f}"
+    lines = [title] if title else []
+    lines.append(f"{'level':>6} {'ok':>5} {'err':>4} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'lag p99':>8} {'RSS MB':>7}")
+    for r in results:
+        row = r.row()
+        lag = ms(row["loop_lag_p99"]) if row["loop_lag_p99"] is not None else f"{'-':>8}"
+        lines.append(f"{row['level']:>6} {row['ok']:>5} {row['errors']:>4} {row['throughput']:8.1f} "
+                     f"{ms(row['p50'])} {ms(row['p95'])} {ms(row['p99'])} {lag} {row['peak_rss_mb']:7.1f}")
+    knee = find_knee(results)
+    lines.append(f"\nKnee: level {knee.level} ({knee.throughput:.1f} req/s). Per-node latency there:")
+    lines.append(f"  {'node':<24} {'calls':>6} {'mean ms':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, n in knee.node_rows().items():
+        lines.append(f"  {name:<24} {n['calls']:>6} {ms(n['mean'])} {ms(n['p50'])} {ms(n['p95'])} {ms(n['p99'])}")
+    return "\n".join(lines)
@@ -0,0 +1,49 @@
+import argparse
+import importlib.util
+import json
+import os
+import sys
+
+from harness import LoadTest, format_report
+
+def load_factory(spec):
+    """Loads `path/to/flow.py:create_flow` from another cookbook."""
+    path, name = spec.rsplit(":", 1)
+    path = os.path.abspath(path)
+    sys.path.insert(0, os.path.dirname(path))  # so the flow can import its nodes and utils
+    module_spec = importlib.util.spec_from_file_location("target_flow", path)
+    module = importlib.util.module_from_spec(module_spec)
+    module_spec.loader.exec_module(module)
+    return getattr(module, name)
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrency sweep for PocketFlow flows")
+    parser.add_argument("--flow", help="path/to/flow.py:factory, e.g. ../pocketflow-agent/flow.py:create_agent_flow")
+    parser.add_argument("--shared", default="{}", help="JSON shared store for every run")
+    parser.add_argument("--mode", choices=["closed", "open"], default="closed")
+    parser.add_argument("--levels", default="1,2,4,8,16,32,64",
+                        help="concurrency levels (closed) or arrival rates in runs/sec (open)")
+    parser.add_argument("--requests", type=int, default=100, help="runs per level")
+    args = parser.parse_args()
+    levels = [int(x) for x in args.levels.split(",")]
+
+    # Import this demo's own flow only when needed: the target cookbook has
+    # its own nodes.py / utils.py, and module names would collide
+    if args.flow:
+        template = json.loads(args.shared)
+        targets = [(args.flow, load_factory(args.flow), lambda i: json.loads(json.dumps(template)))]
+    else:
+        from flow import create_agent_flow, create_rag_flow
+        targets = [
+            ("Sync agent (threads)", create_agent_flow, lambda i: {"question": f"question {i}"}),
+            ("Async RAG (event loop)", create_rag_flow, lambda i: {"query": f"query {i}"}),
+        ]
+
+    for title, factory, make_shared in targets:
+        test = LoadTest(factory, make_shared, mode=args.mode, requests=args.requests)
+        results = test.sweep(levels)
+        print(format_report(results, title=f"=== {title}, {args.mode} loop, {args.requests} runs per level ==="))
+        print()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+from pocketflow import Node, AsyncNode
+from utils import call_llm, call_llm_async, get_embedding_async, burn_cpu
+
+# ---- a small sync agent: decide -> search -> decide -> answer -------------
+
+class DecideAction(Node):
+    def prep(self, shared):
+        return shared["question"], shared.get("context", "")
+
+    def exec(self, inputs):
+        response = call_llm(f"{inputs[0]}\n{inputs[1]}")
+        burn_cpu(1)  # parse the YAML reply
+        return response.split(": ")[1]
+
+    def post(self, shared, prep_res, exec_res):
+        shared["steps"] = shared.get("steps", 0) + 1
+        return "answer" if shared["steps"] >= 3 else exec_res
+
+class SearchWeb(Node):
+    def exec(self, _):
+        burn_cpu(0.5)
+        return "results"
+
+    def post(self, shared, prep_res, exec_res):
+        shared["context"] = shared.get("context", "") + exec_res
+        return "decide"
+
+class AnswerQuestion(Node):
+    def exec(self, _):
+        return call_llm("answer")
+
+    def post(self, shared, prep_res, exec_res):
+        shared["answer"] = exec_res
+
+# ---- a small async RAG: embed -> retrieve -> generate ---------------------
+
+class EmbedQuery(AsyncNode):
+    async def prep_async(self, shared):
+        return shared["query"]
+
+    async def exec_async(self, query):
+        return await get_embedding_async(query)
+
+    async def post_async(self, shared, prep_res, exec_res):
+        shared["query_embedding"] = exec_res
+
+class RetrieveDocument(AsyncNode):
+    async def prep_async(self, shared):
+        return shared["query_embedding"]
+
+    async def exec_async(self, embedding):
+        burn_cpu(3)  # brute-force similarity in pure Python blocks the loop
+        return "the most relevant document"
+
+    async def post_async(self, shared, prep_res, exec_res):
+        shared["document"] = exec_res
+
+class GenerateAnswer(AsyncNode):
+    async def prep_async(self, shared):
+        return shared["query"], shared["document"]
+
+    async def exec_async(self, inputs):
+        return await call_llm_async(f"{inputs[0]} given {inputs[1]}")
+
+    async def post_async(self, shared, prep_res, exec_res):
+        shared["answer"] = exec_res
@@ -0,0 +1,24 @@
+import asyncio
+import random
+import time
+
+# Simulated external calls: the waits release the GIL / event loop, the
+# busy loop does not, which is what eventually bends every flow's curve.
+
+def call_llm(prompt):
+    time.sleep(random.uniform(0.03, 0.06))
+    return f"action: {'answer' if random.random() < 0.5 else 'search'}"
+
+async def call_llm_async(prompt):
+    await asyncio.sleep(random.uniform(0.03, 0.06))
+    return f"Answer to: {prompt[:40]}"
+
+async def get_embedding_async(text):
+    await asyncio.sleep(random.uniform(0.005, 0.015))
+    return [((hash(text) >> i) & 0xFF) / 255 for i in range(0, 64, 8)]
+
+def burn_cpu(ms):
+    """Pure-Python work that holds the GIL, like parsing or re-ranking."""
+    end = time.perf_counter() + ms / 1000
+    while time.perf_counter() < end:
+        pass
@@ -0,0 +1,21 @@
+from pocketflow import Flow
+from guard import GuardedFlow
+from nodes import DecideAction, SearchWeb, AnswerQuestion, ForceAnswer, ReportUsage
+
+def create_agent_flow(budget):
+    """
+    decide -> search -> decide ... -> answer, guarded by `budget`.
+
+    When the budget runs out, the guarded agent returns "budget_exhausted"
+    and the outer flow routes to ForceAnswer instead of looping forever.
+    """
+    decide, search, answer = DecideAction(), SearchWeb(), AnswerQuestion()
+    decide - "search" >> search
+    decide - "answer" >> answer
+    search - "decide" >> decide
+
+    agent = GuardedFlow(start=decide, budget=budget)
+    force_answer, report = ForceAnswer(), ReportUsage()
+    agent >> report
+    agent - "budget_exhausted" >> force_answer >> report
+    return Flow(start=agent)
@@ -0,0 +1,124 @@
+import contextvars
+import copy
+import time
+
+from pocketflow import Flow, AsyncFlow, AsyncNode
+
+# Budgets of every guarded flow that is currently running, innermost last
+_active = contextvars.ContextVar("pocketflow_active_budgets", default=())
+
+class Budget:
+    """
+    Limits for one run of a guarded flow. Any limit left as None is unlimited.
+
+    max_steps:   node executions in this flow (nested flows count as one step)
+    max_visits:  executions of any single node
+    max_seconds: wall time, checked between steps
+    max_tokens:  tokens reported through report_usage()
+    max_cost:    cost reported through report_usage()
+    """
+
+    def __init__(self, max_steps=None, max_visits=None, max_seconds=None, max_tokens=None, max_cost=None):
+        self.max_steps, self.max_visits, self.max_seconds = max_steps, max_visits, max_seconds
+        self.max_tokens, self.max_cost = max_tokens, max_cost
+
+class BudgetState:
+    """What one run of a guarded flow has spent so far."""
+
+    def __init__(self, budget):
+        self.budget = budget
+        self.steps, self.visits = 0, {}
+        self.tokens, self.cost = 0, 0.0
+        self.started = time.monotonic()
+        self.exhausted = None
+
+    def check(self, node):
+        """Returns the name of the first exceeded limit before `node` runs, or None."""
+        b = self.budget
+        if b.max_steps is not None and self.steps >= b.max_steps: return "max_steps"
+        if b.max_visits is not None and self.visits.get(node, 0) >= b.max_visits: return "max_visits"
+        if b.max_seconds is not None and time.monotonic() - self.started >= b.max_seconds: return "max_seconds"
+        if b.max_tokens is not None and self.tokens >= b.max_tokens: return "max_tokens"
+        if b.max_cost is not None and self.cost >= b.max_cost: return "max_cost"
+        return None
+
+    def record(self, node):
+        self.steps += 1
+        self.visits[node] = self.visits.get(node, 0) + 1
+
+    def report(self):
+        return {
+            "exhausted": self.exhausted,
+            "steps": self.steps,
+            "visits": {type(n).__name__: v for n, v in self.visits.items()},
+            "seconds": round(time.monotonic() - self.started, 3),
+            "tokens": self.tokens,
+            "cost": round(self.cost, 6),
+        }
+
+def report_usage(tokens=0, cost=0.0):
+    """Charge LLM usage to every guarded flow that is currently running.
+    Call it from utilities such as call_llm; it is a no-op outside a guarded flow."""
+    for state in _active.get():
+        state.tokens += tokens
+        state.cost += cost
+
+def estimate_tokens(text):
+    """Rough token estimate (about 4 characters per token) for when the API doesn't report usage."""
+    return max(1, len(text) // 4)
+
+class GuardedFlow(Flow):
+    """
+    Flow that stops a cyclic graph once its Budget runs out.
+
+    Instead of running the next node, the flow ends and returns
+    `exhausted_action`, so the parent flow can route it, for example
+    `guarded - "budget_exhausted" >> force_answer`. A summary of the run is
+    written to shared[report_key].
+    """
+
+    def __init__(self, start=None, budget=None, exhausted_action="budget_exhausted", report_key="budget"):
+        super().__init__(start=start)
+        self.budget = budget or Budget()
+        self.exhausted_action, self.report_key = exhausted_action, report_key
+
+    def _orch(self, shared, params=None):
+        state = BudgetState(self.budget)
+        token = _active.set(_active.get() + (state,))
+        try:
+            node, p, last_action = self.start_node, (params or {**self.params}), None
+            while node:
+                if (reason := state.check(node)):
+                    state.exhausted, last_action = reason, self.exhausted_action
+                    break
+                state.record(node)
+                curr = copy.copy(node)
+                curr.set_params(p)
+                last_action = curr._run(shared)
+                node = self.get_next_node(curr, last_action)
+            return last_action
+        finally:
+            _active.reset(token)
+            shared[self.report_key] = state.report()
+
+class AsyncGuardedFlow(AsyncFlow, GuardedFlow):
+    """Async version of GuardedFlow; budgets are enforced in _orch_async."""
+
+    async def _orch_async(self, shared, params=None):
+        state = BudgetState(self.budget)
+        token = _active.set(_active.get() + (state,))
+        try:
+            node, p, last_action = self.start_node, (params or {**self.params}), None
+            while node:
+                if (reason := state.check(node)):
+                    state.exhausted, last_action = reason, self.exhausted_action
+                    break
+                state.record(node)
+                curr = copy.copy(node)
+                curr.set_params(p)
+                last_action = await curr._run_async(shared) if isinstance(curr, AsyncNode) else curr._run(shared)
+                node = self.get_next_node(curr, last_action)
+            return last_action
+        finally:
+            _active.reset(token)
+            shared[self.report_key] = state.report()
@@ -0,0 +1,21 @@
+import random
+from flow import create_agent_flow
+from guard import Budget
+
+def run(name, budget):
+    print(f"=== {name} ===")
+    random.seed(0)
+    shared = {"question": "Who won the Nobel Prize in Physics 2024?"}
+    create_agent_flow(budget).run(shared)
+    print()
+
+def main():
+    run("No budget", Budget())
+    run("Max 10 steps", Budget(max_steps=10))
+    run("Max 3 visits per node", Budget(max_visits=3))
+    run("Max 0.3 seconds", Budget(max_seconds=0.3))
+    run("Max 2,000 tokens", Budget(max_tokens=2000))
+    run("Max $0.005", Budget(max_cost=0.005))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+from pocketflow import Node
+from utils import call_llm, search_web
+
+class DecideAction(Node):
+    """Asks the LLM whether to search again or answer."""
+
+    def prep(self, shared):
+        return shared["question"], shared.get("context", "")
+
+    def exec(self, inputs):
+        question, context = inputs
+        return call_llm(f"Question: {question}\nResearch: {context}\nSearch or answer?")
+
+    def post(self, shared, prep_res, exec_res):
+        action = exec_res.split(":")[1].strip()
+        print(f"🤔 Agent decided to {action}")
+        return action
+
+class SearchWeb(Node):
+    """Searches and appends the results to the context."""
+
+    def prep(self, shared):
+        return shared["question"]
+
+    def exec(self, query):
+        return search_web(query)
+
+    def post(self, shared, prep_res, exec_res):
+        shared["context"] = shared.get("context", "") + exec_res
+        return "decide"
+
+class AnswerQuestion(Node):
+    """Answers from the research gathered so far."""
+
+    def exec(self, _):
+        return "An answer based on thorough research."
+
+    def post(self, shared, prep_res, exec_res):
+        shared["answer"] = exec_res
+        print("✅ Answered")
+
+class ForceAnswer(Node):
+    """Runs when the agent's budget is exhausted: answer with whatever we have."""
+
+    def prep(self, shared):
+        return shared["budget"]
+
+    def exec(self, report):
+        return f"Best-effort answer (stopped early: {report['exhausted']})."
+
+    def post(self, shared, prep_res, exec_res):
+        shared["answer"] = exec_res
+        print(f"⛔ Budget exhausted ({prep_res['exhausted']}), forcing an answer")
+
+class ReportUsage(Node):
+    """Prints what the agent spent, whichever way it finished."""
+
+    def prep(self, shared):
+        return shared["answer"], shared["budget"]
+
+    def post(self, shared, prep_res, exec_res):
+        answer, report = prep_res
+        print(f"Answer: {answer}")
+        print(f"Usage:  {report}")
@@ -0,0 +1,23 @@
+import random
+import time
+from guard import report_usage, estimate_tokens
+
+def call_llm(prompt):
+    """
+    Simulates an indecisive LLM that asks for one more search 95% of the time.
+    Reports its (estimated) usage so guarded flows can enforce token and cost limits.
+    """
+    time.sleep(0.05)
+    response = "action: answer" if random.random() < 0.05 else "action: search"
+    tokens = estimate_tokens(prompt) + estimate_tokens(response)
+    report_usage(tokens=tokens, cost=tokens * 5e-6)
+    return response
+
+def search_web(query):
+    """Simulates a web search."""
+    time.sleep(0.02)
+    return f"Some results about {query}. " * 20
+
+if __name__ == "__main__":
+    print(call_llm("Should I search?"))
+    print(search_web("pocketflow")[:60])
@@ -0,0 +1,30 @@
+from pocketflow import Flow, BatchFlow
+from lean import LeanFlow, LeanBatchFlow
+from nodes import LoadGrades, CalculateAverage, LeanLoadGrades, LeanCalculateAverage
+
+class ClassMixin:
+    """One batch item per student in the current class (prebuilt in shared)."""
+    def prep(self, shared):
+        return shared["student_params"][self.params["class"]]
+
+class SchoolMixin:
+    """One batch item per class in the school (prebuilt in shared)."""
+    def prep(self, shared):
+        return shared["class_params"]
+
+class ClassBatchFlow(ClassMixin, BatchFlow): pass
+class SchoolBatchFlow(SchoolMixin, BatchFlow): pass
+class LeanClassBatchFlow(ClassMixin, LeanBatchFlow): pass
+class LeanSchoolBatchFlow(SchoolMixin, LeanBatchFlow): pass
+
+def create_standard_flow():
+    """SchoolBatchFlow(ClassBatchFlow(Flow)) with the stock classes."""
+    load, calc = LoadGrades(), CalculateAverage()
+    load - "calculate" >> calc
+    return SchoolBatchFlow(start=ClassBatchFlow(start=Flow(start=load)))
+
+def create_lean_flow():
+    """The same graph built from the low-allocation classes."""
+    load, calc = LeanLoadGrades(), LeanCalculateAverage()
+    load - "calculate" >> calc
+    return LeanSchoolBatchFlow(start=LeanClassBatchFlow(start=LeanFlow(start=load)))
@@ -0,0 +1,64 @@
+import warnings
+from collections import ChainMap
+from functools import partial
+
+from pocketflow import Node, BatchNode, Flow, BatchFlow
+
+class LeanNode(Node):
+    """
+    Node with a retry loop that allocates nothing on the common path.
+
+    With max_retries=1 (the default) exec is called directly instead of
+    through a range() iterator, and cur_retry keeps its class default of 0
+    instead of being written to the instance dict on every call.
+    """
+    cur_retry = 0
+
+    def _exec(self, prep_res):
+        if self.max_retries == 1:
+            try: return self.exec(prep_res)
+            except Exception as e: return self.exec_fallback(prep_res, e)
+        # Not super(): in LeanBatchNode's MRO that would be BatchNode._exec
+        return Node._exec(self, prep_res)
+
+class LeanBatchNode(LeanNode, BatchNode):
+    """BatchNode that binds the per-item executor once instead of building a super() proxy per item."""
+
+    def _exec(self, items):
+        # LeanNode's fast path; super(BatchNode, self) would skip it and reach Node._exec
+        run_one = partial(LeanNode._exec, self)
+        return [run_one(i) for i in (items or [])]
+
+class LeanFlow(Flow):
+    """
+    Flow that runs its nodes in place instead of copying them every step.
+
+    Every node receives the same params mapping, and successors are looked up
+    directly on the node. This is only safe when nodes keep per-run state in
+    `shared` rather than on `self`, and when the same node object is never
+    run by two branches at once (so not under AsyncParallelBatchFlow).
+    """
+
+    def _orch(self, shared, params=None):
+        curr, p, last_action = self.start_node, (params if params is not None else self.params), None
+        while curr:
+            curr.params = p
+            last_action = curr._run(shared)
+            succ = curr.successors
+            curr = succ.get(last_action or "default")
+            if curr is None and succ: warnings.warn(f"Flow ends: '{last_action}' not found in {list(succ)}")
+        return last_action
+
+class LeanBatchFlow(LeanFlow, BatchFlow):
+    """
+    BatchFlow that layers each batch's params over the flow's own params with
+    one reused ChainMap instead of merging them into a new dict per item.
+    """
+
+    def _run(self, shared):
+        pr = self.prep(shared) or []
+        view = ChainMap({}, self.params)
+        for bp in pr:
+            view.maps[0] = bp
+            self._orch(shared, view)
+        return self.post(shared, pr, None)
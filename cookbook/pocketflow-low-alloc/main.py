@@ -0,0 +1,75 @@
+import sys
+import time
+import tracemalloc
+
+from flow import create_standard_flow, create_lean_flow
+from nodes import CalculateAverage
+
+def make_shared(num_classes, students_per_class):
+    """Builds the gradebook and the batch params up front so that the
+    benchmark only measures what the framework allocates."""
+    gradebook = {
+        f"class_{c}": {f"student_{s}": [7.0 + (s % 3), 8.0, 9.0 - (c % 2)] for s in range(students_per_class)}
+        for c in range(num_classes)
+    }
+    return {
+        "gradebook": gradebook,
+        "class_params": [{"class": c} for c in gradebook],
+        "student_params": {c: [{"student": s} for s in students] for c, students in gradebook.items()},
+        "totals": dict.fromkeys(gradebook, 0.0),
+    }
+
+def benchmark(create_flow, shared):
+    """Times one run of the whole nested flow."""
+    shared["totals"] = dict.fromkeys(shared["gradebook"], 0.0)
+    start = time.perf_counter()
+    create_flow().run(shared)
+    return shared["totals"], time.perf_counter() - start
+
+def run_allocations(create_flow):
+    """
+    Blocks and bytes the framework holds in the middle of one sub-flow run:
+    a tracemalloc snapshot taken inside CalculateAverage.exec, diffed with
+    one taken before the run. CPython can't count blocks that were already
+    freed, but the node copies and params dicts of the run are alive there.
+    """
+    shared, flow, snapshots = make_shared(1, 1), create_flow(), []
+    exec_ = CalculateAverage.exec
+    def probe(self, grades):
+        snapshots.append(tracemalloc.take_snapshot())
+        return exec_(self, grades)
+    CalculateAverage.exec = probe
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        flow.run(shared)
+    finally:
+        tracemalloc.stop()
+        CalculateAverage.exec = exec_
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+    diff = snapshots[0].filter_traces(ignore).compare_to(before.filter_traces(ignore), "filename")
+    return sum(d.count_diff for d in diff), sum(d.size_diff for d in diff)
+
+def main():
+    num_classes, students = 100, 1000
+    for arg in sys.argv[1:]:
+        if arg.startswith("--students="):
+            students = int(arg.split("=", 1)[1])
+    shared = make_shared(num_classes, students)
+    runs = num_classes * students
+    print(f"SchoolBatchFlow(ClassBatchFlow(Flow)) over {num_classes} classes x {students} students\n")
+
+    results = {}
+    for name, create_flow in [("standard", create_standard_flow), ("lean", create_lean_flow)]:
+        totals, elapsed = benchmark(create_flow, shared)
+        blocks, size = run_allocations(create_flow)
+        results[name] = (totals, elapsed)
+        print(f"=== {name} ===")
+        print(f"time: {elapsed:.2f}s ({elapsed / runs * 1e6:.2f} us per sub-flow run), "
+              f"allocations held during a sub-flow run: {blocks} blocks, {size:,} B\n")
+
+    assert results["standard"][0] == results["lean"][0], "lean flow changed the results"
+    print(f"Speedup: {results['standard'][1] / results['lean'][1]:.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+from pocketflow import Node
+from lean import LeanNode
+
+class LoadGrades(Node):
+    """Looks up one student's grades in the in-memory gradebook."""
+
+    def prep(self, shared):
+        return shared["gradebook"][self.params["class"]][self.params["student"]]
+
+    def exec(self, grades):
+        return grades
+
+    def post(self, shared, prep_res, grades):
+        shared["grades"] = grades
+        return "calculate"
+
+class CalculateAverage(Node):
+    """Averages the grades and records the result."""
+
+    def prep(self, shared):
+        return shared["grades"]
+
+    def exec(self, grades):
+        return sum(grades) / len(grades)
+
+    def post(self, shared, prep_res, average):
+        shared["totals"][self.params["class"]] += average
+        return "default"
+
+class LeanLoadGrades(LeanNode, LoadGrades):
+    """LoadGrades on the allocation-free retry path."""
+
+class LeanCalculateAverage(LeanNode, CalculateAverage):
+    """CalculateAverage on the allocation-free retry path."""
@@ -0,0 +1,9 @@
+from pocketflow import Flow
+
+from nodes import EmbedCorpus, ShardedSearch
+
+def create_flow(workers=4):
+    embed = EmbedCorpus()
+    search = ShardedSearch(workers=workers)
+    embed >> search
+    return Flow(start=embed)
@@ -0,0 +1,51 @@
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import time
+
+from flow import create_flow
+from store import MmapSharedStore
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def run(shared, label, checkpoint):
+    _, elapsed = timed(lambda: create_flow().run(shared))
+    _, saved = timed(checkpoint)
+    print(f"=== {label} ===")
+    print(f"Top hits: {shared['results'][:3]}")
+    print(f"Flow: {elapsed:.2f}s, checkpoint: {saved * 1000:.1f} ms\n")
+
+def main():
+    num_docs = 200_000
+    for arg in sys.argv[1:]:
+        if arg.startswith("--docs="):
+            num_docs = int(arg.split("=", 1)[1])
+    workdir = tempfile.mkdtemp(prefix="pocketflow-mmap-")
+    print(f"Searching {num_docs:,} embeddings with 4 worker processes\n")
+
+    try:
+        shared = {"num_docs": num_docs}
+        def pickle_dict():
+            with open(os.path.join(workdir, "shared.pkl"), "wb") as f:
+                pickle.dump(shared, f)
+        run(shared, "Plain dict (shards pickled to workers)", pickle_dict)
+
+        store = MmapSharedStore(os.path.join(workdir, "store"))
+        store["num_docs"] = num_docs
+        run(store, "MmapSharedStore (workers map the file)", store.checkpoint)
+        print(f"Store: {store!r}")
+
+        reopened, reopen = timed(lambda: MmapSharedStore(store.directory))
+        embeddings = reopened["embeddings"]
+        print(f"Reopened: {type(embeddings).__name__} {embeddings.shape}, writeable={embeddings.flags.writeable}, took {reopen * 1000:.1f} ms")
+        print(f"Results survive the restart: {reopened['results'] == store['results']}")
+    finally:
+        shutil.rmtree(workdir)
+
+if __name__ == "__main__":
+    main()
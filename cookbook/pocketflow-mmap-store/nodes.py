@@ -0,0 +1,53 @@
+import heapq
+from concurrent.futures import ProcessPoolExecutor
+
+from pocketflow import Node
+
+from store import MmapSharedStore
+from utils import get_embeddings, top_k
+
+class EmbedCorpus(Node):
+    def prep(self, shared):
+        return shared["num_docs"]
+
+    def exec(self, num_docs):
+        return get_embeddings(num_docs)
+
+    def post(self, shared, prep_res, exec_res):
+        shared["embeddings"] = exec_res
+        shared["doc_ids"] = [f"doc-{i}" for i in range(len(exec_res))]
+
+def _search_shard(shard, query, k, offset):
+    if isinstance(shard, tuple):
+        # (store directory, start, stop): map the rows in this process, nothing is pickled
+        directory, start, stop = shard
+        shard = MmapSharedStore(directory)["embeddings"][start:stop]
+    return top_k(shard, query, k, offset)
+
+class ShardedSearch(Node):
+    """Splits the corpus into row ranges and scores them in worker processes."""
+
+    def __init__(self, workers=4, k=5):
+        super().__init__()
+        self.workers, self.k = workers, k
+
+    def prep(self, shared):
+        embeddings = shared["embeddings"]
+        n = len(embeddings)
+        step = -(-n // self.workers)
+        if isinstance(shared, MmapSharedStore):
+            shared.checkpoint()  # so worker processes can open the store
+            shards = [((shared.directory, s, min(s + step, n)), s) for s in range(0, n, step)]
+        else:
+            shards = [(embeddings[s:s + step], s) for s in range(0, n, step)]
+        return shards, get_embeddings(1, seed=42)[0]
+
+    def exec(self, prep_res):
+        shards, query = prep_res
+        with ProcessPoolExecutor(self.workers) as pool:
+            futures = [pool.submit(_search_shard, shard, query, self.k, offset) for shard, offset in shards]
+            return [hit for f in futures for hit in f.result()]
+
+    def post(self, shared, prep_res, exec_res):
+        best = heapq.nlargest(self.k, exec_res)
+        shared["results"] = [(shared["doc_ids"][row], round(score, 4)) for score, row in best]
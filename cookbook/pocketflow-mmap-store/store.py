@@ -0,0 +1,154 @@
+import json
+import mmap
+import os
+import pickle
+import uuid
+from collections.abc import MutableMapping
+
+try:
+    import numpy as np
+except ImportError:  # bytes still work without NumPy
+    np = None
+
+class MmapSharedStore(MutableMapping):
+    """
+    A drop-in replacement for the `shared` dict that keeps large values on
+    disk and hands out zero-copy, memory-mapped views of them.
+
+    - NumPy arrays and bytes-like values of at least `threshold` bytes are
+      written once to `<directory>/<key>-<id>.npy|.bin`; reading them back
+      returns a read-only np.memmap or memoryview over the file.
+      Their keys must be strings, as the manifest is JSON.
+    - Everything else stays in an ordinary dict.
+
+    checkpoint() writes only the small values and a manifest, so saving a
+    flow's state costs O(small keys) however large the arrays are. Another
+    process can open the same directory and map the same pages: point the
+    directory at /dev/shm to keep everything in RAM.
+    """
+
+    MANIFEST = "manifest.json"
+    SMALL = "small.pkl"
+
+    def __init__(self, directory, threshold=1 << 20):
+        self.directory, self.threshold = directory, threshold
+        os.makedirs(directory, exist_ok=True)
+        self._small, self._large, self._views = {}, {}, {}   # large: key -> (filename, kind)
+        self._checkpointed, self._superseded = set(), []      # filenames the manifest on disk still names
+        manifest = os.path.join(directory, self.MANIFEST)
+        if os.path.exists(manifest):
+            with open(manifest) as f:
+                self._large = {k: tuple(v) for k, v in json.load(f).items()}
+            self._checkpointed = {filename for filename, _ in self._large.values()}
+            small = os.path.join(directory, self.SMALL)
+            if os.path.exists(small):
+                with open(small, "rb") as f:
+                    self._small = pickle.load(f)
+
+    # ---- MutableMapping --------------------------------------------------
+    def __getitem__(self, key):
+        if key in self._small:
+            return self._small[key]
+        if key not in self._large:
+            raise KeyError(key)
+        if key not in self._views:
+            self._views[key] = self._open(*self._large[key])
+        return self._views[key]
+
+    def __setitem__(self, key, value):
+        kind = self._large_kind(value)
+        if kind is None:
+            self._drop_large(key)
+            self._small[key] = value
+            return
+        if not isinstance(key, str):
+            # The manifest is JSON, whose object keys are strings: r[1] would come back as r["1"]
+            raise TypeError(f"keys of values stored on disk must be str, not {type(key).__name__}")
+        self._small.pop(key, None)
+        filename = f"{_safe(key)}-{uuid.uuid4().hex[:8]}.{'npy' if kind == 'ndarray' else 'bin'}"
+        path = os.path.join(self.directory, filename)
+        if kind == "ndarray":
+            np.save(path, np.ascontiguousarray(value), allow_pickle=False)
+        else:
+            with open(path, "wb") as f:
+                f.write(value)
+        self._drop_large(key)
+        self._large[key] = (filename, kind)
+
+    def __delitem__(self, key):
+        if key in self._small:
+            del self._small[key]
+        elif key in self._large:
+            self._drop_large(key)
+        else:
+            raise KeyError(key)
+
+    def __iter__(self):
+        yield from self._small
+        yield from self._large
+
+    def __len__(self):
+        return len(self._small) + len(self._large)
+
+    def __repr__(self):
+        return f"MmapSharedStore({self.directory!r}, small={list(self._small)}, mapped={list(self._large)})"
+
+    # ---- persistence -------------------------------------------------------
+    def checkpoint(self):
+        """
+        Persist the small values and the manifest. Large values are already on
+        disk; files they replaced are deleted once the new manifest is in place.
+        """
+        _atomic_write(os.path.join(self.directory, self.SMALL), pickle.dumps(self._small))
+        _atomic_write(os.path.join(self.directory, self.MANIFEST), json.dumps(self._large).encode())
+        for filename in self._superseded:
+            self._remove(filename)
+        self._superseded.clear()
+        self._checkpointed = {filename for filename, _ in self._large.values()}
+
+    def is_mapped(self, key):
+        return key in self._large
+
+    def path(self, key):
+        """The file behind a mapped key, for tools that can open it directly."""
+        return os.path.join(self.directory, self._large[key][0])
+
+    # ---- internals -----------------------------------------------------------
+    def _large_kind(self, value):
+        if np is not None and isinstance(value, np.ndarray) and value.dtype != object and value.nbytes >= self.threshold:
+            return "ndarray"
+        if isinstance(value, (bytes, bytearray, memoryview)) and len(value) >= self.threshold:
+            return "bytes"
+        return None
+
+    def _open(self, filename, kind):
+        path = os.path.join(self.directory, filename)
+        if kind == "ndarray":
+            return np.load(path, mmap_mode="r")
+        with open(path, "rb") as f:
+            return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def _drop_large(self, key):
+        entry = self._large.pop(key, None)
+        self._views.pop(key, None)
+        if entry is None:
+            return
+        if entry[0] in self._checkpointed:
+            # The last checkpoint still points at it; remove it after the next one
+            self._superseded.append(entry[0])
+        else:
+            self._remove(entry[0])
+
+    def _remove(self, filename):
+        # Views handed out earlier keep the unlinked file alive until they are released
+        try: os.remove(os.path.join(self.directory, filename))
+        except FileNotFoundError: pass
+
+def _safe(key):
+    return "".join(c if c.isalnum() or c in "-_" else "_" for c in str(key))[:40]
+
+def _atomic_write(path, data):
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
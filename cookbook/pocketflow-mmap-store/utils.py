@@ -0,0 +1,16 @@
+import numpy as np
+
+DIM = 384
+
+def get_embeddings(n, dim=DIM, seed=0):
+    """Simulated embedding model: n unit-length float32 vectors."""
+    rng = np.random.default_rng(seed)
+    vecs = rng.standard_normal((n, dim), dtype=np.float32)
+    vecs /= np.linalg.norm(vecs, axis=1, keepdims=True)
+    return vecs
+
+def top_k(embeddings, query, k, offset=0):
+    """Best k (score, row) pairs of one row range against a query vector."""
+    scores = embeddings @ query
+    idx = np.argpartition(-scores, min(k, len(scores) - 1))[:k]
+    return [(float(scores[i]), int(i) + offset) for i in idx]
@@ -0,0 +1,6 @@
+from pocketflow import AsyncFlow
+from nodes import AnswerAll
+
+def create_flow(max_retries=4, wait=0.2):
+    """One parallel batch node with retries, the thing we want to load-test."""
+    return AsyncFlow(start=AnswerAll(max_retries=max_retries, wait=wait))
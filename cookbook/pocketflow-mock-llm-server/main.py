@@ -0,0 +1,60 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+import time
+import urllib.request
+
+import utils
+from flow import create_flow
+from server import Profile, start_in_background
+
+def percentile(sorted_values, q):
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))] if sorted_values else float("nan")
+
+async def run_flow(shared, max_retries, wait):
+    # asyncio.to_thread's default pool has only min(32, cpus + 4) threads,
+    # which would queue requests on the client side and skew the latencies
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=len(shared["questions"])))
+    await create_flow(max_retries=max_retries, wait=wait).run_async(shared)
+
+def main():
+    # A well-behaved server for the wire-format demos
+    server, base_url = start_in_background(Profile(latency="fixed", latency_ms=150, tokens_per_sec=40,
+                                                   completion_tokens=12, embedding_dim=1536))
+    utils.BASE_URL = base_url
+    print(f"Mock server listening on {base_url}\n")
+
+    print("=== Streaming ===")
+    start = time.perf_counter()
+    for i, delta in enumerate(utils.stream_llm("Explain streaming in one line")):
+        if i == 0:
+            print(f"(first token after {(time.perf_counter() - start) * 1000:.0f}ms)")
+        print(delta, end="", flush=True)
+    print(f"\n(done after {(time.perf_counter() - start) * 1000:.0f}ms)\n")
+
+    print("=== Deterministic embeddings ===")
+    a, b = utils.get_embedding("PocketFlow"), utils.get_embedding("PocketFlow")
+    print(f"dim={len(a)}, identical={a == b}, norm={sum(x * x for x in a):.3f}\n")
+    server.shutdown()
+
+    # A flaky, slow server for the load test
+    profile = Profile(latency="lognormal", latency_ms=200, latency_p95_ms=800, tokens_per_sec=200,
+                      completion_tokens=20, error_429_rate=0.15, error_500_rate=0.05, seed=1)
+    server, base_url = start_in_background(profile)
+    utils.BASE_URL = base_url
+
+    print("=== 100 parallel questions, 15% 429s + 5% 500s, up to 4 attempts each ===")
+    shared = {"questions": [f"Question {i}?" for i in range(100)]}
+    start = time.perf_counter()
+    asyncio.run(run_flow(shared, max_retries=4, wait=0.2))
+    elapsed = time.perf_counter() - start
+    failed = sum(a.startswith("FAILED") for a in shared["answers"])
+    lat = shared["latencies"]
+    print(f"answered: {100 - failed}, failed after retries: {failed}, took {elapsed:.2f}s")
+    print(f"successful-call latency p50={percentile(lat, 0.5) * 1000:.0f}ms p95={percentile(lat, 0.95) * 1000:.0f}ms")
+    with urllib.request.urlopen(f"{base_url}/stats") as r:
+        print(f"server counts: {json.loads(r.read())}")
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
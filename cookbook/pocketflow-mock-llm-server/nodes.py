@@ -0,0 +1,22 @@
+import asyncio
+import time
+from pocketflow import AsyncParallelBatchNode
+from utils import call_llm
+
+class AnswerAll(AsyncParallelBatchNode):
+    """Fires every question at the server at once and retries failed calls."""
+
+    async def prep_async(self, shared):
+        return shared["questions"]
+
+    async def exec_async(self, question):
+        start = time.perf_counter()
+        answer = await asyncio.to_thread(call_llm, question)
+        return answer, time.perf_counter() - start
+
+    async def exec_fallback_async(self, question, exc):
+        return f"FAILED: {exc}", None
+
+    async def post_async(self, shared, prep_res, exec_res_list):
+        shared["answers"] = [a for a, _ in exec_res_list]
+        shared["latencies"] = sorted(t for _, t in exec_res_list if t is not None)
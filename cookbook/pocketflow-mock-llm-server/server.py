@@ -0,0 +1,246 @@
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class Profile:
+    """
+    How the mock server behaves.
+
+    latency:            "fixed", "uniform" or "lognormal" time to first token
+    latency_ms:         fixed value, or the median for the other distributions
+    latency_p95_ms:     p95 for "lognormal", upper bound for "uniform"
+    tokens_per_sec:     generation speed, for both streaming and full responses
+    completion_tokens:  length of every chat completion
+    error_429_rate:     fraction of requests rejected as rate-limited
+    error_500_rate:     fraction of requests failing with a server error
+    rpm:                real requests-per-minute limit (None = unlimited)
+    embedding_dim:      size of the deterministic embeddings
+    seed:               seed for latency and error sampling
+    """
+
+    def __init__(self, latency="lognormal", latency_ms=300, latency_p95_ms=1200, tokens_per_sec=80,
+                 completion_tokens=60, error_429_rate=0.0, error_500_rate=0.0, rpm=None,
+                 embedding_dim=1536, seed=0):
+        self.latency, self.latency_ms, self.latency_p95_ms = latency, latency_ms, latency_p95_ms
+        self.tokens_per_sec, self.completion_tokens = tokens_per_sec, completion_tokens
+        self.error_429_rate, self.error_500_rate, self.rpm = error_429_rate, error_500_rate, rpm
+        self.embedding_dim, self.seed = embedding_dim, seed
+
+class MockState:
+    """Random sampling, the rpm window and request counters, shared by all handler threads."""
+
+    def __init__(self, profile):
+        self.profile = profile
+        self.rng = random.Random(profile.seed)
+        self.lock = threading.Lock()
+        self.window = []   # request timestamps within the last minute
+        self.counts = {"requests": 0, "200": 0, "429": 0, "500": 0}
+
+    def sample_latency(self):
+        p = self.profile
+        with self.lock:
+            if p.latency == "fixed":
+                ms = p.latency_ms
+            elif p.latency == "uniform":
+                ms = self.rng.uniform(p.latency_ms, p.latency_p95_ms)
+            else:
+                mu = math.log(p.latency_ms)
+                sigma = max(math.log(p.latency_p95_ms) - mu, 0) / 1.645
+                ms = self.rng.lognormvariate(mu, sigma)
+        return ms / 1000
+
+    def admit(self):
+        """Returns the status code to fail with, or None to serve the request."""
+        p = self.profile
+        with self.lock:
+            self.counts["requests"] += 1
+            now = time.monotonic()
+            if p.rpm is not None:
+                self.window = [t for t in self.window if now - t < 60]
+                if len(self.window) >= p.rpm:
+                    self.counts["429"] += 1
+                    return 429
+                self.window.append(now)
+            r = self.rng.random()
+            if r < p.error_429_rate:
+                self.counts["429"] += 1
+                return 429
+            if r < p.error_429_rate + p.error_500_rate:
+                self.counts["500"] += 1
+                return 500
+            self.counts["200"] += 1
+            return None
+
+def count_tokens(text):
+    """About 4 characters per token, like the OpenAI tokenizers on English text."""
+    return max(1, len(text) // 4)
+
+def deterministic_embedding(text, dim):
+    """Unit-length Gaussian vector seeded by the text: same text, same vector, on any machine."""
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+    rng = random.Random(seed)
+    v = [rng.gauss(0, 1) for _ in range(dim)]
+    norm = math.sqrt(sum(x * x for x in v)) or 1.0
+    return [x / norm for x in v]
+
+def completion_words(messages, n):
+    """A deterministic reply of n tokens that echoes the last user message."""
+    last = next((m.get("content") or "" for m in reversed(messages) if m.get("role") == "user"), "")
+    words = re.findall(r"\w+", last) or ["mock"]
+    return [f" {words[i % len(words)]}" if i else f"Mock reply: {words[0]}" for i in range(n)]
+
+class MockOpenAIHandler(BaseHTTPRequestHandler):
+    """Speaks the OpenAI chat-completions (plain and streaming) and embeddings wire formats."""
+    protocol_version = "HTTP/1.1"
+    state = None  # set by make_server
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            return self._json(200, {"object": "list", "data": [
+                {"id": "gpt-4o", "object": "model", "owned_by": "mock"},
+                {"id": "text-embedding-ada-002", "object": "model", "owned_by": "mock"}]})
+        if self.path.rstrip("/").endswith("/stats"):
+            return self._json(200, self.state.counts)
+        self._error(404, "not_found", f"Unknown path {self.path}")
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            return self._error(400, "invalid_request_error", "Body is not valid JSON")
+        path = self.path.rstrip("/")
+        if not (path.endswith("/chat/completions") or path.endswith("/embeddings")):
+            return self._error(404, "not_found", f"Unknown path {self.path}")
+
+        status = self.state.admit()
+        if status == 429:
+            return self._error(429, "rate_limit_exceeded", "Rate limit reached (mock)", {"Retry-After": "1"})
+        if status == 500:
+            return self._error(500, "server_error", "The server had an error (mock)")
+
+        time.sleep(self.state.sample_latency())
+        if path.endswith("/embeddings"):
+            return self._embeddings(body)
+        if body.get("stream"):
+            return self._stream(body)
+        return self._chat(body)
+
+    def _chat(self, body):
+        p = self.state.profile
+        messages = body.get("messages", [])
+        words = completion_words(messages, body.get("max_tokens") or p.completion_tokens)
+        time.sleep(len(words) / p.tokens_per_sec)
+        prompt_tokens = sum(count_tokens(m.get("content") or "") for m in messages)
+        self._json(200, {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": "".join(words)}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(words),
+                      "total_tokens": prompt_tokens + len(words)},
+        })
+
+    def _stream(self, body):
+        p = self.state.profile
+        words = completion_words(body.get("messages", []), body.get("max_tokens") or p.completion_tokens)
+        cid, created, model = f"chatcmpl-{uuid.uuid4().hex[:24]}", int(time.time()), body.get("model", "gpt-4o")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+
+        def send(delta, finish=None):
+            chunk = {"id": cid, "object": "chat.completion.chunk", "created": created, "model": model,
+                     "choices": [{"index": 0, "delta": delta, "finish_reason": finish}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        try:
+            send({"role": "assistant", "content": ""})
+            for w in words:
+                time.sleep(1 / p.tokens_per_sec)
+                send({"content": w})
+            send({}, "stop")
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client stopped reading, e.g. a user interrupt
+        self.close_connection = True
+
+    def _embeddings(self, body):
+        inputs = body.get("input", "")
+        inputs = [inputs] if isinstance(inputs, str) else inputs
+        dim = body.get("dimensions") or self.state.profile.embedding_dim
+        data = [{"object": "embedding", "index": i, "embedding": deterministic_embedding(str(t), dim)}
+                for i, t in enumerate(inputs)]
+        tokens = sum(count_tokens(str(t)) for t in inputs)
+        self._json(200, {"object": "list", "data": data, "model": body.get("model", "text-embedding-ada-002"),
+                         "usage": {"prompt_tokens": tokens, "total_tokens": tokens}})
+
+    def _error(self, status, code, message, headers=None):
+        self._json(status, {"error": {"message": message, "type": code, "code": code, "param": None}}, headers)
+
+    def _json(self, status, payload, headers=None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+def make_server(profile=None, host="127.0.0.1", port=8000):
+    """Builds a threaded mock server. Use port=0 to pick a free port."""
+    handler = type("Handler", (MockOpenAIHandler,), {"state": MockState(profile or Profile())})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+def start_in_background(profile=None, host="127.0.0.1", port=0):
+    """Starts the server on a daemon thread and returns (server, base_url)."""
+    server = make_server(profile, host, port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock OpenAI server for load-testing PocketFlow cookbooks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", choices=["fixed", "uniform", "lognormal"], default="lognormal")
+    parser.add_argument("--latency-ms", type=float, default=300)
+    parser.add_argument("--latency-p95-ms", type=float, default=1200)
+    parser.add_argument("--tokens-per-sec", type=float, default=80)
+    parser.add_argument("--completion-tokens", type=int, default=60)
+    parser.add_argument("--error-429-rate", type=float, default=0.0)
+    parser.add_argument("--error-500-rate", type=float, default=0.0)
+    parser.add_argument("--rpm", type=int, default=None)
+    parser.add_argument("--embedding-dim", type=int, default=1536)
+    parser.add_argument("--seed", type=int, default=0)
+    a = parser.parse_args()
+    profile = Profile(a.latency, a.latency_ms, a.latency_p95_ms, a.tokens_per_sec, a.completion_tokens,
+                      a.error_429_rate, a.error_500_rate, a.rpm, a.embedding_dim, a.seed)
+    server = make_server(profile, a.host, a.port)
+    print(f"Mock OpenAI server on http://{a.host}:{server.server_address[1]}/v1")
+    print(f"Point the cookbooks at it with: export OPENAI_BASE_URL=http://{a.host}:{server.server_address[1]}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import json
+import os
+import urllib.error
+import urllib.request
+
+# Minimal stdlib clients so the demo runs without the openai package. The
+# cookbook utils that use `OpenAI(...)` need no changes at all: the client
+# reads OPENAI_BASE_URL, so `export OPENAI_BASE_URL=http://127.0.0.1:8000/v1`
+# sends them to the mock server.
+
+BASE_URL = os.environ.get("OPENAI_BASE_URL", "http://127.0.0.1:8000/v1")
+
+class APIError(Exception):
+    def __init__(self, status, message):
+        super().__init__(f"{status}: {message}")
+        self.status = status
+
+def _post(path, payload, stream=False):
+    req = urllib.request.Request(f"{BASE_URL}{path}", data=json.dumps(payload).encode("utf-8"),
+                                 headers={"Content-Type": "application/json"})
+    try:
+        return urllib.request.urlopen(req, timeout=30)
+    except urllib.error.HTTPError as e:
+        raise APIError(e.code, json.loads(e.read())["error"]["message"]) from None
+
+def call_llm(prompt):
+    with _post("/chat/completions", {"model": "gpt-4o", "messages": [{"role": "user", "content": prompt}]}) as r:
+        return json.loads(r.read())["choices"][0]["message"]["content"]
+
+def stream_llm(prompt):
+    """Yields content deltas as they arrive over server-sent events."""
+    payload = {"model": "gpt-4o", "stream": True, "messages": [{"role": "user", "content": prompt}]}
+    with _post("/chat/completions", payload) as r:
+        for line in r:
+            line = line.decode("utf-8").strip()
+            if not line.startswith("data: ") or line == "data: [DONE]":
+                continue
+            content = json.loads(line[6:])["choices"][0]["delta"].get("content")
+            if content:
+                yield content
+
+def get_embedding(text):
+    with _post("/embeddings", {"model": "text-embedding-ada-002", "input": text}) as r:
+        return json.loads(r.read())["data"][0]["embedding"]
+
+if __name__ == "__main__":
+    print(call_llm("What is the meaning of life?"))
+    print("".join(stream_llm("Tell me a story")))
+    print(len(get_embedding("hello")))
@@ -0,0 +1,17 @@
+from pocketflow import Flow
+from nodes import LoadDocs, ExtractFeatures, SerializeFeatures, Summarize
+
+class FeatureFlow(Flow):
+    """Feature extraction, nested inside the pipeline."""
+
+class PipelineFlow(Flow):
+    """Load, extract features, summarize."""
+
+def create_flow():
+    extract, serialize = ExtractFeatures(), SerializeFeatures()
+    extract >> serialize
+    features = FeatureFlow(start=extract)
+
+    load, summarize = LoadDocs(), Summarize()
+    load >> features >> summarize
+    return PipelineFlow(start=load)
@@ -0,0 +1,34 @@
+import os
+
+from flow import create_flow
+from profiler import NodeProfiler
+
+def main():
+    flow = create_flow()
+    with NodeProfiler(flow, interval=0.001) as prof:
+        flow.run({"num_docs": 40})
+
+    os.makedirs("output", exist_ok=True)
+    with open("output/profile.collapsed", "w") as f:
+        f.write(prof.collapsed())
+    with open("output/profile.speedscope.json", "w") as f:
+        f.write(prof.speedscope("PipelineFlow"))
+
+    print(f"Profiled {prof.duration:.2f}s, {sum(prof.samples.values())} samples\n")
+    print("=== Wall-clock time by node phase (inclusive) ===")
+    for phase, seconds, share in prof.time_by_phase():
+        print(f"{phase:<28} {seconds * 1000:7.1f} ms {share:6.1%}")
+
+    print("\n=== Exact CPU time and allocations per phase ===")
+    print(f"{'phase':<28} {'calls':>6} {'CPU ms':>9} {'net KB':>9} {'peak KB':>9}")
+    for phase, (calls, cpu, net, peak) in sorted(prof.phase_stats.items(), key=lambda kv: -kv[1][1]):
+        print(f"{phase:<28} {calls:>6} {cpu * 1000:9.1f} {net / 1024:9.1f} {peak / 1024:9.1f}")
+
+    print("\n=== Hottest stacks ===")
+    for stack, seconds in prof.seconds.most_common(3):
+        print(f"{seconds * 1000:7.1f} ms  {';'.join(stack)}")
+
+    print("\nWrote output/profile.collapsed (flamegraph.pl) and output/profile.speedscope.json (speedscope.app)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import json
+import re
+import time
+from pocketflow import Node, BatchNode
+
+def tokenize(text):
+    """CPU-heavy: a regex pass plus pure-Python n-gram counting."""
+    words = re.findall(r"[a-z]+", text.lower())
+    grams = {}
+    for n in (1, 2, 3):
+        for i in range(len(words) - n + 1):
+            g = " ".join(words[i:i + n])
+            grams[g] = grams.get(g, 0) + 1
+    return grams
+
+def call_llm(prompt):
+    """Stands in for a network call: no CPU, just waiting."""
+    time.sleep(0.02)
+    return f"summary of {len(prompt)} chars"
+
+class LoadDocs(Node):
+    def prep(self, shared):
+        return shared["num_docs"]
+
+    def exec(self, n):
+        return [("lorem ipsum dolor sit amet consectetur " * 400) + str(i) for i in range(n)]
+
+    def post(self, shared, prep_res, exec_res):
+        shared["docs"] = exec_res
+
+class ExtractFeatures(BatchNode):
+    def prep(self, shared):
+        return shared["docs"]
+
+    def exec(self, doc):
+        return tokenize(doc)
+
+    def post(self, shared, prep_res, exec_res_list):
+        shared["features"] = exec_res_list
+
+class SerializeFeatures(Node):
+    def prep(self, shared):
+        return shared["features"]
+
+    def exec(self, features):
+        # Allocation-heavy: one big JSON string per document
+        return [json.dumps(f, sort_keys=True) for f in features]
+
+    def post(self, shared, prep_res, exec_res):
+        shared["serialized"] = exec_res
+
+class Summarize(BatchNode):
+    def prep(self, shared):
+        return shared["serialized"][:5]
+
+    def exec(self, blob):
+        return call_llm(blob[:200])
+
+    def post(self, shared, prep_res, exec_res_list):
+        shared["summaries"] = exec_res_list
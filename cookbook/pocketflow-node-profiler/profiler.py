@@ -0,0 +1,210 @@
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+import pocketflow
+from pocketflow import BaseNode, Flow
+
+PHASES = ("prep", "exec", "post", "exec_fallback", "prep_async", "exec_async", "post_async", "exec_fallback_async")
+_FRAMEWORK_FILES = {os.path.abspath(pocketflow.__file__), os.path.abspath(__file__)}
+
+def _graph_classes(flow):
+    seen, stack, classes = set(), [flow], set()
+    while stack:
+        node = stack.pop()
+        if node is None or id(node) in seen:
+            continue
+        seen.add(id(node))
+        classes.add(type(node))
+        stack.extend(node.successors.values())
+        if isinstance(node, Flow):
+            stack.append(node.start_node)
+    return classes
+
+class NodeProfiler:
+    """
+    Sampling profiler that attributes time to flow paths and node phases
+    instead of to PocketFlow's orchestration frames.
+
+    A background thread samples the profiled thread's stack every `interval`
+    seconds. Frames are rewritten so that:
+      - each running flow becomes one frame named after its class
+        (so nested flows read as a call path: Outer;Inner;Node.exec)
+      - each node method in PHASES becomes "NodeClass.phase"
+      - PocketFlow's own frames (_orch, _run, _exec, ...) and the
+        profiler's wrappers are dropped
+      - user code below a node phase is kept as "function (file:line)"
+    Samples outside any flow are ignored.
+
+    The sampler sees wall-clock stacks. For async flows, the event loop's
+    thread only has a coroutine's frames on it while that coroutine runs, so
+    the samples approximate CPU time. For sync flows, time blocked in I/O
+    counts too. Use `measure_phases=True` for exact per-phase CPU time and
+    allocations.
+    """
+
+    def __init__(self, flow, interval=0.001, measure_phases=True):
+        self.flow, self.interval, self.measure_phases = flow, interval, measure_phases
+        self.samples = Counter()   # tuple of frame names (root first) -> count
+        self.seconds = Counter()   # same keys -> wall time measured between samples
+        self.phase_stats = {}      # "Node.phase" -> [calls, cpu seconds, net bytes, peak bytes]
+        self.duration = 0.0
+        self._node_codes, self._flow_codes = {}, set()
+        for cls in _graph_classes(flow):
+            for phase in PHASES:
+                fn = getattr(cls, phase, None)
+                if fn is not None and hasattr(fn, "__code__"):
+                    self._node_codes[fn.__code__] = phase
+            if issubclass(cls, Flow):
+                for name in ("_orch", "_orch_async"):
+                    fn = getattr(cls, name, None)
+                    if fn is not None:
+                        self._flow_codes.add(fn.__code__)
+        self._stop = threading.Event()
+        self._saved = []
+
+    # ---- sampling --------------------------------------------------------
+    def __enter__(self):
+        self._target = threading.get_ident()
+        self._started = time.perf_counter()
+        if self.measure_phases:
+            self._patch_phases()
+        self._thread = threading.Thread(target=self._sample_loop, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self._unpatch_phases()
+        self.duration = time.perf_counter() - self._started
+
+    def _sample_loop(self):
+        # The sampler wakes less often than `interval` when the profiled thread
+        # holds the GIL, so each sample is charged the time since the previous one
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            elapsed, last = now - last, now
+            frame = sys._current_frames().get(self._target)
+            if frame is not None:
+                stack = self._rewrite(frame)
+                if stack:
+                    self.samples[stack] += 1
+                    self.seconds[stack] += elapsed
+
+    def _rewrite(self, frame):
+        raw = []
+        while frame is not None:
+            raw.append(frame)
+            frame = frame.f_back
+        out, inside = [], False
+        for f in reversed(raw):
+            code = f.f_code
+            if code in self._flow_codes:
+                self_ = f.f_locals.get("self")
+                if isinstance(self_, Flow):
+                    out.append(type(self_).__name__)
+                    inside = True
+                continue
+            if not inside:
+                continue
+            if code in self._node_codes:
+                self_ = f.f_locals.get("self")
+                if isinstance(self_, BaseNode):
+                    out.append(f"{type(self_).__name__}.{self._node_codes[code]}")
+                    continue
+            if os.path.abspath(code.co_filename) in _FRAMEWORK_FILES:
+                continue
+            out.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        return tuple(out)
+
+    # ---- exact per-phase CPU time and allocations -------------------------
+    def _patch_phases(self):
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        self._stop_tracemalloc = not tracing
+        patches = []
+        for cls in _graph_classes(self.flow):
+            if issubclass(cls, Flow):
+                continue
+            for phase in PHASES:
+                fn = getattr(cls, phase, None)
+                if fn is not None:
+                    patches.append((cls, phase, fn, phase.endswith("_async")))
+        for cls, phase, fn, is_async in patches:
+            self._saved.append((cls, phase, cls.__dict__.get(phase)))
+            setattr(cls, phase, self._wrap_phase(phase, fn, is_async))
+
+    def _unpatch_phases(self):
+        for cls, phase, own in reversed(self._saved):
+            if own is None: delattr(cls, phase)
+            else: setattr(cls, phase, own)
+        self._saved.clear()
+        if getattr(self, "_stop_tracemalloc", False):
+            tracemalloc.stop()
+
+    def _wrap_phase(self, phase, fn, is_async):
+        profiler = self
+        def begin():
+            tracemalloc.reset_peak()
+            return time.thread_time(), tracemalloc.get_traced_memory()[0]
+        def end(node, started):
+            cpu0, mem0 = started
+            mem1, peak = tracemalloc.get_traced_memory()
+            s = profiler.phase_stats.setdefault(f"{type(node).__name__}.{phase}", [0, 0.0, 0, 0])
+            s[0] += 1
+            s[1] += time.thread_time() - cpu0
+            s[2] += mem1 - mem0
+            s[3] = max(s[3], peak - mem0)
+        if is_async:
+            async def timed_async(self, *args):
+                started = begin()
+                try: return await fn(self, *args)
+                finally: end(self, started)
+            return timed_async
+        def timed(self, *args):
+            started = begin()
+            try: return fn(self, *args)
+            finally: end(self, started)
+        return timed
+
+    # ---- exports -----------------------------------------------------------
+    def collapsed(self):
+        """Brendan Gregg's collapsed-stack format, for flamegraph.pl or speedscope, weighted in microseconds."""
+        return "\n".join(f"{';'.join(stack)} {round(self.seconds[stack] * 1e6)}" for stack in sorted(self.samples)) + "\n"
+
+    def speedscope(self, name="PocketFlow profile"):
+        """A speedscope 'sampled' profile (https://www.speedscope.app), weighted by measured wall time."""
+        frames, index, samples, weights = [], {}, [], []
+        for stack in sorted(self.samples):
+            ids = []
+            for f in stack:
+                if f not in index:
+                    index[f] = len(frames)
+                    frames.append({"name": f})
+                ids.append(index[f])
+            samples.append(ids)
+            weights.append(self.seconds[stack])
+        return json.dumps({
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames},
+            "profiles": [{"type": "sampled", "name": name, "unit": "seconds", "startValue": 0,
+                          "endValue": sum(weights), "samples": samples, "weights": weights}],
+            "name": name,
+            "exporter": "pocketflow-node-profiler",
+        })
+
+    def time_by_phase(self):
+        """Wall-clock seconds per innermost node phase, including everything it called, sorted by share."""
+        totals = Counter()
+        for stack, seconds in self.seconds.items():
+            phase = next((f for f in reversed(stack) if "." in f and " (" not in f), None)
+            totals[phase or stack[-1]] += seconds
+        n = sum(totals.values()) or 1
+        return [(k, v, v / n) for k, v in totals.most_common()]
@@ -0,0 +1,19 @@
+from pocketflow import AsyncFlow
+from policy import PolicyParallelBatchFlow, FAIL_FAST
+from nodes import TranslateSentences, TranslateDocument
+
+class TranslateDocuments(PolicyParallelBatchFlow):
+    """Runs the single-document flow for every document in parallel."""
+
+    async def prep_async(self, shared):
+        return [{"doc": doc} for doc in shared["docs"]]
+
+    async def post_async(self, shared, prep_res, exec_res):
+        shared["failed_docs"] = [prep_res[i]["doc"] for i in exec_res.errors]
+        return "default"
+
+def create_sentence_flow(error_policy=FAIL_FAST):
+    return AsyncFlow(start=TranslateSentences(error_policy=error_policy))
+
+def create_document_flow(error_policy=FAIL_FAST):
+    return TranslateDocuments(start=AsyncFlow(start=TranslateDocument()), error_policy=error_policy)
@@ -0,0 +1,36 @@
+import asyncio
+import time
+
+from flow import create_sentence_flow, create_document_flow
+from policy import FAIL_FAST, COLLECT_ERRORS, tolerate, BatchFailedError
+from utils import stats
+
+SENTENCES = [f"sentence {i}" for i in range(20)]
+SENTENCES[1] = "BAD sentence 1"
+SENTENCES[4] = "BAD sentence 4"
+
+async def run(name, flow, shared):
+    stats.reset()
+    start = time.perf_counter()
+    try:
+        await flow.run_async(shared)
+        outcome = f"ok, {len(shared.get('errors', shared.get('failed_docs', [])))} failure(s) reported"
+    except BatchFailedError as e:
+        outcome = f"BatchFailedError: {e}"
+    elapsed = time.perf_counter() - start
+    print(f"=== {name} ===")
+    print(f"{outcome}")
+    print(f"calls started: {stats.started}, finished: {stats.finished}, "
+          f"cancelled: {stats.cancelled}, took {elapsed:.2f}s\n")
+
+async def main():
+    await run("Fail fast", create_sentence_flow(FAIL_FAST), {"sentences": SENTENCES})
+    await run("Tolerate 1 failure", create_sentence_flow(tolerate(1)), {"sentences": SENTENCES})
+    await run("Tolerate 2 failures", create_sentence_flow(tolerate(2)), {"sentences": SENTENCES})
+    await run("Collect errors", create_sentence_flow(COLLECT_ERRORS), {"sentences": SENTENCES})
+
+    docs = ["report.txt", "BAD scan.pdf", "notes.md"]
+    await run("Parallel batch flow, collect errors", create_document_flow(COLLECT_ERRORS), {"docs": docs})
+
+if __name__ == "__main__":
+    asyncio.run(main())
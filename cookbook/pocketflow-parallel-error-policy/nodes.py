@@ -0,0 +1,30 @@
+from pocketflow import AsyncNode
+from policy import PolicyParallelBatchNode
+from utils import call_llm_async
+
+class TranslateSentences(PolicyParallelBatchNode):
+    """Translates every sentence in parallel under the configured error policy."""
+
+    async def prep_async(self, shared):
+        return list(enumerate(shared["sentences"]))
+
+    async def exec_async(self, item):
+        i, sentence = item
+        # Later sentences take longer, so a fast failure leaves work in flight
+        return await call_llm_async(sentence, delay=0.1 + 0.05 * i)
+
+    async def post_async(self, shared, prep_res, exec_res_list):
+        shared["translations"] = exec_res_list.successes()
+        shared["errors"] = exec_res_list.errors
+        return "default"
+
+class TranslateDocument(AsyncNode):
+    """Translates one document, used as the sub-flow of a parallel batch flow."""
+
+    async def exec_async(self, _):
+        doc = self.params["doc"]
+        return await call_llm_async(doc, delay=0.2)
+
+    async def post_async(self, shared, prep_res, exec_res):
+        shared.setdefault("documents", {})[self.params["doc"]] = exec_res
+        return "default"
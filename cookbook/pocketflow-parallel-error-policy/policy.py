@@ -0,0 +1,95 @@
+import asyncio
+
+from pocketflow import AsyncParallelBatchNode, AsyncParallelBatchFlow
+
+FAIL_FAST = 0         # the first failure dooms the batch
+COLLECT_ERRORS = None # never give up; report every failure to post
+
+def tolerate(n):
+    """Policy that accepts up to `n` failed items before giving up."""
+    if n < 0:
+        raise ValueError("n must be >= 0")
+    return n
+
+class BatchFailedError(Exception):
+    """Raised when a batch has more failures than its policy tolerates."""
+
+    def __init__(self, errors, max_failures):
+        self.errors = errors
+        super().__init__(f"{len(errors)} item(s) failed, policy tolerates {max_failures}")
+
+class BatchResults(list):
+    """
+    Results in item order. Failed items hold None, and `errors` maps each
+    failed item's index to its exception.
+    """
+
+    def __init__(self, results, errors):
+        super().__init__(results)
+        self.errors = errors
+
+    def successes(self):
+        return [r for i, r in enumerate(self) if i not in self.errors]
+
+async def gather_with_policy(coros, max_failures=FAIL_FAST):
+    """
+    Like asyncio.gather, but stops as soon as the batch is doomed.
+
+    Every coroutine runs as its own task. Once more than `max_failures` of
+    them have raised, the remaining siblings are cancelled and awaited, then
+    BatchFailedError is raised from the first exception. The siblings are
+    also cancelled if the caller itself is cancelled.
+    """
+    tasks = [asyncio.ensure_future(c) for c in coros]
+    index = {t: i for i, t in enumerate(tasks)}
+    results, errors = [None] * len(tasks), {}
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for t in done:
+                exc = t.exception()
+                if exc is None:
+                    results[index[t]] = t.result()
+                else:
+                    errors[index[t]] = exc
+            if max_failures is not None and len(errors) > max_failures:
+                first = errors[min(errors)]
+                raise BatchFailedError(dict(sorted(errors.items())), max_failures) from first
+    finally:
+        for t in pending:
+            t.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+    return BatchResults(results, dict(sorted(errors.items())))
+
+class PolicyParallelBatchNode(AsyncParallelBatchNode):
+    """
+    AsyncParallelBatchNode with an error policy. An item counts as failed only
+    after its retries and exec_fallback_async have been exhausted.
+
+    error_policy: FAIL_FAST (default), COLLECT_ERRORS, or tolerate(n).
+    With any policy that lets the batch finish, post receives BatchResults.
+    """
+
+    def __init__(self, max_retries=1, wait=0, error_policy=FAIL_FAST):
+        super().__init__(max_retries=max_retries, wait=wait)
+        self.error_policy = error_policy
+
+    async def _exec(self, items):
+        return await gather_with_policy((super(AsyncParallelBatchNode, self)._exec(i) for i in items), self.error_policy)
+
+class PolicyParallelBatchFlow(AsyncParallelBatchFlow):
+    """
+    AsyncParallelBatchFlow with an error policy applied to its sub-flow runs.
+    post receives BatchResults holding each run's last action.
+    """
+
+    def __init__(self, start=None, error_policy=FAIL_FAST):
+        super().__init__(start=start)
+        self.error_policy = error_policy
+
+    async def _run_async(self, shared):
+        pr = await self.prep_async(shared) or []
+        res = await gather_with_policy((self._orch_async(shared, {**self.params, **bp}) for bp in pr), self.error_policy)
+        return await self.post_async(shared, pr, res)
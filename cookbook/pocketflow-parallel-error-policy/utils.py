@@ -0,0 +1,28 @@
+import asyncio
+
+class CallStats:
+    """Counts simulated LLM calls so the demo can show wasted work."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.started = self.finished = self.cancelled = 0
+
+stats = CallStats()
+
+async def call_llm_async(prompt, delay):
+    """Simulates an LLM call. Prompts containing 'BAD' fail after `delay` seconds."""
+    stats.started += 1
+    try:
+        await asyncio.sleep(delay)
+    except asyncio.CancelledError:
+        stats.cancelled += 1
+        raise
+    stats.finished += 1
+    if "BAD" in prompt:
+        raise ValueError(f"Model refused: {prompt!r}")
+    return prompt.upper()
+
+if __name__ == "__main__":
+    print(asyncio.run(call_llm_async("hello", 0.1)))
@@ -0,0 +1,175 @@
+import math
+
+import faiss
+import numpy as np
+
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw")
+
+# How each vector is stored: 4, 2 or 1 byte(s) per dimension, or ~1/8 byte with PQ
+STORAGE_TYPES = ("float32", "float16", "int8", "pq")
+
+# Vectors needed to train each type: k-means wants ~39 points per centroid, and PQ has 256 centroids per code
+_MIN_TRAIN = {"ivf_flat": 39, "ivf_pq": 39 * 256, "pq": 39 * 256}
+
+# faiss types that keep full float32 vectors, so their distances are already exact
+_EXACT = ("IndexFlat", "IndexFlatL2", "IndexIVFFlat", "IndexHNSWFlat")
+
+def default_nlist(n):
+    """Number of IVF lists: about 4 * sqrt(n), with enough vectors per list to train."""
+    return max(1, min(int(4 * math.sqrt(n)), n // 39))
+
+def default_pq_m(dim):
+    """PQ sub-quantizers: the largest divisor of dim that gives <= 16 dims per code, so ~dim/8 bytes per vector."""
+    for m in range(min(dim, max(1, dim // 8)), 0, -1):
+        if dim % m == 0:
+            return m
+    return 1
+
+def factory_string(kind, dim, n, nlist=None, m=None, hnsw_m=32, storage="float32"):
+    if storage not in STORAGE_TYPES:
+        raise ValueError(f"unknown storage {storage!r}; choose from {STORAGE_TYPES}")
+    codes = {"float32": "Flat", "float16": "SQfp16", "int8": "SQ8", "pq": f"PQ{m or default_pq_m(dim)}"}[storage]
+    if kind == "flat":
+        return codes
+    if kind == "ivf_flat":
+        return f"IVF{nlist or default_nlist(n)},{codes}"
+    if kind == "ivf_pq":
+        return f"IVF{nlist or default_nlist(n)},PQ{m or default_pq_m(dim)}"
+    if kind == "hnsw":
+        return f"HNSW{hnsw_m}" if storage == "float32" else f"HNSW{hnsw_m}_{codes}"
+    raise ValueError(f"unknown index type {kind!r}; choose from {INDEX_TYPES}")
+
+def recommend(n):
+    """Rule of thumb for an L2 index over n vectors; run benchmark_ann.py on your data to confirm."""
+    if n < 50_000:
+        return "flat"       # exact, and brute force is still sub-millisecond
+    if n < 2_000_000:
+        return "hnsw"       # best recall/latency while the full vectors fit in RAM
+    return "ivf_pq"         # compressed codes, so tens of millions of vectors fit
+
+def _unwrap(index):
+    index = faiss.downcast_index(index)
+    return faiss.downcast_index(index.index) if isinstance(index, faiss.IndexIDMap) else index
+
+def is_exact(index):
+    """True if the index stores full float32 vectors, so re-ranking can't change its distances."""
+    return type(_unwrap(index)).__name__ in _EXACT
+
+def bytes_per_vector(index):
+    """Size of one stored vector code; HNSW adds its graph links on top."""
+    index = _unwrap(index)
+    if hasattr(index, "hnsw"):
+        index = faiss.downcast_index(index.storage)
+    return index.code_size
+
+def _pq_parts(index):
+    """The index (IndexPQ, IndexIVFPQ) or its HNSW storage, where they hold PQ codes."""
+    index = faiss.downcast_index(index)
+    parts = [index]
+    if hasattr(index, "hnsw"):
+        parts.append(faiss.downcast_index(index.storage))
+    return [p for p in parts if hasattr(p, "do_polysemous_training")]
+
+def set_search_params(index, nprobe=None, ef_search=None):
+    """Speed/recall knobs: IVF lists probed per query, HNSW candidate list size."""
+    if nprobe is not None and "IVF" in type(faiss.downcast_index(index)).__name__:
+        faiss.extract_index_ivf(index).nprobe = nprobe
+    if ef_search is not None and hasattr(faiss.downcast_index(index), "hnsw"):
+        faiss.downcast_index(index).hnsw.efSearch = ef_search
+    return index
+
+def build_index(kind, vectors, nlist=None, m=None, hnsw_m=32, nprobe=None, ef_search=None,
+                train_size=None, seed=1234, ids=None, storage="float32"):
+    """
+    Create, train (IVF types, int8 and PQ storage) and fill an L2 index of
+    type `kind`, keeping the vectors as `storage` codes.
+
+    Quantizers are trained on a random sample of `train_size` vectors
+    (default: 64 per IVF list, else 16,384, and at least the minimum faiss
+    needs). Types that need more training data than there are vectors fall
+    back to "flat", and PQ storage falls back to int8. ivf_pq always stores
+    PQ codes, whatever `storage` says.
+    With `ids`, the index is wrapped in an IndexIDMap2 and the vectors are
+    added under those ids, so rows can later be added and removed by id.
+    Returns (index, kind actually built).
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    n, dim = vectors.shape
+    if n < _MIN_TRAIN.get(kind, 0):
+        kind = "flat"
+    if n < _MIN_TRAIN.get(storage, 0):
+        storage = "int8"
+    index = faiss.index_factory(dim, factory_string(kind, dim, n, nlist, m, hnsw_m, storage))
+    # Polysemous codes only help Hamming-filtered search and make PQ training many times slower
+    for codes in _pq_parts(index):
+        codes.do_polysemous_training = False
+    if not index.is_trained:
+        # Without IVF lists, sample enough for int8 ranges and PQ's 256 centroids per code
+        default = 64 * faiss.extract_index_ivf(index).nlist if kind.startswith("ivf") else 64 * 256
+        size = min(n, max(train_size or default, _MIN_TRAIN.get(kind, 0), _MIN_TRAIN.get(storage, 0)))
+        sample = vectors if size == n else vectors[np.random.default_rng(seed).choice(n, size, replace=False)]
+        index.train(sample)
+    set_search_params(index, nprobe or (16 if kind.startswith("ivf") else None), ef_search or (64 if kind == "hnsw" else None))
+    if ids is not None:
+        index = faiss.IndexIDMap2(index)
+        index.add_with_ids(vectors, np.ascontiguousarray(ids, dtype=np.int64))
+    else:
+        index.add(vectors)
+    return index, kind
+
+def rerank(queries, indices, vectors, top_k):
+    """
+    Re-score candidate ids with exact squared L2 against the full-precision
+    `vectors` (row i is the vector with id i; a memory map is fine, only the
+    candidate rows are read). Returns (distances, indices) of the top_k,
+    padded with inf and -1 like faiss.
+    """
+    valid = indices >= 0
+    rows = np.unique(indices[valid])
+    full = np.asarray(vectors[rows], dtype=np.float32)  # one sorted gather per batch
+    sqnorms = np.einsum("ij,ij->i", full, full)
+    pos = np.searchsorted(rows, indices)  # -1 padding lands anywhere; it stays masked
+    exact = np.full(indices.shape, np.inf, dtype=np.float32)
+    for i, q in enumerate(queries):
+        p = pos[i][valid[i]]
+        exact[i, valid[i]] = np.maximum(sqnorms[p] - 2 * (full[p] @ q) + q @ q, 0)
+    order = np.argsort(exact, axis=1, kind="stable")[:, :top_k]
+    distances, indices = np.take_along_axis(exact, order, axis=1), np.take_along_axis(indices, order, axis=1)
+    indices[np.isinf(distances)] = -1
+    return distances, indices
+
+def search(index, queries, top_k=1, max_distance=None, batch_size=1024, exclude=None, vectors=None, rerank_factor=4):
+    """
+    Search many queries with one `index.search` call per batch of rows.
+
+    Returns, for each query, a list of (row, distance) pairs, closest first.
+    Hits farther than `max_distance` (squared L2) and the -1 padding faiss
+    returns when it finds fewer than `top_k` neighbours are dropped. Ids in
+    `exclude` (tombstones of an index that can't remove vectors, like HNSW)
+    are skipped during the search, so they don't use up the top_k.
+
+    With the full-precision `vectors` of a compressed index, the index
+    returns `rerank_factor * top_k` candidates, which are re-ranked with
+    exact distances; `max_distance` then applies to the exact distances.
+    """
+    queries = np.ascontiguousarray(queries, dtype=np.float32).reshape(-1, index.d)
+    top_k = min(top_k, index.ntotal)
+    if top_k <= 0:
+        return [[] for _ in range(len(queries))]
+    candidates = top_k if vectors is None else min(top_k * rerank_factor, index.ntotal)
+    kwargs = {}
+    if exclude is not None and len(exclude):
+        selector = faiss.IDSelectorNot(faiss.IDSelectorBatch(np.ascontiguousarray(exclude, dtype=np.int64)))
+        kwargs["params"] = faiss.SearchParameters(sel=selector)
+    results = []
+    for start in range(0, len(queries), batch_size):
+        batch = queries[start:start + batch_size]
+        distances, indices = index.search(batch, candidates, **kwargs)
+        if vectors is not None:
+            distances, indices = rerank(batch, indices, vectors, top_k)
+        keep = indices >= 0
+        if max_distance is not None:
+            keep &= distances <= max_distance
+        for row_ids, row_dists, row_keep in zip(indices.tolist(), distances.tolist(), keep.tolist()):
+            results.append([(i, d) for i, d, k in zip(row_ids, row_dists, row_keep) if k])
+    return results
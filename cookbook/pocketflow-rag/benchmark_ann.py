@@ -0,0 +1,88 @@
+import argparse
+import time
+
+import faiss
+import numpy as np
+
+from ann_index import build_index, set_search_params, recommend
+
+# (label, index type, search params) for each configuration to measure
+CONFIGS = [
+    ("flat", "flat", {}),
+    ("ivf_flat nprobe=4", "ivf_flat", {"nprobe": 4}),
+    ("ivf_flat nprobe=16", "ivf_flat", {"nprobe": 16}),
+    ("ivf_flat nprobe=64", "ivf_flat", {"nprobe": 64}),
+    ("ivf_pq nprobe=16", "ivf_pq", {"nprobe": 16}),
+    ("ivf_pq nprobe=64", "ivf_pq", {"nprobe": 64}),
+    ("hnsw ef=32", "hnsw", {"ef_search": 32}),
+    ("hnsw ef=128", "hnsw", {"ef_search": 128}),
+]
+
+def parse_size(s):
+    s = s.strip().lower()
+    scale = {"k": 1_000, "m": 1_000_000}.get(s[-1], 1)
+    return int(float(s[:-1] if scale > 1 else s) * scale)
+
+def make_vectors(n, dim, rng, latent_dim=24, clusters=200):
+    """
+    Synthetic embeddings: clustered points in a low-dimensional latent space,
+    projected up to `dim`. Like real text embeddings, they have a much lower
+    intrinsic dimension than `dim`; i.i.d. noise would be an unrealistically
+    hard case for every ANN index.
+    """
+    r = np.random.default_rng(42)  # the same latent space for corpus and queries
+    centers = r.standard_normal((clusters, latent_dim), dtype=np.float32) * 2
+    projection = r.standard_normal((latent_dim, dim), dtype=np.float32) / np.sqrt(latent_dim)
+    out = np.empty((n, dim), dtype=np.float32)
+    for start in range(0, n, 1_000_000):  # chunked to cap temporary memory
+        stop = min(start + 1_000_000, n)
+        latent = centers[rng.integers(clusters, size=stop - start)] + rng.standard_normal((stop - start, latent_dim), dtype=np.float32)
+        out[start:stop] = latent @ projection
+        out[start:stop] += 0.05 * rng.standard_normal((stop - start, dim), dtype=np.float32)
+    return out
+
+def recall_at_k(found, truth):
+    k = truth.shape[1]
+    return np.mean([len(set(f) & set(t)) / k for f, t in zip(found, truth)])
+
+def bench(n, dim, num_queries, k, rng, kinds):
+    base = make_vectors(n, dim, rng)
+    queries = make_vectors(num_queries, dim, rng)
+    built, rows = {}, []
+    truth = None
+    for label, kind, params in CONFIGS:
+        if kind not in kinds:
+            continue
+        if kind not in built:
+            start = time.perf_counter()
+            built[kind] = (build_index(kind, base)[0], time.perf_counter() - start)
+        index, build_s = built[kind]
+        set_search_params(index, **params)
+        start = time.perf_counter()
+        _, found = index.search(queries, k)
+        search_s = time.perf_counter() - start
+        if truth is None:  # "flat" always runs first and is exact
+            truth = found
+        rows.append((label, build_s, faiss.serialize_index(index).nbytes, recall_at_k(found, truth), num_queries / search_s))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall@k and QPS of each index type against exact search.")
+    parser.add_argument("--sizes", default="10k,100k,1M", help="comma-separated corpus sizes, e.g. 10k,100k,1M,10M")
+    parser.add_argument("--dim", type=int, default=128)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--types", default="flat,ivf_flat,ivf_pq,hnsw")
+    args = parser.parse_args()
+    kinds = {"flat", *args.types.split(",")}
+    rng = np.random.default_rng(0)
+
+    print(f"dim={args.dim}, {args.queries} queries, recall@{args.k} against flat, {faiss.omp_get_max_threads()} thread(s)")
+    for n in map(parse_size, args.sizes.split(",")):
+        print(f"\n=== {n:,} vectors (recommended: {recommend(n)}) ===")
+        print(f"{'index':<20} {'build s':>8} {'size MB':>8} {'recall':>7} {'QPS':>9}")
+        for label, build_s, nbytes, recall, qps in bench(n, args.dim, args.queries, args.k, rng, kinds):
+            print(f"{label:<20} {build_s:>8.1f} {nbytes / 2**20:>8.1f} {recall:>7.3f} {qps:>9,.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Compare one-query-at-a-time retrieval with batched retrieval.
+
+    python benchmark_retrieval.py
+    python benchmark_retrieval.py --vectors=100k --queries=5000 --dim=1536
+
+The index and queries are random vectors, so no API calls are made. Embedding
+requests are counted from the token-aware batches the nodes would send.
+"""
+import argparse
+import time
+
+import faiss
+import numpy as np
+
+from ann_index import search
+from benchmark_ann import parse_size
+from utils import token_batches
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", default="20k")
+    parser.add_argument("--queries", default="1k")
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=1024)
+    args = parser.parse_args()
+    n, nq = parse_size(args.vectors), parse_size(args.queries)
+
+    rng = np.random.default_rng(1234)
+    index = faiss.IndexFlatL2(args.dim)
+    index.add(rng.standard_normal((n, args.dim), dtype=np.float32))
+    queries = rng.standard_normal((nq, args.dim), dtype=np.float32)
+    questions = [f"Sample evaluation question number {i} about the corpus?" for i in range(nq)]
+
+    print(f"{n:,} vectors, {nq:,} queries, dim={args.dim}, top_k={args.top_k}, faiss using {faiss.omp_get_max_threads()} thread(s)\n")
+
+    start = time.perf_counter()
+    one_by_one = [search(index, q, args.top_k)[0] for q in queries]
+    single_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched = search(index, queries, args.top_k, batch_size=args.batch_size)
+    batch_s = time.perf_counter() - start
+
+    print(f"{'mode':<14} {'embed requests':>14} {'search s':>9} {'queries/s':>10}")
+    print(f"{'one by one':<14} {nq:>14,} {single_s:>9.2f} {nq / single_s:>10,.0f}")
+    print(f"{'batched':<14} {len(token_batches(questions)):>14,} {batch_s:>9.2f} {nq / batch_s:>10,.0f}")
+    # faiss takes a different (BLAS) code path for large batches, so compare rows, not float bits
+    same = [[i for i, _ in hits] for hits in one_by_one] == [[i for i, _ in hits] for hits in batched]
+    print(f"\nSpeedup: {single_s / batch_s:.1f}x, same chunks retrieved: {same}")
+
+if __name__ == "__main__":
+    main()
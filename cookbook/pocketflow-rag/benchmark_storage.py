@@ -0,0 +1,70 @@
+"""
+Memory, QPS and recall of each vector storage, with and without exact re-ranking.
+
+    python benchmark_storage.py
+    python benchmark_storage.py --vectors=1M --dim=1536 --types=flat,hnsw
+
+Vectors are synthetic clustered embeddings (see benchmark_ann.py), so no API
+calls are made. Re-ranking reads the candidates' full float32 vectors from a
+memory-mapped file, as LoadIndexNode does; that file stays on disk.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import faiss
+import numpy as np
+
+from ann_index import STORAGE_TYPES, build_index, bytes_per_vector, search
+from benchmark_ann import make_vectors, parse_size, recall_at_k
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", default="100k")
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--rerank-factor", type=int, default=4)
+    parser.add_argument("--types", default="flat,hnsw")
+    parser.add_argument("--storage", default=",".join(STORAGE_TYPES))
+    args = parser.parse_args()
+    n = parse_size(args.vectors)
+
+    rng = np.random.default_rng(0)
+    base = make_vectors(n, args.dim, rng)
+    queries = make_vectors(args.queries, args.dim, rng)
+    exact = faiss.IndexFlatL2(args.dim)
+    exact.add(base)
+    _, truth = exact.search(queries, args.k)
+    del exact
+
+    print(f"{n:,} vectors, dim={args.dim}, {args.queries} queries, recall@{args.k} against exact search, "
+          f"re-rank {args.rerank_factor}x candidates, {faiss.omp_get_max_threads()} thread(s)\n")
+    print(f"{'index':<8} {'storage':<8} {'re-rank':<7} {'bytes/vec':>9} {'RAM MB':>8} {'10M GB':>7} "
+          f"{'build s':>8} {'recall':>7} {'QPS':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        # The full-precision copy re-ranking reads, as saved next to a compressed index
+        path = os.path.join(tmp, "vectors.bin")
+        base.tofile(path)
+        vectors = np.memmap(path, dtype=np.float32, mode="r", shape=base.shape)
+        for kind in args.types.split(","):
+            for storage in args.storage.split(","):
+                start = time.perf_counter()
+                index, _ = build_index(kind, base, storage=storage)
+                build_s = time.perf_counter() - start
+                ram = faiss.serialize_index(index).nbytes
+                for rerank in (False, True):
+                    if rerank and storage == "float32":
+                        continue  # the distances are already exact
+                    start = time.perf_counter()
+                    hits = search(index, queries, args.k, vectors=vectors if rerank else None,
+                                  rerank_factor=args.rerank_factor)
+                    qps = args.queries / (time.perf_counter() - start)
+                    recall = recall_at_k([[i for i, _ in h] for h in hits], truth)
+                    print(f"{kind:<8} {storage:<8} {'yes' if rerank else 'no':<7} {bytes_per_vector(index):>9,} "
+                          f"{ram / 2**20:>8,.0f} {ram / n * 1e7 / 2**30:>7,.1f} {build_s:>8.1f} {recall:>7.3f} {qps:>8,.0f}")
+                del index
+
+if __name__ == "__main__":
+    main()
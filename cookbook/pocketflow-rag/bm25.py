@@ -0,0 +1,180 @@
+import json
+import math
+import os
+import re
+from array import array
+from collections import Counter
+
+import numpy as np
+
+# Words, plus identifiers that keep their inner separators: "HI-271", "v1.2", "q_mesh"
+_WORD = re.compile(r"\w+(?:[-./:]\w+)*")
+_SEPARATORS = re.compile(r"[-./:_]")
+
+VOCAB_FILE = "bm25_vocab.json"
+ARRAY_FILES = ("indptr", "doc_ids", "tfs", "doc_len", "removed")
+
+def tokenize(text):
+    """Lowercased words. Identifiers are kept whole and also split into their parts."""
+    for m in _WORD.finditer(text.lower()):
+        token = m.group()
+        yield token
+        if _SEPARATORS.search(token):
+            yield from (part for part in _SEPARATORS.split(token) if part)
+
+def looks_lexical(query):
+    """
+    True for short queries made only of identifiers ("HI-271", "Q-Mesh v2")
+    or wrapped in quotes. Such queries are better served by exact term
+    matching, and need no embedding call.
+    """
+    query = query.strip()
+    if len(query) > 1 and query[0] == query[-1] and query[0] in "\"'":
+        return True
+    tokens = [m.group() for m in _WORD.finditer(query)]
+    return 0 < len(tokens) <= 3 and all(
+        any(c.isdigit() for c in t) or _SEPARATORS.search(t) or any(c.isupper() for c in t[1:]) for t in tokens
+    )
+
+class BM25Index:
+    """
+    Okapi BM25 over an array-backed inverted index.
+
+    Postings are stored CSR-style: for term id t, documents
+    doc_ids[indptr[t]:indptr[t + 1]] with term frequencies tfs[...], in
+    increasing document order. `add` appends to small pending arrays, which
+    are merged into the CSR arrays on the next search. Document ids are row
+    numbers in insertion order, the same as in the FAISS index. `remove`
+    marks documents as deleted; their postings stay until the index is
+    rebuilt, but they no longer count towards the document count, document
+    frequencies or average length.
+    """
+
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1, self.b = k1, b
+        self.vocab = {}
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.doc_ids = np.zeros(0, dtype=np.uint32)
+        self.tfs = np.zeros(0, dtype=np.uint16)
+        self.doc_len = np.zeros(0, dtype=np.uint32)
+        self.removed = np.zeros(0, dtype=bool)
+        self._pending = (array("I"), array("I"), array("H"))  # term id, doc id, tf
+        self._pending_len = array("I")
+        self._norm = None
+
+    def __len__(self):
+        return len(self.doc_len) + len(self._pending_len)
+
+    def add(self, texts):
+        """Index more documents; returns their ids."""
+        terms, docs, tfs = self._pending
+        first = len(self)
+        for doc, text in enumerate(texts, start=first):
+            counts = Counter(self.vocab.setdefault(t, len(self.vocab)) for t in tokenize(text))
+            for term, tf in counts.items():
+                terms.append(term)
+                docs.append(doc)
+                tfs.append(min(tf, 0xFFFF))
+            self._pending_len.append(sum(counts.values()))
+        return range(first, len(self))
+
+    def _compact(self):
+        if not self._pending_len:
+            return
+        terms, docs, tfs = (np.frombuffer(a, dtype=d) for a, d in zip(self._pending, (np.uint32, np.uint32, np.uint16)))
+        old_terms = np.repeat(np.arange(len(self.indptr) - 1, dtype=np.uint32), np.diff(self.indptr))
+        all_terms = np.concatenate([old_terms, terms])
+        # A stable sort by term keeps each posting list in document order: old docs come first
+        order = np.argsort(all_terms, kind="stable")
+        self.doc_ids = np.concatenate([self.doc_ids, docs])[order]
+        self.tfs = np.concatenate([self.tfs, tfs])[order]
+        self.indptr = np.zeros(len(self.vocab) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(all_terms, minlength=len(self.vocab)), out=self.indptr[1:])
+        self.doc_len = np.concatenate([self.doc_len, np.frombuffer(self._pending_len, dtype=np.uint32)])
+        self.removed = np.concatenate([self.removed, np.zeros(len(self._pending_len), dtype=bool)])
+        self._pending = (array("I"), array("I"), array("H"))
+        self._pending_len = array("I")
+        self._norm = None
+
+    def remove(self, ids):
+        """Stop returning these documents."""
+        self._compact()
+        if not self.removed.flags.writeable:
+            self.removed = np.array(self.removed)  # memory-mapped after load()
+        self.removed[np.asarray(ids, dtype=np.int64)] = True
+        self._norm = None
+
+    def search(self, query, top_k=10):
+        """Returns up to top_k (doc id, score) pairs, best first; only documents sharing a term with the query."""
+        self._compact()
+        term_ids = {self.vocab[t] for t in tokenize(query) if t in self.vocab}
+        if not term_ids or len(self.doc_len) == 0 or top_k <= 0:
+            return []
+        if self._norm is None:
+            # Per-document length normalisation, k1 * (1 - b + b * len / avg len), over live documents
+            live = ~self.removed
+            self._live = int(np.count_nonzero(live))
+            lengths = self.doc_len.astype(np.float32)
+            average = lengths[live].mean() if self._live else 1
+            self._norm = self.k1 * (1 - self.b + self.b * lengths / max(average, 1))
+        n = self._live
+        scores = np.zeros(len(self.doc_len), dtype=np.float32)
+        for t in term_ids:
+            start, end = int(self.indptr[t]), int(self.indptr[t + 1])
+            docs, tf = self.doc_ids[start:end], self.tfs[start:end]
+            alive = ~self.removed[docs]
+            docs, tf = docs[alive], tf[alive].astype(np.float32)
+            df = len(docs)
+            if df == 0:
+                continue
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            scores[docs] += idf * tf * (self.k1 + 1) / (tf + self._norm[docs])
+        hits = np.flatnonzero(scores)
+        if len(hits) > top_k:
+            hits = hits[np.argpartition(-scores[hits], top_k - 1)[:top_k]]
+        hits = hits[np.argsort(-scores[hits], kind="stable")]
+        return [(int(i), float(scores[i])) for i in hits]
+
+    @staticmethod
+    def exists(directory):
+        return os.path.exists(os.path.join(directory, VOCAB_FILE))
+
+    def save(self, directory):
+        """Write the index next to the FAISS index, each file under a temporary name and renamed."""
+        self._compact()
+        os.makedirs(directory, exist_ok=True)
+        for name in ARRAY_FILES:
+            tmp = os.path.join(directory, f"bm25_{name}.tmp.npy")
+            np.save(tmp, getattr(self, name))
+            os.replace(tmp, os.path.join(directory, f"bm25_{name}.npy"))
+        tmp = os.path.join(directory, VOCAB_FILE + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"k1": self.k1, "b": self.b, "terms": list(self.vocab)}, f)
+        os.replace(tmp, os.path.join(directory, VOCAB_FILE))
+
+    @classmethod
+    def load(cls, directory):
+        """Open a saved index; the posting arrays are memory-mapped."""
+        with open(os.path.join(directory, VOCAB_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+        index = cls(meta["k1"], meta["b"])
+        index.vocab = {t: i for i, t in enumerate(meta["terms"])}
+        for name in ARRAY_FILES:
+            path = os.path.join(directory, f"bm25_{name}.npy")
+            if os.path.exists(path):
+                setattr(index, name, np.load(path, mmap_mode="r"))
+        if len(index.removed) != len(index.doc_len):
+            index.removed = np.zeros(len(index.doc_len), dtype=bool)
+        return index
+
+def reciprocal_rank_fusion(rankings, k=60):
+    """
+    Fuse ranked lists of ids: each id scores sum(1 / (k + rank)) over the
+    lists it appears in, with ranks starting at 1. Returns (id, score) pairs,
+    best first.
+    """
+    scores = {}
+    for ranking in rankings:
+        for rank, i in enumerate(ranking, start=1):
+            scores[i] = scores.get(i, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: -item[1])
@@ -0,0 +1,132 @@
+import mmap
+import os
+import re
+
+# Where a chunk may end, best first. Patterns are ASCII so the same ones
+# work on str and on UTF-8 bytes, where they never match inside a character.
+_SENTENCE = r"[.!?][\"')\]]*\s+|\n[ \t]*\n\s*"
+_TOKEN = r"\s+"
+BOUNDARIES = {
+    "sentence": (_SENTENCE, _TOKEN),  # end after a sentence, else between tokens
+    "token": (_TOKEN,),               # never split a whitespace-separated token
+    None: (),                         # hard cut at chunk_size
+}
+_PATTERNS = {
+    (name, kind): [re.compile(p.encode() if kind is bytes else p) for p in patterns]
+    for name, patterns in BOUNDARIES.items() for kind in (str, bytes)
+}
+
+# chunk_file gives mapped pages back to the OS after this many bytes
+_RELEASE_EVERY = 64 << 20
+
+class Chunk(str):
+    """
+    A chunk's text, plus where it came from: `source` is the document's
+    position in `texts` or its file path, and `start`/`end` are character
+    offsets into the text, or byte offsets into the file.
+    """
+
+    def __new__(cls, text, source=None, start=None, end=None):
+        chunk = super().__new__(cls, text)
+        chunk.source, chunk.start, chunk.end = source, start, end
+        return chunk
+
+    def __reduce__(self):
+        return Chunk, (str(self), self.source, self.start, self.end)
+
+def _char_start(buf, i):
+    # Step back to the first byte of a UTF-8 character; str needs no adjustment
+    if not isinstance(buf, str):
+        while 0 < i < len(buf) and buf[i] & 0xC0 == 0x80:
+            i -= 1
+    return i
+
+def _cut(buf, pos, end, patterns):
+    """Best place to end a chunk in buf[pos:end]: the last boundary in its second half."""
+    lo = pos + (end - pos) // 2
+    for pattern in patterns:
+        last = None
+        for last in pattern.finditer(buf, lo, end):
+            pass
+        if last is not None and last.end() > pos:
+            return last.end()
+    return _char_start(buf, end)
+
+def _align(buf, start, end, patterns):
+    """Move the start of an overlap forward to the first boundary before `end`."""
+    for pattern in patterns:
+        m = pattern.search(buf, start, end)
+        if m is not None and m.end() < end:
+            return m.end()
+    return _char_start(buf, start)
+
+def spans(buf, chunk_size=2000, overlap=200, boundary="sentence"):
+    """
+    Yield (start, end) chunk offsets over a str, bytes or mmap, lazily.
+
+    Chunks are at most `chunk_size` long and end at the best `boundary` in
+    their second half, if there is one. Each chunk after the first starts
+    up to `overlap` before the previous one ended, moved forward to a
+    boundary. Only the current window is ever scanned.
+    """
+    if chunk_size <= 0 or not 0 <= overlap < chunk_size:
+        raise ValueError("need chunk_size > 0 and 0 <= overlap < chunk_size")
+    patterns = _PATTERNS[boundary, str if isinstance(buf, str) else bytes]
+    n, pos = len(buf), 0
+    while pos < n:
+        end = n if pos + chunk_size >= n else _cut(buf, pos, pos + chunk_size, patterns)
+        while end <= pos or (end < n and _char_start(buf, end) != end):
+            # chunk_size is smaller than one UTF-8 character: take the whole character
+            end = max(end, pos) + 1
+        yield pos, end
+        if end >= n:
+            return
+        start = _align(buf, end - overlap, end, patterns) if overlap else end
+        pos = start if start > pos else end
+
+def chunk_text(text, chunk_size=2000, overlap=200, boundary="sentence", source=None):
+    """Yield the Chunks of an in-memory string; offsets are in characters."""
+    for start, end in spans(text, chunk_size, overlap, boundary):
+        if not text[start:end].isspace():
+            yield Chunk(text[start:end], source, start, end)
+
+def chunk_file(path, chunk_size=2000, overlap=200, boundary="sentence", encoding="utf-8"):
+    """
+    Yield the Chunks of a UTF-8 (or ASCII) file without reading it into
+    memory. The file is memory-mapped, so only the pages around the current
+    chunk are resident; `chunk_size`, `overlap` and the offsets are in bytes.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return  # mmap refuses empty files
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                buf.madvise(mmap.MADV_SEQUENTIAL)
+            released = 0
+            for start, end in spans(buf, chunk_size, overlap, boundary):
+                text = buf[start:end].decode(encoding, errors="replace")
+                if text and not text.isspace():
+                    yield Chunk(text, str(path), start, end)
+                if start - released >= _RELEASE_EVERY and hasattr(mmap, "MADV_DONTNEED"):
+                    # Unmap pages already chunked; otherwise they count towards RSS until the file is closed
+                    done = start - start % mmap.PAGESIZE
+                    buf.madvise(mmap.MADV_DONTNEED, released, done - released)
+                    released = done
+
+def expand_paths(paths):
+    """Files under each path, directories walked in sorted order."""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    yield os.path.join(root, name)
+        else:
+            yield path
+
+def iter_chunks(texts=(), paths=(), chunk_size=2000, overlap=200, boundary="sentence"):
+    """Chunks of every in-memory text (source = its position), then of every file under `paths`."""
+    for i, text in enumerate(texts):
+        yield from chunk_text(text, chunk_size, overlap, boundary, source=i)
+    for path in expand_paths(paths):
+        yield from chunk_file(path, chunk_size, overlap, boundary)
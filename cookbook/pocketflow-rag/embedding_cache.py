@@ -0,0 +1,104 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import unicodedata
+
+import numpy as np
+
+def normalize(text):
+    """Texts that differ only in Unicode form or whitespace share one cache entry."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+def text_key(text):
+    return hashlib.sha256(normalize(text).encode("utf-8")).digest()
+
+class EmbeddingCache:
+    """
+    Persistent, content-addressed embedding cache for one model.
+
+    Keys are (model, SHA-256 of the normalised text). SQLite maps each key to
+    a row of a flat, append-only matrix file (`<model>-<dim>-<dtype>.bin`)
+    that is read through a memory map. Use float16 to halve the disk and
+    page-cache footprint; lookups always return float32.
+
+    Writers serialise on an SQLite write transaction, so several processes
+    and threads can share one directory.
+    """
+
+    def __init__(self, directory, model, dim, dtype="float32"):
+        self.model, self.dim, self.dtype = model, dim, np.dtype(dtype)
+        os.makedirs(directory, exist_ok=True)
+        safe_model = "".join(c if c.isalnum() or c in "-_." else "_" for c in model)
+        self.path = os.path.join(directory, f"{safe_model}-{dim}-{self.dtype.name}.bin")
+        self._row_bytes = dim * self.dtype.itemsize
+        self._db = sqlite3.connect(os.path.join(directory, "cache.sqlite"), timeout=60, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS entries (model TEXT, key BLOB, row INTEGER, PRIMARY KEY (model, key)) WITHOUT ROWID")
+        self._table = f"{model}\0{self.dtype.name}"  # float16 and float32 copies are separate entries
+        self._lock = threading.Lock()
+        self._matrix = None
+        self.hits = self.misses = 0
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM entries WHERE model = ?", (self._table,)).fetchone()[0]
+
+    def _rows(self, keys):
+        found = {}
+        for i in range(0, len(keys), 500):  # stay under SQLite's parameter limit
+            chunk = keys[i:i + 500]
+            sql = f"SELECT key, row FROM entries WHERE model = ? AND key IN ({','.join('?' * len(chunk))})"
+            found.update(self._db.execute(sql, (self._table, *chunk)).fetchall())
+        return found
+
+    def _view(self, max_row):
+        if self._matrix is None or max_row >= len(self._matrix):
+            n = os.path.getsize(self.path) // self._row_bytes
+            self._matrix = np.memmap(self.path, dtype=self.dtype, mode="r", shape=(n, self.dim))
+        return self._matrix
+
+    def lookup(self, texts, out):
+        """
+        Copy cached vectors into the matching rows of `out` (float32, shape
+        (len(texts), dim)). Returns the indexes of the texts that missed.
+        """
+        keys = [text_key(t) for t in texts]
+        with self._lock:
+            found = self._rows(keys)
+            hit_idx = [i for i, k in enumerate(keys) if k in found]
+            if hit_idx:
+                rows = [found[keys[i]] for i in hit_idx]
+                out[hit_idx] = self._view(max(rows))[rows]
+            self.hits += len(hit_idx)
+            self.misses += len(keys) - len(hit_idx)
+        return [i for i, k in enumerate(keys) if k not in found]
+
+    def add(self, texts, vectors):
+        """Store new vectors; texts that are already cached (or repeated) are skipped."""
+        pending = {}
+        for text, vec in zip(texts, vectors):
+            pending.setdefault(text_key(text), vec)
+        if not pending:
+            return
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")  # also locks out other processes
+            try:
+                known = self._rows(list(pending))
+                new = [(k, v) for k, v in pending.items() if k not in known]
+                if new:
+                    start = os.path.getsize(self.path) // self._row_bytes if os.path.exists(self.path) else 0
+                    block = np.asarray([v for _, v in new], dtype=self.dtype)
+                    with open(self.path, "r+b" if os.path.exists(self.path) else "wb") as f:
+                        f.seek(start * self._row_bytes)  # overwrite any torn row from a crashed writer
+                        f.write(block.tobytes())
+                    self._db.executemany("INSERT INTO entries VALUES (?, ?, ?)",
+                                         [(self._table, k, start + j) for j, (k, _) in enumerate(new)])
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0,
+                "entries": len(self), "bytes": os.path.getsize(self.path) if os.path.exists(self.path) else 0}
@@ -1,30 +1,70 @@
 from pocketflow import Flow
-from nodes import EmbedDocumentsNode, CreateIndexNode, EmbedQueryNode, RetrieveDocumentNode, ChunkDocumentsNode, GenerateAnswerNode
+from nodes import EmbedDocumentsNode, CreateIndexNode, SaveIndexNode, LoadIndexNode, EmbedQueryNode, RetrieveDocumentNode, ChunkDocumentsNode, GenerateAnswerNode, EmbedQueriesNode, BatchRetrieveNode, CreateLexicalIndexNode, HybridRetrieveNode, DiffDocumentsNode, EmbedChangedChunksNode, ApplyChangesNode, CompactIndexNode
 
 def get_offline_flow():
     # Create offline flow for document indexing
     chunk_docs_node = ChunkDocumentsNode()
     embed_docs_node = EmbedDocumentsNode()
     create_index_node = CreateIndexNode()
+    create_lexical_index_node = CreateLexicalIndexNode()
+    save_index_node = SaveIndexNode()
     
     # Connect the nodes
-    chunk_docs_node >> embed_docs_node >> create_index_node
+    chunk_docs_node >> embed_docs_node >> create_index_node >> create_lexical_index_node >> save_index_node
     
     offline_flow = Flow(start=chunk_docs_node)
     return offline_flow
 
+def get_incremental_flow():
+    # Create offline flow that only indexes what changed since the last run
+    diff_docs_node = DiffDocumentsNode()
+    embed_changed_node = EmbedChangedChunksNode()
+    apply_changes_node = ApplyChangesNode()
+    compact_index_node = CompactIndexNode()
+    
+    # Connect the nodes
+    diff_docs_node >> embed_changed_node >> apply_changes_node >> compact_index_node
+    
+    return Flow(start=diff_docs_node)
+
 def get_online_flow():
     # Create online flow for document retrieval and answer generation
+    load_index_node = LoadIndexNode()
     embed_query_node = EmbedQueryNode()
     retrieve_doc_node = RetrieveDocumentNode()
     generate_answer_node = GenerateAnswerNode()
     
     # Connect the nodes
-    embed_query_node >> retrieve_doc_node >> generate_answer_node
+    load_index_node >> embed_query_node >> retrieve_doc_node >> generate_answer_node
     
-    online_flow = Flow(start=embed_query_node)
+    online_flow = Flow(start=load_index_node)
     return online_flow
 
+def get_hybrid_online_flow(top_k=1):
+    # Create online flow that fuses BM25 and vector retrieval; lexical queries skip the embedding call
+    load_index_node = LoadIndexNode()
+    hybrid_retrieve_node = HybridRetrieveNode(top_k=top_k)
+    generate_answer_node = GenerateAnswerNode()
+    
+    # Connect the nodes
+    load_index_node >> hybrid_retrieve_node >> generate_answer_node
+    
+    return Flow(start=load_index_node)
+
+def get_batch_retrieval_flow(top_k=1, max_distance=None):
+    # Create a retrieval-only flow for many queries at once, e.g. evaluation sweeps
+    load_index_node = LoadIndexNode()
+    embed_queries_node = EmbedQueriesNode()
+    batch_retrieve_node = BatchRetrieveNode(top_k=top_k, max_distance=max_distance)
+    
+    # Connect the nodes
+    load_index_node >> embed_queries_node >> batch_retrieve_node
+    
+    return Flow(start=load_index_node)
+
 # Initialize flows
 offline_flow = get_offline_flow()
-online_flow = get_online_flow()
\ No newline at end of file
+incremental_flow = get_incremental_flow()
+online_flow = get_online_flow()
+hybrid_online_flow = get_hybrid_online_flow()
+batch_retrieval_flow = get_batch_retrieval_flow()
\ No newline at end of file
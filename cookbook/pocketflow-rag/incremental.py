@@ -0,0 +1,287 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import faiss
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: updates and compactions are not serialised across processes
+    fcntl = None
+
+from ann_index import build_index
+from bm25 import BM25Index
+from chunker import chunk_file, chunk_text, expand_paths
+from embedding_cache import text_key
+from index_store import INDEX_FILE, ChunkStore, VectorLog, swap_directory, truncate_chunks, write_chunks
+
+MANIFEST_FILE = "manifest.sqlite"
+TOMBSTONES_FILE = "tombstones.npy"
+
+def file_fingerprint(path, block_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.digest()
+
+@contextmanager
+def locked(index_dir):
+    """Serialise updates and compactions of one index directory, across processes."""
+    with open(os.path.abspath(index_dir) + ".lock", "w") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        yield
+
+class Manifest:
+    """
+    What is in an index directory: a fingerprint per document, and the
+    source, fingerprint and liveness of every chunk row. Rows are the ids
+    used by the FAISS index, the BM25 index, the chunk store and the vector
+    log, so all four stay aligned.
+    """
+
+    def __init__(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        self.db = sqlite3.connect(os.path.join(directory, MANIFEST_FILE), isolation_level=None)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS documents (source TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, fingerprint BLOB);
+            CREATE TABLE IF NOT EXISTS chunks (row INTEGER PRIMARY KEY, source TEXT, fingerprint BLOB, live INTEGER);
+            CREATE INDEX IF NOT EXISTS chunks_source ON chunks (source);
+            CREATE INDEX IF NOT EXISTS chunks_fingerprint ON chunks (fingerprint);
+        """)
+
+    def get(self, key, default=None):
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return default if row is None else json.loads(row[0])
+
+    def set(self, key, value):
+        self.db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, json.dumps(value)))
+
+    def documents(self):
+        """source -> (size, mtime_ns, fingerprint)"""
+        return {json.loads(s): (size, mtime, fp) for s, size, mtime, fp in self.db.execute("SELECT * FROM documents")}
+
+    def live_rows(self, sources=None):
+        if sources is None:
+            return [r for r, in self.db.execute("SELECT row FROM chunks WHERE live ORDER BY row")]
+        rows = []
+        for source in sources:
+            rows += [r for r, in self.db.execute("SELECT row FROM chunks WHERE live AND source = ?", (json.dumps(source),))]
+        return rows
+
+    def rows_by_fingerprint(self, fingerprints):
+        """fingerprint -> a row (live or not) whose vector can be reused"""
+        found = {}
+        for i in range(0, len(fingerprints), 500):  # stay under SQLite's parameter limit
+            batch = fingerprints[i:i + 500]
+            sql = f"SELECT fingerprint, MAX(row) FROM chunks WHERE fingerprint IN ({','.join('?' * len(batch))}) GROUP BY fingerprint"
+            found.update(self.db.execute(sql, batch).fetchall())
+        return found
+
+    def reset(self):
+        self.db.executescript("DELETE FROM meta; DELETE FROM documents; DELETE FROM chunks;")
+
+    def row_count(self):
+        """Rows recorded, live or dead; row ids run from 0 to this."""
+        return self.db.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM chunks").fetchone()[0]
+
+    def counts(self):
+        """(live rows, dead rows)"""
+        live, total = self.db.execute("SELECT COALESCE(SUM(live), 0), COUNT(*) FROM chunks").fetchone()
+        return live, total - live
+
+def is_indexed(index_dir):
+    """True if index_dir holds an index that apply_changes can update."""
+    return (os.path.exists(os.path.join(index_dir, MANIFEST_FILE))
+            and os.path.exists(os.path.join(index_dir, INDEX_FILE))
+            and Manifest(index_dir).get("index_type") is not None)
+
+def diff_documents(manifest, texts=(), paths=()):
+    """
+    Compare the corpus with the manifest. Files whose size and mtime are
+    unchanged are not even read; others are hashed. Returns (changed,
+    touched, deleted): changed and touched map source -> (size, mtime_ns,
+    fingerprint) for new or edited documents and for files whose content
+    is the same despite a new mtime; deleted lists the sources that are gone.
+    """
+    known = manifest.documents()
+    changed, touched, seen = {}, {}, set()
+    for i, text in enumerate(texts):
+        seen.add(i)
+        fp = hashlib.sha256(text.encode("utf-8")).digest()
+        if known.get(i, (None, None, None))[2] != fp:
+            changed[i] = (len(text), None, fp)
+    for path in expand_paths(paths):
+        path = str(path)
+        seen.add(path)
+        st, old = os.stat(path), known.get(path)
+        if old is not None and old[:2] == (st.st_size, st.st_mtime_ns):
+            continue
+        fp = file_fingerprint(path)
+        (touched if old is not None and old[2] == fp else changed)[path] = (st.st_size, st.st_mtime_ns, fp)
+    deleted = [s for s in known if s not in seen]
+    return changed, touched, deleted
+
+def chunk_documents(texts, sources, chunk_size=2000, overlap=200, boundary="sentence"):
+    """Chunks of just the given documents (positions in `texts`, or file paths)."""
+    chunks = []
+    for source in sources:
+        if isinstance(source, int):
+            chunks += chunk_text(texts[source], chunk_size, overlap, boundary, source=source)
+        else:
+            chunks += chunk_file(source, chunk_size, overlap, boundary)
+    return chunks
+
+def apply_changes(index_dir, chunks, vectors, changed, touched, deleted, index_type="flat", storage="float32"):
+    """
+    Bring the saved index up to date, in time proportional to the change:
+
+    - rows of changed and deleted documents are removed from the FAISS index
+      with remove_ids, or recorded as tombstones if the index can't remove
+      (HNSW); they are always masked in BM25 and marked dead in the manifest
+    - new chunks are appended to the chunk store, the vector log, BM25 and
+      the FAISS index under their row ids
+
+    The FAISS and BM25 files are rewritten, which is sequential I/O; nothing
+    is re-embedded or retrained. A directory that is_indexed() rejects is
+    indexed from scratch, as `index_type` with `storage` codes. Returns a
+    dict of counts.
+
+    The chunk store and vector log grow in place before the manifest commit,
+    so an update first cuts both back to the manifest's rows, dropping what
+    an interrupted run left behind.
+    """
+    with locked(index_dir):
+        fresh = not is_indexed(index_dir)
+        manifest = Manifest(index_dir)
+        if fresh:
+            manifest.reset()
+        log = VectorLog(index_dir, vectors.shape[1])
+        if not fresh:
+            truncate_chunks(index_dir, manifest.row_count())
+            log.truncate(manifest.row_count())
+        stale = [] if fresh else manifest.live_rows(list(changed) + deleted)
+        tombstones = [] if fresh else _load_tombstones(index_dir)
+        if not (fresh or chunks or stale):
+            # Only unchanged files with a new mtime, or deleted documents without chunks
+            rows = range(0)
+            _update_manifest(manifest, stale, rows, chunks, changed, touched, deleted)
+            return {"added": 0, "removed": 0, **_counts(manifest, tombstones)}
+
+        rows = write_chunks(index_dir, chunks, append=not fresh)
+        log.append(vectors, reset=fresh)
+        ids = np.arange(rows.start, rows.stop, dtype=np.int64)
+        if fresh:
+            if len(vectors) == 0:
+                raise ValueError("nothing to index")
+            index, built = build_index(index_type, vectors, ids=ids, storage=storage)
+            manifest.set("index_type", built)
+            manifest.set("storage", storage)
+            bm25 = BM25Index()
+        else:
+            index = faiss.read_index(os.path.join(index_dir, INDEX_FILE))
+            bm25 = BM25Index.load(index_dir)
+            if len(bm25) != manifest.row_count():
+                # Killed after the indexes were saved but before the manifest commit
+                raise RuntimeError(f"{index_dir} was left half-updated; rebuild it with --reindex")
+            if stale:
+                try:
+                    index.remove_ids(faiss.IDSelectorBatch(np.asarray(stale, dtype=np.int64)))
+                except RuntimeError:
+                    tombstones += stale
+                bm25.remove(stale)
+            if len(ids):
+                index.add_with_ids(vectors, ids)
+        bm25.add(chunks)
+
+        # BM25 goes first: if it is ahead of the manifest, the next update knows the run died
+        bm25.save(index_dir)
+        tmp = os.path.join(index_dir, INDEX_FILE + ".tmp")
+        faiss.write_index(index, tmp)
+        os.replace(tmp, os.path.join(index_dir, INDEX_FILE))
+        tmp = os.path.join(index_dir, TOMBSTONES_FILE + ".tmp.npy")
+        np.save(tmp, np.asarray(tombstones, dtype=np.int64))
+        os.replace(tmp, os.path.join(index_dir, TOMBSTONES_FILE))
+
+        # The manifest is updated last
+        _update_manifest(manifest, stale, rows, chunks, changed, touched, deleted)
+        return {"added": len(rows), "removed": len(stale), **_counts(manifest, tombstones)}
+
+def _update_manifest(manifest, stale, rows, chunks, changed, touched, deleted):
+    db = manifest.db
+    db.execute("BEGIN")
+    db.executemany("UPDATE chunks SET live = 0 WHERE row = ?", ((r,) for r in stale))
+    db.executemany("INSERT INTO chunks VALUES (?, ?, ?, 1)",
+                   ((r, json.dumps(c.source), text_key(c)) for r, c in zip(rows, chunks)))
+    db.executemany("DELETE FROM documents WHERE source = ?", ((json.dumps(s),) for s in deleted))
+    db.executemany("INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?)",
+                   ((json.dumps(s), *v) for s, v in {**changed, **touched}.items()))
+    db.execute("COMMIT")
+
+def _counts(manifest, tombstones):
+    live, dead = manifest.counts()
+    return {"live": live, "dead": dead, "tombstones": len(tombstones)}
+
+def _load_tombstones(index_dir):
+    path = os.path.join(index_dir, TOMBSTONES_FILE)
+    return np.load(path).tolist() if os.path.exists(path) else []
+
+def load_tombstones(index_dir):
+    """Ids to exclude from searches of an index that can't remove vectors."""
+    return np.asarray(_load_tombstones(index_dir), dtype=np.int64)
+
+def compact(index_dir, dim):
+    """
+    Rewrite the index directory without dead rows: live chunks and vectors
+    are copied, renumbered from 0, and the FAISS (retrained, for IVF) and
+    BM25 indexes are rebuilt. The new directory is built beside the old one
+    and swapped in (see index_store.swap_directory); processes that already
+    opened the old files keep reading them.
+    """
+    with locked(index_dir):
+        old = Manifest(index_dir)
+        live = old.live_rows()
+        if not live:
+            return
+        store = ChunkStore(index_dir)
+        vectors = VectorLog(index_dir, dim).rows(live)
+        storage = old.get("storage", "float32")
+        fingerprints = dict(old.db.execute("SELECT row, fingerprint FROM chunks WHERE live"))
+        sources = dict(old.db.execute("SELECT row, source FROM chunks WHERE live"))
+        documents = old.db.execute("SELECT * FROM documents").fetchall()
+        index_type = old.get("index_type")
+        old.db.close()
+
+        def write(new_dir):
+            write_chunks(new_dir, (store[r] for r in live))
+            VectorLog(new_dir, dim).append(vectors, reset=True)
+            index, built = build_index(index_type, vectors, ids=np.arange(len(live)), storage=storage)
+            faiss.write_index(index, os.path.join(new_dir, INDEX_FILE))
+            bm25 = BM25Index()
+            bm25.add(ChunkStore(new_dir))
+            bm25.save(new_dir)
+            np.save(os.path.join(new_dir, TOMBSTONES_FILE), np.zeros(0, dtype=np.int64))
+
+            new = Manifest(new_dir)
+            new.db.execute("BEGIN")
+            new.set("index_type", built)
+            new.set("storage", storage)
+            new.db.executemany("INSERT INTO documents VALUES (?, ?, ?, ?)", documents)
+            new.db.executemany("INSERT INTO chunks VALUES (?, ?, ?, 1)",
+                               ((i, sources[r], fingerprints[r]) for i, r in enumerate(live)))
+            new.db.execute("COMMIT")
+            new.db.close()
+
+        swap_directory(index_dir, write)
+
+def start_compaction(index_dir, dim):
+    """Compact in a background thread; the process waits for it before exiting."""
+    thread = threading.Thread(target=compact, args=(index_dir, dim), name="rag-compaction")
+    thread.start()
+    return thread
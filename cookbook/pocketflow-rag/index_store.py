@@ -0,0 +1,250 @@
+import json
+import mmap
+import os
+import shutil
+import time
+import uuid
+from array import array
+
+import faiss
+import numpy as np
+
+from chunker import Chunk
+
+INDEX_FILE = "index.faiss"
+BLOB_FILE = "chunks.bin"
+OFFSETS_FILE = "offsets.npy"
+SOURCES_FILE = "sources.npy"
+DOCUMENTS_FILE = "documents.json"
+VECTORS_FILE = "vectors.bin"
+GENERATION_FILE = "generation"
+
+def _replace(directory, name, write):
+    # Write under a temporary name, then rename, so readers never see a half-written file
+    tmp = os.path.join(directory, name + ".tmp" + os.path.splitext(name)[1])
+    write(tmp)
+    os.replace(tmp, os.path.join(directory, name))
+
+def write_chunks(directory, chunks, append=False):
+    """
+    Stream chunk texts into `directory` as a UTF-8 blob plus offset table,
+    without holding them in memory. Chunks that carry a source (see
+    chunker.Chunk) also get their document and source offsets recorded.
+
+    With append=True the chunks are added after those already saved: the
+    blob is appended to in place, from the end the offset table records, and
+    only the offset and source tables are rewritten. Returns the range of
+    rows written.
+    """
+    os.makedirs(directory, exist_ok=True)
+    offsets, docs, starts, ends = array("Q", [0]), array("q"), array("q"), array("q")
+    documents = {}
+    append = append and os.path.exists(os.path.join(directory, OFFSETS_FILE))
+    if append:
+        old = ChunkStore(directory)
+        offsets = array("Q", old.offsets.tolist())
+        if old.sources is not None:
+            docs.extend(old.sources[:, 0].tolist())
+            starts.extend(old.sources[:, 1].tolist())
+            ends.extend(old.sources[:, 2].tolist())
+            documents = {_source_key(d): i for i, d in enumerate(old.documents)}
+        else:
+            docs.extend([-1] * len(old))
+            starts.extend([-1] * len(old))
+            ends.extend([-1] * len(old))
+    first = len(offsets) - 1
+
+    def write_blob(path):
+        with open(path, "r+b" if append else "wb") as f:
+            # Bytes past the last recorded offset are from a write that never got its offsets saved
+            f.seek(offsets[-1])
+            f.truncate()
+            for text in chunks:
+                data = text.encode("utf-8")
+                f.write(data)
+                offsets.append(offsets[-1] + len(data))
+                source = getattr(text, "source", None)
+                docs.append(-1 if source is None else documents.setdefault(_source_key(source), len(documents)))
+                starts.append(-1 if source is None else text.start)
+                ends.append(-1 if source is None else text.end)
+
+    if append:
+        write_blob(os.path.join(directory, BLOB_FILE))
+    else:
+        _replace(directory, BLOB_FILE, write_blob)
+    _replace(directory, OFFSETS_FILE, lambda tmp: np.save(tmp, np.frombuffer(offsets, dtype=np.uint64)))
+    if documents:
+        sources = np.stack([np.frombuffer(a, dtype=np.int64) for a in (docs, starts, ends)], axis=1)
+        _replace(directory, SOURCES_FILE, lambda tmp: np.save(tmp, sources))
+        _replace(directory, DOCUMENTS_FILE, lambda tmp: _write_json(tmp, [json.loads(d) for d in documents]))
+    else:
+        for name in (SOURCES_FILE, DOCUMENTS_FILE):
+            if os.path.exists(os.path.join(directory, name)):
+                os.remove(os.path.join(directory, name))
+    return range(first, len(offsets) - 1)
+
+def truncate_chunks(directory, rows):
+    """Drop every chunk from row `rows` on, if the store holds more."""
+    store = ChunkStore(directory)
+    if len(store) <= rows:
+        return
+    offsets, sources = np.array(store.offsets[:rows + 1]), store.sources
+    del store
+    with open(os.path.join(directory, BLOB_FILE), "r+b") as f:
+        f.truncate(int(offsets[-1]))
+    _replace(directory, OFFSETS_FILE, lambda tmp: np.save(tmp, offsets))
+    if sources is not None:
+        sources = np.array(sources[:rows])
+        _replace(directory, SOURCES_FILE, lambda tmp: np.save(tmp, sources))
+
+def _source_key(source):
+    # JSON text keeps document 0 (a position in `texts`) apart from a file named "0"
+    return json.dumps(source)
+
+def _write_json(path, value):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(value, f)
+
+def swap_directory(directory, write):
+    """
+    Build a complete replacement for `directory` with write(staging), in a
+    sibling directory, and swap it in with two renames. Whatever else was in
+    `directory` is dropped. The new directory gets a fresh generation id, so
+    open_consistent() can tell a reader that raced with the swap to retry.
+    """
+    directory = os.path.abspath(directory)
+    staging, retired = directory + ".staging", directory + ".old"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    write(staging)
+    with open(os.path.join(staging, GENERATION_FILE), "w") as f:
+        f.write(uuid.uuid4().hex)
+    shutil.rmtree(retired, ignore_errors=True)
+    if os.path.exists(directory):
+        os.rename(directory, retired)
+    os.rename(staging, directory)
+    shutil.rmtree(retired, ignore_errors=True)
+
+def _generation(directory):
+    try:
+        with open(os.path.join(directory, GENERATION_FILE)) as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+def open_consistent(directory, open_all, attempts=10):
+    """
+    Return open_all(directory), retried if a swap_directory() ran meanwhile,
+    so every file comes from the same version of the directory. Opened files
+    stay readable after a swap; they are memory-mapped or already read.
+    """
+    for attempt in range(attempts):
+        before = _generation(directory)
+        try:
+            opened = open_all(directory)
+            if _generation(directory) == before:
+                return opened
+        except (FileNotFoundError, RuntimeError):
+            # Opened while the old directory was renamed away (faiss raises RuntimeError)
+            if attempt == attempts - 1:
+                raise
+        time.sleep(0.01 * (attempt + 1))
+    raise RuntimeError(f"{directory} kept changing while it was opened")
+
+def save_index(directory, index, texts, vectors=None, bm25=None):
+    """
+    Write the FAISS index, the chunk texts (UTF-8 blob plus offset table),
+    `vectors` in full precision if given (for re-ranking a compressed index)
+    and the `bm25` index if given. The whole set is built beside `directory`
+    and swapped in at once (see swap_directory), so a reader never pairs the
+    new index with the old chunk table.
+    """
+    def write(staging):
+        _replace(staging, INDEX_FILE, lambda tmp: faiss.write_index(index, tmp))
+        write_chunks(staging, texts)
+        if vectors is not None:
+            _replace(staging, VECTORS_FILE, np.ascontiguousarray(vectors, dtype=np.float32).tofile)
+        if bm25 is not None:
+            bm25.save(staging)
+    swap_directory(directory, write)
+
+def read_index(path):
+    """Open a saved index memory-mapped and read-only where this faiss build supports it."""
+    # faiss >= 1.8 can mmap the vectors of flat indexes; older builds only mmap IVF lists
+    flags = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+    try:
+        return faiss.read_index(path, flags)
+    except RuntimeError:
+        return faiss.read_index(path)
+
+class VectorLog:
+    """Append-only float32 matrix file; row i holds the embedding of chunk row i."""
+
+    def __init__(self, directory, dim):
+        self.path, self.dim = os.path.join(directory, VECTORS_FILE), dim
+
+    def __len__(self):
+        return os.path.getsize(self.path) // (4 * self.dim) if os.path.exists(self.path) else 0
+
+    def truncate(self, rows):
+        """Drop every row from `rows` on, if the log holds more."""
+        if len(self) > rows:
+            os.truncate(self.path, rows * 4 * self.dim)
+
+    def append(self, vectors, reset=False):
+        with open(self.path, "wb" if reset else "ab") as f:
+            f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+
+    def open(self):
+        """The whole matrix, memory-mapped read-only; None if nothing was logged."""
+        if not len(self):
+            return None
+        return np.memmap(self.path, dtype=np.float32, mode="r", shape=(len(self), self.dim))
+
+    def rows(self, rows):
+        if not len(rows):
+            return np.empty((0, self.dim), dtype=np.float32)
+        return np.asarray(self.open()[np.asarray(rows)])
+
+class ChunkStore:
+    """
+    Read-only list of chunk texts backed by a memory-mapped blob. Opening it
+    reads nothing; texts are decoded on access, and worker processes that
+    open the same directory share the page cache. If the chunks were saved
+    with their sources, items are chunker.Chunk objects carrying them.
+    """
+
+    def __init__(self, directory):
+        self.offsets = np.load(os.path.join(directory, OFFSETS_FILE), mmap_mode="r")
+        self.sources, self.documents = None, None
+        if os.path.exists(os.path.join(directory, SOURCES_FILE)):
+            self.sources = np.load(os.path.join(directory, SOURCES_FILE), mmap_mode="r")
+            with open(os.path.join(directory, DOCUMENTS_FILE), encoding="utf-8") as f:
+                self.documents = json.load(f)
+        with open(os.path.join(directory, BLOB_FILE), "rb") as f:
+            # mmap refuses empty files
+            self._blob = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b""
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        i = int(i)
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        text = self._blob[int(self.offsets[i]):int(self.offsets[i + 1])].decode("utf-8")
+        if self.sources is None or self.sources[i, 0] < 0:
+            return text
+        doc, start, end = self.sources[i].tolist()
+        return Chunk(text, self.documents[doc], start, end)
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+def load_index(directory):
+    """Returns (index, chunk store) saved by save_index()."""
+    return read_index(os.path.join(directory, INDEX_FILE)), ChunkStore(directory)
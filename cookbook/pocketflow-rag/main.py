@@ -1,15 +1,21 @@
+import os
 import sys
-from flow import offline_flow, online_flow
+from flow import offline_flow, incremental_flow, online_flow, hybrid_online_flow, batch_retrieval_flow
 
 def run_rag_demo():
     """
     Run a demonstration of the RAG system.
     
     This function:
-    1. Indexes a set of sample documents (offline flow)
+    1. Indexes a set of sample documents and saves the index (offline flow),
+       unless a saved index exists and --reindex isn't given. With --update,
+       only new, changed and deleted documents are indexed (incremental flow)
     2. Takes a query from the command line
     3. Retrieves the most relevant document (online flow)
     4. Generates an answer using an LLM
+
+    With several queries, it embeds them in batches and retrieves for all of
+    them with batched index searches instead (batch retrieval flow).
     """
 
     # Sample texts - specialized/fictional content that benefits from RAG
@@ -57,29 +63,48 @@ def run_rag_demo():
     # Default query about the fictional technology
     default_query = "How to install PocketFlow?"
     
-    # Get query from command line if provided with --
-    query = default_query
-    for arg in sys.argv[1:]:
-        if arg.startswith("--"):
-            query = arg[2:]
-            break
+    # Get queries from command line if provided with --
+    queries = [arg[2:] for arg in sys.argv[1:] if arg.startswith("--") and arg not in ("--reindex", "--update")]
+    query = queries[0] if queries else default_query
     
     # Single shared store for both flows
     shared = {
         "texts": texts,
+        "paths": [],         # files or directories to chunk from disk as well
+        "chunk_dir": None,   # set to spill chunks to disk while chunking (large corpora)
         "embeddings": None,
         "index": None,
+        "bm25": None,
+        "index_dir": "rag_index",
+        "index_type": "flat",  # or "ivf_flat", "ivf_pq", "hnsw" (see ann_index.py)
+        "storage": "float32",  # or "float16", "int8", "pq": compressed vectors, re-ranked exactly
+        "retrieval_mode": "auto",  # or "hybrid", "vector", "lexical"
         "query": query,
+        "queries": queries,
         "query_embedding": None,
         "retrieved_document": None,
         "generated_answer": None
     }
     
-    # Initialize and run the offline flow (document indexing)
-    offline_flow.run(shared)
+    # Run the offline flow (document indexing) unless a saved index can be reused
+    if "--update" in sys.argv:
+        incremental_flow.run(shared)
+    elif "--reindex" in sys.argv or not os.path.exists(os.path.join(shared["index_dir"], "index.faiss")):
+        offline_flow.run(shared)
+    
+    if len(queries) > 1:
+        # Retrieve for every query with batched embedding requests and index searches
+        batch_retrieval_flow.run(shared)
+        for q, docs in zip(queries, shared["retrievals"]):
+            best = f"chunk {docs[0]['index']} (distance: {docs[0]['distance']:.4f})" if docs else "no match"
+            print(f"❓ {q} -> {best}")
+        return
     
     # Run the online flow to retrieve the most relevant document and generate an answer
-    online_flow.run(shared)
+    if shared["retrieval_mode"] == "vector":
+        online_flow.run(shared)
+    else:
+        hybrid_online_flow.run(shared)
 
 
 if __name__ == "__main__":
@@ -1,72 +1,262 @@
-from pocketflow import Node, Flow, BatchNode
+from concurrent.futures import ThreadPoolExecutor
+from pocketflow import Node, Flow
+import time
 import numpy as np
-import faiss
-from utils import call_llm, get_embedding, get_simple_embedding, fixed_size_chunk
+from index_store import save_index, load_index, open_consistent, write_chunks, ChunkStore, VectorLog
+from chunker import iter_chunks
+from bm25 import BM25Index, looks_lexical, reciprocal_rank_fusion
+from incremental import Manifest, is_indexed, diff_documents, chunk_documents, apply_changes, load_tombstones, start_compaction, locked
+from embedding_cache import text_key
+from ann_index import build_index, search, is_exact, bytes_per_vector
+from utils import call_llm, get_embedding, get_embeddings, get_cache, token_batches, EMBEDDING_DIM
 
 # Nodes for the offline flow
-class ChunkDocumentsNode(BatchNode):
+class ChunkDocumentsNode(Node):
+    def __init__(self, chunk_size=2000, overlap=200, boundary="sentence", max_retries=1, wait=0):
+        super().__init__(max_retries=max_retries, wait=wait)
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+        self.boundary = boundary
+
     def prep(self, shared):
-        """Read texts from shared store"""
-        return shared["texts"]
+        """Read in-memory texts, file/directory paths and the optional chunk directory from shared store"""
+        return shared.get("texts") or [], shared.get("paths") or [], shared.get("chunk_dir")
     
-    def exec(self, text):
-        """Chunk a single text into smaller pieces"""
-        return fixed_size_chunk(text)
+    def exec(self, inputs):
+        """Stream every document through the chunker"""
+        texts, paths, chunk_dir = inputs
+        chunks = iter_chunks(texts, paths, self.chunk_size, self.overlap, self.boundary)
+        if chunk_dir:
+            # Spill chunks to disk as they are produced, so memory stays flat for any corpus size
+            write_chunks(chunk_dir, chunks)
+            return ChunkStore(chunk_dir)
+        return list(chunks)
     
-    def post(self, shared, prep_res, exec_res_list):
-        """Store chunked texts in the shared store"""
-        # Flatten the list of lists into a single list of chunks
-        all_chunks = []
-        for chunks in exec_res_list:
-            all_chunks.extend(chunks)
-        
-        # Replace the original texts with the flat list of chunks
-        shared["texts"] = all_chunks
-        
-        print(f"✅ Created {len(all_chunks)} chunks from {len(prep_res)} documents")
+    def post(self, shared, prep_res, exec_res):
+        """Replace the original texts with the chunks, which carry their source offsets"""
+        shared["texts"] = exec_res
+        texts, paths, _ = prep_res
+        from_paths = f" and {len(paths)} path(s)" if paths else ""
+        print(f"✅ Created {len(exec_res)} chunks from {len(texts)} documents{from_paths}")
         return "default"
     
-class EmbedDocumentsNode(BatchNode):
+class EmbedDocumentsNode(Node):
+    def __init__(self, max_workers=4, max_retries=3, wait=1):
+        super().__init__(max_retries=max_retries, wait=wait)
+        self.max_workers = max_workers
+
     def prep(self, shared):
-        """Read texts from shared store and return as an iterable"""
-        return shared["texts"]
+        """Preallocate the embedding matrix and split the texts into token-aware batches"""
+        return self.plan_batches(shared["texts"])
+
+    def plan_batches(self, texts):
+        embeddings = np.empty((len(texts), EMBEDDING_DIM), dtype=np.float32)
+        batches = [(embeddings[start:stop], texts[start:stop]) for start, stop in token_batches(texts)]
+        return embeddings, batches
     
-    def exec(self, text):
-        """Embed a single text"""
-        return get_embedding(text)
+    def exec(self, batch):
+        """Embed one batch with a single request, straight into its rows of the matrix"""
+        rows, texts = batch
+        get_embeddings(texts, out=rows)
+        return len(texts)
+
+    def _exec_batch(self, batch):
+        # Node._exec keeps its retry count in self.cur_retry, which threads would share
+        for attempt in range(self.max_retries):
+            try:
+                return self.exec(batch)
+            except Exception as e:
+                if attempt == self.max_retries - 1:
+                    return self.exec_fallback(batch, e)
+                if self.wait > 0:
+                    time.sleep(self.wait)
+
+    def _exec(self, prep_res):
+        # Up to max_workers batches in flight; retries and fallback apply to each batch
+        embeddings, batches = prep_res
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            list(pool.map(self._exec_batch, batches))
+        return embeddings
     
-    def post(self, shared, prep_res, exec_res_list):
+    def post(self, shared, prep_res, embeddings):
         """Store embeddings in the shared store"""
-        embeddings = np.array(exec_res_list, dtype=np.float32)
         shared["embeddings"] = embeddings
-        print(f"✅ Created {len(embeddings)} document embeddings")
+        print(f"✅ Created {len(embeddings)} document embeddings in {len(prep_res[1])} batch request(s)")
+        cache = get_cache()
+        if cache is not None:
+            stats = cache.stats()
+            print(f"💾 Embedding cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%} hit rate)")
         return "default"
 
 class CreateIndexNode(Node):
     def prep(self, shared):
-        """Get embeddings from shared store"""
-        return shared["embeddings"]
+        """Get embeddings, the index type and the vector storage from shared store"""
+        return shared["embeddings"], shared.get("index_type", "flat"), shared.get("storage", "float32")
     
-    def exec(self, embeddings):
-        """Create FAISS index and add embeddings"""
+    def exec(self, inputs):
+        """Create and train (for IVF and quantized storage) the FAISS index and add embeddings"""
+        embeddings, index_type, storage = inputs
         print("🔍 Creating search index...")
-        dimension = embeddings.shape[1]
-        
-        # Create a flat L2 index
-        index = faiss.IndexFlatL2(dimension)
-        
-        # Add the embeddings to the index
-        index.add(embeddings)
-        
+        index, built = build_index(index_type, embeddings, storage=storage)
+        if built != index_type:
+            print(f"⚠️ Too few vectors to train {index_type}, using {built}")
         return index
     
     def post(self, shared, prep_res, exec_res):
-        """Store the index in shared store"""
+        """Store the index, and the full-precision vectors a compressed index is re-ranked with"""
         shared["index"] = exec_res
-        print(f"✅ Index created with {exec_res.ntotal} vectors")
+        shared["vectors"] = None if is_exact(exec_res) else prep_res[0]
+        print(f"✅ Index created with {exec_res.ntotal} vectors ({bytes_per_vector(exec_res):,} bytes each)")
+        return "default"
+
+class CreateLexicalIndexNode(Node):
+    def prep(self, shared):
+        """Get the chunks from shared store"""
+        return shared["texts"]
+
+    def exec(self, texts):
+        """Build the BM25 inverted index over the same rows as the vector index"""
+        bm25 = BM25Index()
+        bm25.add(texts)
+        return bm25
+
+    def post(self, shared, prep_res, exec_res):
+        shared["bm25"] = exec_res
+        print(f"✅ Lexical index created with {len(exec_res)} chunks and {len(exec_res.vocab)} terms")
+        return "default"
+
+class SaveIndexNode(Node):
+    def prep(self, shared):
+        """Get the indexes, the chunks and the target directory"""
+        return shared.get("index_dir"), shared["index"], shared["texts"], shared.get("bm25"), shared.get("vectors")
+
+    def exec(self, inputs):
+        """Persist the indexes and the chunk store"""
+        index_dir, index, texts, bm25, vectors = inputs
+        if index_dir:
+            # The new directory holds no manifest or tombstones: row numbers start again from 0
+            with locked(index_dir):
+                save_index(index_dir, index, texts, vectors, bm25)
+        return index_dir
+
+    def post(self, shared, prep_res, exec_res):
+        if exec_res:
+            print(f"💾 Saved index and {len(prep_res[2])} chunks to {exec_res}/")
+        return "default"
+
+# Nodes for the incremental offline flow
+class DiffDocumentsNode(ChunkDocumentsNode):
+    def prep(self, shared):
+        """Read the corpus and the index directory from shared store"""
+        return shared.get("texts") or [], shared.get("paths") or [], shared["index_dir"]
+
+    def exec(self, inputs):
+        """Fingerprint every document against the manifest and chunk only the new or changed ones"""
+        texts, paths, index_dir = inputs
+        manifest = Manifest(index_dir)
+        if not is_indexed(index_dir):
+            manifest.reset()
+        changed, touched, deleted = diff_documents(manifest, texts, paths)
+        chunks = chunk_documents(texts, changed, self.chunk_size, self.overlap, self.boundary)
+        return {"chunks": chunks, "changed": changed, "touched": touched, "deleted": deleted}
+
+    def post(self, shared, prep_res, exec_res):
+        shared["changes"] = exec_res
+        print(f"🔍 {len(exec_res['changed'])} new or changed and {len(exec_res['deleted'])} deleted document(s), "
+              f"{len(exec_res['chunks'])} chunks to index")
+        return "default"
+
+class EmbedChangedChunksNode(EmbedDocumentsNode):
+    def prep(self, shared):
+        """Reuse the logged vector of any chunk already indexed with the same text; batch the rest"""
+        chunks = shared["changes"]["chunks"]
+        fingerprints = [text_key(c) for c in chunks]
+        known = Manifest(shared["index_dir"]).rows_by_fingerprint(fingerprints) if is_indexed(shared["index_dir"]) else {}
+        reuse = [i for i, fp in enumerate(fingerprints) if fp in known]
+        missing = [i for i, fp in enumerate(fingerprints) if fp not in known]
+        embeddings, batches = self.plan_batches([chunks[i] for i in missing])
+        reused = VectorLog(shared["index_dir"], EMBEDDING_DIM).rows([known[fingerprints[i]] for i in reuse])
+        return embeddings, batches, reuse, missing, reused
+
+    def _exec(self, prep_res):
+        return super()._exec(prep_res[:2])
+
+    def post(self, shared, prep_res, embeddings):
+        _, batches, reuse, missing, reused = prep_res
+        vectors = np.empty((len(reuse) + len(missing), EMBEDDING_DIM), dtype=np.float32)
+        vectors[reuse] = reused
+        vectors[missing] = embeddings
+        shared["changes"]["vectors"] = vectors
+        print(f"✅ Embedded {len(missing)} chunks in {len(batches)} batch request(s), reused {len(reuse)} vectors")
+        return "default"
+
+class ApplyChangesNode(Node):
+    def prep(self, shared):
+        return shared["index_dir"], shared["changes"], shared.get("index_type", "flat"), shared.get("storage", "float32")
+
+    def exec(self, inputs):
+        """Remove stale rows and append the new chunks to every index file"""
+        index_dir, changes, index_type, storage = inputs
+        return apply_changes(index_dir, changes["chunks"], changes["vectors"], changes["changed"],
+                             changes["touched"], changes["deleted"], index_type, storage)
+
+    def post(self, shared, prep_res, exec_res):
+        shared["index_stats"] = exec_res
+        shared["index"] = None  # the online flow reopens the updated files
+        print(f"💾 Added {exec_res['added']} and removed {exec_res['removed']} chunks: "
+              f"{exec_res['live']} live, {exec_res['dead']} dead")
+        return "default"
+
+class CompactIndexNode(Node):
+    def __init__(self, max_dead_ratio=0.2, max_retries=1, wait=0):
+        super().__init__(max_retries=max_retries, wait=wait)
+        self.max_dead_ratio = max_dead_ratio
+
+    def prep(self, shared):
+        return shared["index_dir"], shared["index_stats"]
+
+    def exec(self, inputs):
+        """Start a background compaction once too many rows are dead"""
+        index_dir, stats = inputs
+        total = stats["live"] + stats["dead"]
+        if total == 0 or stats["dead"] / total <= self.max_dead_ratio:
+            return None
+        return start_compaction(index_dir, EMBEDDING_DIM)
+
+    def post(self, shared, prep_res, exec_res):
+        if exec_res is not None:
+            shared["compaction"] = exec_res
+            stats = prep_res[1]
+            print(f"🧹 Compacting {prep_res[0]}/ in the background ({stats['dead']} of {stats['live'] + stats['dead']} rows dead)")
         return "default"
 
 # Nodes for the online flow
+class LoadIndexNode(Node):
+    def prep(self, shared):
+        """Nothing to do if this process already has an index"""
+        if shared.get("index") is not None:
+            return None
+        return shared["index_dir"]
+
+    def exec(self, index_dir):
+        """Open the saved index and chunk store memory-mapped"""
+        if index_dir is None:
+            return None
+        def open_all(directory):
+            index, texts = load_index(directory)
+            bm25 = BM25Index.load(directory) if BM25Index.exists(directory) else None
+            vectors = None if is_exact(index) else VectorLog(directory, index.d).open()
+            return index, texts, bm25, load_tombstones(directory), vectors
+
+        start = time.perf_counter()
+        return *open_consistent(index_dir, open_all), time.perf_counter() - start
+
+    def post(self, shared, prep_res, exec_res):
+        if exec_res is not None:
+            shared["index"], shared["texts"], shared["bm25"], shared["tombstones"], shared["vectors"], seconds = exec_res
+            print(f"📂 Opened index ({shared['index'].ntotal} vectors) and chunk store from {prep_res}/ in {seconds * 1000:.1f} ms")
+        return "default"
+
 class EmbedQueryNode(Node):
     def prep(self, shared):
         """Get query from shared store"""
@@ -84,51 +274,156 @@ class EmbedQueryNode(Node):
         return "default"
 
 class RetrieveDocumentNode(Node):
+    def __init__(self, top_k=1, max_distance=None, rerank_factor=4, max_retries=1, wait=0):
+        super().__init__(max_retries=max_retries, wait=wait)
+        self.top_k = top_k
+        self.max_distance = max_distance
+        self.rerank_factor = rerank_factor
+
     def prep(self, shared):
-        """Get query embedding, index, and texts from shared store"""
-        return shared["query_embedding"], shared["index"], shared["texts"]
+        """Get query embedding, index, texts, deleted rows and full-precision vectors from shared store"""
+        vectors = shared.get("vectors") if self.rerank_factor else None
+        return shared["query_embedding"], shared["index"], shared["texts"], shared.get("tombstones"), vectors
     
     def exec(self, inputs):
-        """Search the index for similar documents"""
+        """Search the index for the top_k documents within max_distance, re-ranked exactly if the index is compressed"""
         print("🔎 Searching for relevant documents...")
-        query_embedding, index, texts = inputs
-        
-        # Search for the most similar document
-        distances, indices = index.search(query_embedding, k=1)
-        
-        # Get the index of the most similar document
-        best_idx = indices[0][0]
-        distance = distances[0][0]
-        
-        # Get the corresponding text
-        most_relevant_text = texts[best_idx]
-        
-        return {
-            "text": most_relevant_text,
-            "index": best_idx,
-            "distance": distance
-        }
+        query_embedding, index, texts, tombstones, vectors = inputs
+        hits = search(index, query_embedding, self.top_k, self.max_distance, exclude=tombstones,
+                      vectors=vectors, rerank_factor=self.rerank_factor)[0]
+        return [{"text": texts[i], "index": i, "distance": d} for i, d in hits]
     
     def post(self, shared, prep_res, exec_res):
-        """Store retrieved document in shared store"""
-        shared["retrieved_document"] = exec_res
-        print(f"📄 Retrieved document (index: {exec_res['index']}, distance: {exec_res['distance']:.4f})")
-        print(f"📄 Most relevant text: \"{exec_res['text']}\"")
+        """Store retrieved documents in shared store, best first"""
+        shared["retrieved_documents"] = exec_res
+        shared["retrieved_document"] = exec_res[0] if exec_res else None
+        if not exec_res:
+            print("📄 No document within the distance threshold")
+        for doc in exec_res:
+            print(f"📄 Retrieved document (index: {doc['index']}, distance: {doc['distance']:.4f})")
+        if exec_res:
+            print(f"📄 Most relevant text: \"{exec_res[0]['text']}\"")
+        return "default"
+
+class HybridRetrieveNode(Node):
+    """
+    Retrieve with BM25 and vector search, fused by reciprocal rank fusion.
+
+    shared["retrieval_mode"] picks the retrievers: "hybrid", "vector",
+    "lexical", or "auto" (the default): lexical for queries that are only
+    identifiers or quoted (see bm25.looks_lexical), hybrid otherwise.
+    Lexical retrieval needs no embedding call; in auto mode a lexical query
+    that matches no chunk is searched again as hybrid.
+    """
+
+    def __init__(self, top_k=1, candidates=20, rrf_k=60, rerank_factor=4, max_retries=1, wait=0):
+        super().__init__(max_retries=max_retries, wait=wait)
+        self.top_k = top_k
+        self.candidates = candidates
+        self.rrf_k = rrf_k
+        self.rerank_factor = rerank_factor
+
+    def prep(self, shared):
+        mode = shared.get("retrieval_mode", "auto")
+        auto = mode == "auto"
+        if auto:
+            mode = "lexical" if looks_lexical(shared["query"]) else "hybrid"
+        if shared.get("bm25") is None:
+            mode = "vector"
+        vectors = shared.get("vectors") if self.rerank_factor else None
+        return shared["query"], mode, auto, shared["index"], shared.get("bm25"), shared["texts"], shared.get("tombstones"), vectors
+
+    def exec(self, inputs):
+        query, mode, auto, index, bm25, texts, tombstones, vectors = inputs
+        print(f"🔎 Searching for relevant documents ({mode})...")
+        rankings = []
+        if mode in ("lexical", "hybrid"):
+            rankings.append([i for i, _ in bm25.search(query, self.candidates)])
+            if auto and mode == "lexical" and not rankings[0]:
+                # The query looked like an identifier but no chunk contains it
+                mode = "hybrid"
+                print(f"🔎 No lexical match, searching again ({mode})...")
+        if mode in ("vector", "hybrid"):
+            query_embedding = np.array([get_embedding(query)], dtype=np.float32)
+            hits = search(index, query_embedding, self.candidates, exclude=tombstones,
+                          vectors=vectors, rerank_factor=self.rerank_factor)[0]
+            rankings.append([i for i, _ in hits])
+        fused = reciprocal_rank_fusion(rankings, self.rrf_k)[:self.top_k]
+        return [{"text": texts[i], "index": i, "score": score} for i, score in fused]
+
+    def post(self, shared, prep_res, exec_res):
+        """Store retrieved documents in shared store, best first"""
+        shared["retrieved_documents"] = exec_res
+        shared["retrieved_document"] = exec_res[0] if exec_res else None
+        if not exec_res:
+            print("📄 No matching document")
+        for doc in exec_res:
+            print(f"📄 Retrieved document (index: {doc['index']}, RRF score: {doc['score']:.4f})")
+        if exec_res:
+            print(f"📄 Most relevant text: \"{exec_res[0]['text']}\"")
+        return "default"
+
+class EmbedQueriesNode(EmbedDocumentsNode):
+    """Embed shared["queries"] in the same token-aware, parallel batches as the documents"""
+
+    def prep(self, shared):
+        return self.plan_batches(shared["queries"])
+
+    def post(self, shared, prep_res, embeddings):
+        shared["query_embeddings"] = embeddings
+        print(f"✅ Embedded {len(embeddings)} queries in {len(prep_res[1])} batch request(s)")
+        return "default"
+
+class BatchRetrieveNode(Node):
+    """Retrieve for every query in shared["query_embeddings"], one index.search per batch_size queries"""
+
+    def __init__(self, top_k=1, max_distance=None, batch_size=1024, rerank_factor=4, max_retries=1, wait=0):
+        super().__init__(max_retries=max_retries, wait=wait)
+        self.top_k = top_k
+        self.max_distance = max_distance
+        self.batch_size = batch_size
+        self.rerank_factor = rerank_factor
+
+    def prep(self, shared):
+        vectors = shared.get("vectors") if self.rerank_factor else None
+        return shared["query_embeddings"], shared["index"], shared["texts"], shared.get("tombstones"), vectors
+
+    def exec(self, inputs):
+        query_embeddings, index, texts, tombstones, vectors = inputs
+        start = time.perf_counter()
+        hits = search(index, query_embeddings, self.top_k, self.max_distance, self.batch_size, tombstones,
+                      vectors, self.rerank_factor)
+        seconds = time.perf_counter() - start
+        # Decode each retrieved chunk once, however many queries share it
+        rows = {i for query_hits in hits for i, _ in query_hits}
+        chunks = {i: texts[i] for i in rows}
+        results = [[{"text": chunks[i], "index": i, "distance": d} for i, d in query_hits] for query_hits in hits]
+        return results, seconds
+
+    def post(self, shared, prep_res, exec_res):
+        results, seconds = exec_res
+        shared["retrievals"] = results
+        empty = sum(1 for docs in results if not docs)
+        qps = len(results) / seconds if seconds > 0 else float("inf")
+        print(f"🔎 Searched {len(results)} queries in {seconds * 1000:.1f} ms ({qps:,.0f} queries/s)")
+        if empty:
+            print(f"⚠️ {empty} queries had no document within the distance threshold")
         return "default"
     
 class GenerateAnswerNode(Node):
     def prep(self, shared):
-        """Get query, retrieved document, and any other context needed"""
-        return shared["query"], shared["retrieved_document"]
+        """Get query, retrieved documents, and any other context needed"""
+        return shared["query"], shared["retrieved_documents"]
     
     def exec(self, inputs):
         """Generate an answer using the LLM"""
-        query, retrieved_doc = inputs
+        query, docs = inputs
+        context = "\n\n".join(doc["text"] for doc in docs)
         
         prompt = f"""
 Briefly answer the following question based on the context provided:
 Question: {query}
-Context: {retrieved_doc['text']}
+Context: {context}
 Answer:
 """
         
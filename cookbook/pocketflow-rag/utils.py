@@ -1,34 +1,95 @@
 import os
+import threading
 import numpy as np
 from openai import OpenAI
+from embedding_cache import EmbeddingCache
+
+EMBEDDING_MODEL = "text-embedding-ada-002"
+EMBEDDING_DIM = 1536
+
+# OpenAI limits per embeddings request: 2048 inputs and 300k tokens in total
+MAX_BATCH_ITEMS = 2048
+MAX_BATCH_TOKENS = 100_000
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+    def count_tokens(text):
+        return len(_encoding.encode(text))
+except ImportError:
+    def count_tokens(text):
+        # Rough estimate for English text when tiktoken isn't installed
+        return len(text) // 4 + 1
+
+# Shared by every cookbook that uses the same directory; set EMBEDDING_CACHE_DIR="" to disable
+EMBEDDING_CACHE_DIR = os.environ.get("EMBEDDING_CACHE_DIR", os.path.expanduser("~/.cache/pocketflow/embeddings"))
+
+_client = None
+_cache = None
+_init_lock = threading.Lock()  # EmbedDocumentsNode calls in from several threads
+
+def get_client():
+    """One OpenAI client for the whole process; it pools connections and is thread-safe."""
+    global _client
+    with _init_lock:
+        if _client is None:
+            _client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY", "your-api-key"))
+    return _client
+
+def get_cache():
+    """The process-wide embedding cache, or None if disabled."""
+    global _cache
+    with _init_lock:
+        if _cache is None and EMBEDDING_CACHE_DIR:
+            _cache = EmbeddingCache(EMBEDDING_CACHE_DIR, EMBEDDING_MODEL, EMBEDDING_DIM)
+    return _cache
 
 def call_llm(prompt):    
-    client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY", "your-api-key"))
-    r = client.chat.completions.create(
+    r = get_client().chat.completions.create(
         model="gpt-4o",
         messages=[{"role": "user", "content": prompt}]
     )
     return r.choices[0].message.content
 
 def get_embedding(text):
-    client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY", "your-api-key"))
-    
-    response = client.embeddings.create(
-        model="text-embedding-ada-002",
-        input=text
+    return get_embeddings([text])[0]
+
+def get_embeddings(texts, out=None):
+    """
+    Embed a list of texts in one request. Rows are written straight into
+    `out` (a float32 array of shape (len(texts), EMBEDDING_DIM)) if given.
+    Cached texts are read from the embedding cache and only the misses are
+    sent to the API.
+    """
+    if out is None:
+        out = np.empty((len(texts), EMBEDDING_DIM), dtype=np.float32)
+    cache = get_cache()
+    misses = cache.lookup(texts, out) if cache is not None else list(range(len(texts)))
+    if not misses:
+        return out
+    miss_texts = [texts[i] for i in misses]
+    response = get_client().embeddings.create(
+        model=EMBEDDING_MODEL,
+        input=miss_texts
     )
-    
-    # Extract the embedding vector from the response
-    embedding = response.data[0].embedding
-    
-    # Convert to numpy array for consistency with other embedding functions
-    return np.array(embedding, dtype=np.float32)
+    for item in response.data:
+        out[misses[item.index]] = item.embedding
+    if cache is not None:
+        cache.add(miss_texts, out[misses])
+    return out
 
-def fixed_size_chunk(text, chunk_size=2000):
-    chunks = []
-    for i in range(0, len(text), chunk_size):
-        chunks.append(text[i : i + chunk_size])
-    return chunks
+def token_batches(texts, max_tokens=MAX_BATCH_TOKENS, max_items=MAX_BATCH_ITEMS):
+    """Split texts into consecutive (start, stop) ranges that fit one embeddings request."""
+    batches, start, tokens = [], 0, 0
+    for i, text in enumerate(texts):
+        n = count_tokens(text)
+        if i > start and (tokens + n > max_tokens or i - start >= max_items):
+            batches.append((start, i))
+            start, tokens = i, 0
+        tokens += n
+    if start < len(texts):
+        batches.append((start, len(texts)))
+    return batches
 
 if __name__ == "__main__":
     print("=== Testing call_llm ===")
@@ -42,8 +103,7 @@ if __name__ == "__main__":
     text1 = "The quick brown fox jumps over the lazy dog."
     text2 = "Python is a popular programming language for data science."
     
-    oai_emb1 = get_embedding(text1)
-    oai_emb2 = get_embedding(text2)
+    oai_emb1, oai_emb2 = get_embeddings([text1, text2])
     print(f"OpenAI Embedding 1 shape: {oai_emb1.shape}")
     oai_similarity = np.dot(oai_emb1, oai_emb2)
     print(f"OpenAI similarity between texts: {oai_similarity:.4f}")
\ No newline at end of file
@@ -0,0 +1,15 @@
+from pocketflow import AsyncFlow
+
+from nodes import Outline, WriteSection, Critique, Revise, WordCount
+
+class ReviewFlow(AsyncFlow):
+    """Critique, then revise."""
+
+def create_flow():
+    critique = Critique()
+    critique >> Revise()
+    review = ReviewFlow(start=critique)
+
+    outline = Outline()
+    outline >> WriteSection() >> review >> WordCount()
+    return AsyncFlow(start=outline)
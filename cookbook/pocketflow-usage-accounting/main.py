@@ -0,0 +1,36 @@
+import asyncio
+import os
+
+from flow import create_flow
+from usage import UsageLedger
+
+TOPICS = ["vector databases", "agent memory", "batch inference"]
+
+async def main():
+    flow = create_flow()
+    ledger = UsageLedger()
+    with ledger.track(flow):
+        # Three runs at once; each is accounted separately
+        await asyncio.gather(*(flow.run_async({"topic": t}) for t in TOPICS))
+
+    t = ledger.totals()
+    print(f"{len(TOPICS)} runs, {t['calls']} LLM calls, {t['total_tokens']:,} tokens, ${t['cost']:.4f}\n")
+    print("=== By node ===")
+    print(ledger.format_table("node"))
+    print("\n=== By path ===")
+    print(ledger.format_table("path"))
+    print("\n=== WriteSection by batch item ===")
+    items = {k: g for k, g in ledger.summary(("node", "item")).items() if k[0] == "WriteSection"}
+    for (_, item), g in sorted(items.items(), key=lambda kv: kv[0][1]):
+        print(f"item {item}: {g['calls']} calls, {g['completion_tokens']:,} completion tokens, ${g['cost']:.5f}")
+    print("\n=== By run ===")
+    for run, g in sorted(ledger.summary("run").items()):
+        print(f"run {run}: {g['total_tokens']:,} tokens, ${g['cost']:.4f}")
+
+    os.makedirs("output", exist_ok=True)
+    ledger.to_csv("output/usage.csv")
+    ledger.to_jsonl("output/usage.jsonl")
+    print(f"\nExported {len(ledger.records)} records to output/usage.csv and output/usage.jsonl")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,60 @@
+from pocketflow import Node, AsyncNode, AsyncParallelBatchNode
+
+from utils import call_llm
+
+class Outline(AsyncNode):
+    async def prep_async(self, shared):
+        return shared["topic"]
+
+    async def exec_async(self, topic):
+        await call_llm(f"Write a four-section outline for an article about {topic}", model="gpt-4o", words=60)
+        return [f"{topic}: part {i}" for i in range(1, 5)]
+
+    async def post_async(self, shared, prep_res, exec_res):
+        shared["outline"] = exec_res
+
+class WriteSection(AsyncParallelBatchNode):
+    async def prep_async(self, shared):
+        return shared["outline"]
+
+    async def exec_async(self, heading):
+        # The last section is the long-form deep dive
+        words = 900 if heading.endswith("4") else 250
+        return await call_llm(f"Write the section '{heading}'", words=words)
+
+    async def post_async(self, shared, prep_res, exec_res):
+        shared["draft"] = "\n\n".join(exec_res)
+
+class Critique(AsyncNode):
+    async def prep_async(self, shared):
+        return shared["draft"]
+
+    async def exec_async(self, draft):
+        # The whole draft goes into the prompt of the expensive model
+        return await call_llm(f"Critique this draft:\n{draft}", model="gpt-4o", words=120)
+
+    async def post_async(self, shared, prep_res, exec_res):
+        shared["critique"] = exec_res
+
+class Revise(AsyncNode):
+    async def prep_async(self, shared):
+        return shared["draft"], shared["critique"]
+
+    async def exec_async(self, inputs):
+        draft, critique = inputs
+        return await call_llm(f"Revise the draft.\nCritique: {critique}\nDraft:\n{draft}", words=1200)
+
+    async def post_async(self, shared, prep_res, exec_res):
+        shared["article"] = exec_res
+
+class WordCount(Node):
+    """No LLM: shows up with time but no cost."""
+
+    def prep(self, shared):
+        return shared["article"]
+
+    def exec(self, article):
+        return len(article.split())
+
+    def post(self, shared, prep_res, exec_res):
+        shared["words"] = exec_res
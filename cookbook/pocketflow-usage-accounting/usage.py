@@ -0,0 +1,257 @@
+import asyncio
+import contextvars
+import csv
+import itertools
+import json
+import time
+
+from pocketflow import Flow, AsyncNode, BatchNode, AsyncBatchNode, AsyncParallelBatchNode
+
+# USD per 1M tokens: (prompt, completion). Edit for your models and contract.
+PRICES = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "text-embedding-3-small": (0.02, 0.0),
+}
+
+FIELDS = ("run", "path", "node", "item", "model", "prompt_tokens", "completion_tokens", "cost", "latency")
+
+class _Scope:
+    __slots__ = ("ledger", "run", "path", "item")
+
+    def __init__(self, ledger, run, path, item=None):
+        self.ledger, self.run, self.path, self.item = ledger, run, path, item
+
+_scope = contextvars.ContextVar("pocketflow_usage_scope", default=None)
+
+class UsageRecord:
+    """One LLM call, attributed to the run, node path and batch item it happened in."""
+    __slots__ = FIELDS
+
+    def __init__(self, **fields):
+        for name in FIELDS:
+            setattr(self, name, fields.get(name))
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in FIELDS}
+
+def price(model, prompt_tokens, completion_tokens):
+    p_in, p_out = PRICES.get(model, (0.0, 0.0))
+    return (prompt_tokens * p_in + completion_tokens * p_out) / 1e6
+
+def record_usage(model, prompt_tokens, completion_tokens=0, latency=None, cost=None):
+    """
+    Report one LLM call from a utility function. Attributed to the node and
+    batch item running in the current context; a no-op outside a tracked flow.
+    `cost` defaults to a PRICES lookup.
+    """
+    scope = _scope.get()
+    if scope is None:
+        return None
+    rec = UsageRecord(run=scope.run, path="/".join(scope.path), node=scope.path[-1], item=scope.item,
+                      model=model, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                      cost=price(model, prompt_tokens, completion_tokens) if cost is None else cost,
+                      latency=latency)
+    scope.ledger.records.append(rec)
+    return rec
+
+def record_openai_usage(response, latency=None):
+    """record_usage() from an OpenAI-style response (object or dict) with a `usage` field."""
+    get = (lambda o, k: o.get(k)) if isinstance(response, dict) else getattr
+    usage = get(response, "usage")
+    if usage is None:  # e.g. streaming without stream_options={"include_usage": True}
+        return None
+    uget = (lambda o, k: o.get(k)) if isinstance(usage, dict) else getattr
+    return record_usage(get(response, "model"), uget(usage, "prompt_tokens") or 0,
+                        uget(usage, "completion_tokens") or 0, latency)
+
+def _graph(flow):
+    seen, stack = {}, [flow]
+    while stack:
+        node = stack.pop()
+        if node is None or id(node) in seen:
+            continue
+        seen[id(node)] = node
+        stack.extend(node.successors.values())
+        if isinstance(node, Flow):
+            stack.append(node.start_node)
+    return seen.values()
+
+def _batch_base(cls):
+    """The core batch class whose per-item loop `cls` inherits unchanged, if any."""
+    for base in (AsyncParallelBatchNode, AsyncBatchNode, BatchNode):
+        if issubclass(cls, base):
+            return base if cls._exec is base._exec else None
+    return None
+
+class UsageLedger:
+    """
+    Attributes LLM usage reported through record_usage() to runs, nodes and
+    batch items of a flow, and times every node.
+
+    While `with ledger.track(flow):` is active, the _run / _run_async of every
+    class in the graph is wrapped at class level (flows copy.copy their nodes,
+    so instance-level wrappers would be bypassed). Each wrapper pushes the
+    node's name onto a ContextVar path, so nested flows read as
+    "Outer/Inner/Node", and concurrent runs and asyncio.gather branches stay
+    separate. A root-level run gets a new run number. Batch nodes that keep
+    the core per-item loop also record the item index.
+    """
+
+    def __init__(self):
+        self.records = []
+        self.node_runs = []    # (run, path, node, seconds) per node execution
+        self._runs = itertools.count(1)
+        self._saved = []
+
+    # ---- instrumentation ---------------------------------------------------
+    def track(self, flow):
+        self._classes = {type(n) for n in _graph(flow)}
+        return self
+
+    def __enter__(self):
+        # Resolve every original before patching, so a subclass in the same graph isn't wrapped twice
+        plan = []
+        for cls in self._classes:
+            run_name = "_run_async" if issubclass(cls, AsyncNode) else "_run"
+            plan.append((cls, run_name, getattr(cls, run_name), _batch_base(cls)))
+        for cls, run_name, run, base in plan:
+            for name in (run_name, "_exec"):
+                self._saved.append((cls, name, cls.__dict__.get(name)))
+            setattr(cls, run_name, self._wrap_async(run) if run_name == "_run_async" else self._wrap(run))
+            if base is not None:
+                cls._exec = self._wrap_batch(base)
+        return self
+
+    def __exit__(self, *exc):
+        for cls, name, original in reversed(self._saved):
+            if original is None:
+                if name in cls.__dict__:
+                    delattr(cls, name)
+            else:
+                setattr(cls, name, original)
+        self._saved.clear()
+
+    def _enter_node(self, node):
+        parent = _scope.get()
+        name = getattr(node, "name", None) or type(node).__name__
+        if parent is None or parent.ledger is not self:
+            scope = _Scope(self, next(self._runs), (name,))
+        else:
+            scope = _Scope(self, parent.run, parent.path + (name,), parent.item)
+        return scope, _scope.set(scope), time.perf_counter()
+
+    def _exit_node(self, scope, token, start):
+        self.node_runs.append((scope.run, "/".join(scope.path), scope.path[-1], time.perf_counter() - start))
+        _scope.reset(token)
+
+    def _wrap(self, run):
+        ledger = self
+        def _run(self, shared):
+            scope, token, start = ledger._enter_node(self)
+            try:
+                return run(self, shared)
+            finally:
+                ledger._exit_node(scope, token, start)
+        return _run
+
+    def _wrap_async(self, run):
+        ledger = self
+        async def _run_async(self, shared):
+            scope, token, start = ledger._enter_node(self)
+            try:
+                return await run(self, shared)
+            finally:
+                ledger._exit_node(scope, token, start)
+        return _run_async
+
+    def _wrap_batch(self, base):
+        def with_item(i):
+            s = _scope.get()
+            return _scope.set(_Scope(s.ledger, s.run, s.path, i)) if s is not None else None
+
+        if base is BatchNode:
+            def _exec(self, items):
+                out = []
+                for i, item in enumerate(items or []):
+                    token = with_item(i)
+                    try:
+                        out.append(super(BatchNode, self)._exec(item))
+                    finally:
+                        if token: _scope.reset(token)
+                return out
+        elif base is AsyncBatchNode:
+            async def _exec(self, items):
+                out = []
+                for i, item in enumerate(items):
+                    token = with_item(i)
+                    try:
+                        out.append(await super(AsyncBatchNode, self)._exec(item))
+                    finally:
+                        if token: _scope.reset(token)
+                return out
+        else:
+            async def _exec(self, items):
+                async def one(i, item):
+                    with_item(i)  # each gathered task runs in its own copy of the context
+                    return await super(AsyncParallelBatchNode, self)._exec(item)
+                return await asyncio.gather(*(one(i, item) for i, item in enumerate(items)))
+        return _exec
+
+    # ---- aggregation -------------------------------------------------------
+    def summary(self, by="node"):
+        """
+        Totals grouped by one field or a tuple of fields (see FIELDS), most
+        expensive first. Grouping by "node" or "path" also adds how often the
+        node ran and its wall time (inclusive of nested nodes).
+        """
+        keys = (by,) if isinstance(by, str) else tuple(by)
+        key_of = lambda r: r[0] if len(keys) == 1 else tuple(r)
+        groups = {}
+        for rec in self.records:
+            g = groups.setdefault(key_of([getattr(rec, k) for k in keys]), _empty())
+            g["calls"] += 1
+            g["prompt_tokens"] += rec.prompt_tokens
+            g["completion_tokens"] += rec.completion_tokens
+            g["total_tokens"] += rec.prompt_tokens + rec.completion_tokens
+            g["cost"] += rec.cost
+            g["llm_seconds"] += rec.latency or 0.0
+        if keys in (("node",), ("path",)):
+            for run, path, node, seconds in self.node_runs:
+                g = groups.setdefault(node if keys == ("node",) else path, _empty())
+                g["runs"] = g.get("runs", 0) + 1
+                g["node_seconds"] = g.get("node_seconds", 0.0) + seconds
+        return dict(sorted(groups.items(), key=lambda kv: -kv[1]["cost"]))
+
+    def totals(self):
+        t = _empty()
+        for g in self.summary(by="run").values():
+            for k in t:
+                t[k] += g[k]
+        return t
+
+    def format_table(self, by="node"):
+        rows = self.summary(by)
+        total_cost = sum(g["cost"] for g in rows.values()) or 1.0
+        width = max([len(str(k)) for k in rows] + [len(str(by))])
+        lines = [f"{str(by):<{width}}  {'calls':>5}  {'prompt':>8}  {'compl.':>7}  {'cost $':>9}  {'share':>5}  {'llm s':>6}  {'node s':>6}"]
+        for key, g in rows.items():
+            node_s = f"{g['node_seconds']:.2f}" if "node_seconds" in g else "-"
+            lines.append(f"{str(key):<{width}}  {g['calls']:>5}  {g['prompt_tokens']:>8,}  {g['completion_tokens']:>7,}  "
+                         f"{g['cost']:>9.5f}  {g['cost'] / total_cost:>5.0%}  {g['llm_seconds']:>6.2f}  {node_s:>6}")
+        return "\n".join(lines)
+
+    # ---- export ------------------------------------------------------------
+    def to_jsonl(self, path):
+        with open(path, "w") as f:
+            for rec in self.records:
+                f.write(json.dumps(rec.as_dict()) + "\n")
+
+    def to_csv(self, path):
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(rec.as_dict() for rec in self.records)
+
+def _empty():
+    return {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0, "cost": 0.0, "llm_seconds": 0.0}
@@ -0,0 +1,26 @@
+import asyncio
+import random
+import time
+from types import SimpleNamespace
+
+from usage import record_openai_usage
+
+async def _fake_completion(model, prompt, words):
+    """Simulated chat completion shaped like an OpenAI response, usage included."""
+    await asyncio.sleep(0.005 + words * 0.0002 * (3 if model == "gpt-4o" else 1))
+    text = " ".join(random.choice(("flow", "node", "agent", "batch", "token")) for _ in range(words))
+    usage = SimpleNamespace(prompt_tokens=int(len(prompt.split()) * 1.3) + 12, completion_tokens=int(words * 1.3))
+    return SimpleNamespace(model=model, usage=usage, choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+
+async def call_llm(prompt, model="gpt-4o-mini", words=80):
+    """
+    The usual cookbook call_llm, except that response.usage is reported
+    instead of thrown away. With the real client:
+
+        r = await client.chat.completions.create(model=model, messages=[...])
+        record_openai_usage(r, latency)
+    """
+    start = time.perf_counter()
+    r = await _fake_completion(model, prompt, words)
+    record_openai_usage(r, time.perf_counter() - start)
+    return r.choices[0].message.content
@@ -0,0 +1,21 @@
+from pocketflow import Flow
+from nodes import DecideAction, SearchWeb, AnswerQuestion, Supervisor, Deliver
+
+class AgentFlow(Flow):
+    """The research loop, used as a node of the supervised flow."""
+
+class SupervisedFlow(Flow):
+    """Runs the agent and lets the supervisor send it back."""
+
+def create_flow():
+    decide, search, answer = DecideAction(), SearchWeb(max_retries=3), AnswerQuestion()
+    decide - "search" >> search
+    decide - "answer" >> answer
+    search - "decide" >> decide
+    agent = AgentFlow(start=decide)
+
+    supervisor = Supervisor()
+    agent >> supervisor
+    supervisor - "retry" >> agent
+    supervisor - "approve" >> Deliver()
+    return SupervisedFlow(start=agent)
@@ -0,0 +1,22 @@
+import os
+import random
+
+from flow import create_flow
+from viz import FlowTracer, to_mermaid, to_dot, to_html
+
+def main():
+    random.seed(3)
+    flow = create_flow()
+    with FlowTracer(flow) as tracer:
+        for i in range(20):
+            flow.run({"question": f"question {i}"})
+
+    os.makedirs("output", exist_ok=True)
+    for name, text in [("flow.mmd", to_mermaid(tracer)), ("flow.dot", to_dot(tracer)), ("flow.html", to_html(tracer))]:
+        with open(os.path.join("output", name), "w", encoding="utf-8") as f:
+            f.write(text)
+    print(to_mermaid(tracer))
+    print("\nWrote output/flow.mmd, output/flow.dot and output/flow.html")
+
+if __name__ == "__main__":
+    main()
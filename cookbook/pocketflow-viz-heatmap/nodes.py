@@ -0,0 +1,42 @@
+import random
+from pocketflow import Node
+from utils import call_llm, search_web
+
+class DecideAction(Node):
+    def prep(self, shared):
+        return shared["question"], shared.get("context", "")
+
+    def exec(self, inputs):
+        return call_llm(f"{inputs[0]}\n{inputs[1]}")
+
+    def post(self, shared, prep_res, exec_res):
+        return exec_res
+
+class SearchWeb(Node):
+    def prep(self, shared):
+        return shared["question"]
+
+    def exec(self, query):
+        return search_web(query)
+
+    def post(self, shared, prep_res, exec_res):
+        shared["context"] = shared.get("context", "") + exec_res
+        return "decide"
+
+class AnswerQuestion(Node):
+    def exec(self, _):
+        return call_llm("answer") and "42"
+
+    def post(self, shared, prep_res, exec_res):
+        shared["answer"] = exec_res
+
+class Supervisor(Node):
+    def exec(self, _):
+        return "approve" if random.random() < 0.7 else "retry"
+
+    def post(self, shared, prep_res, exec_res):
+        return exec_res
+
+class Deliver(Node):
+    def post(self, shared, prep_res, exec_res):
+        shared["delivered"] = shared["answer"]
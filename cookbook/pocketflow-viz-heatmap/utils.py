@@ -0,0 +1,14 @@
+import random
+import time
+
+def call_llm(prompt):
+    """Simulated LLM: slow, and decides to search about 60% of the time."""
+    time.sleep(random.uniform(0.02, 0.05))
+    return random.choice(["search", "search", "search", "answer", "answer"])
+
+def search_web(query):
+    """Simulated search API that fails 30% of the time."""
+    time.sleep(random.uniform(0.005, 0.01))
+    if random.random() < 0.3:
+        raise ConnectionError("search API timed out")
+    return f"results for {query}"
@@ -0,0 +1,261 @@
+import html
+import statistics
+import threading
+import time
+
+from pocketflow import AsyncNode, Flow
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    s = sorted(values)
+    return s[min(len(s) - 1, int(q * len(s)))]
+
+class NodeStats:
+    """Runtime data for one node of the graph."""
+
+    def __init__(self):
+        self.visits, self.errors = 0, 0          # _run calls, and those that raised
+        self.attempts, self.failed_attempts = 0, 0  # exec calls, and those that raised
+        self.times = []
+
+    @property
+    def mean(self): return statistics.fmean(self.times) if self.times else 0.0
+    @property
+    def p99(self): return percentile(self.times, 0.99)
+    @property
+    def retry_rate(self): return self.failed_attempts / self.attempts if self.attempts else 0.0
+    @property
+    def error_rate(self): return self.errors / self.visits if self.visits else 0.0
+
+class FlowTracer:
+    """
+    Records visits, latency, retries, errors and edge traversals for every
+    node reachable from `flow`, including nodes inside nested flows.
+
+    Use it as a context manager around one or more runs. It patches the node
+    classes (not instances, since flows copy.copy each node they run) and
+    recognises copies by their successors dict, which a shallow copy shares
+    with the original node.
+    """
+
+    def __init__(self, flow):
+        self.flow = flow
+        self.nodes, self.ids, self.parent = [], {}, {}
+        self._walk(flow, None)
+        self.stats = {nid: NodeStats() for nid in self.ids.values()}
+        self.edges = {}   # (src id, action, dst id) -> count
+        self._lock = threading.Lock()
+        self._saved = []
+
+    def _walk(self, node, parent):
+        if node is None or id(node.successors) in self.ids:
+            return
+        self.ids[id(node.successors)] = f"N{len(self.nodes) + 1}"
+        self.nodes.append(node)
+        self.parent[self.ids[id(node.successors)]] = parent
+        if isinstance(node, Flow):
+            self._walk(node.start_node, self.ids[id(node.successors)])
+        for nxt in node.successors.values():
+            self._walk(nxt, parent)
+
+    def node_id(self, node):
+        return self.ids.get(id(node.successors)) if node is not None else None
+
+    def label(self, nid):
+        return type(self.nodes[int(nid[1:]) - 1]).__name__
+
+    # ---- patching -------------------------------------------------------
+    def __enter__(self):
+        patches = []
+        for cls in {type(n) for n in self.nodes}:
+            is_async = issubclass(cls, AsyncNode)
+            run_name = "_run_async" if is_async else "_run"
+            patches.append((cls, run_name, self._wrap_run(getattr(cls, run_name), is_async)))
+            if issubclass(cls, Flow):
+                patches.append((cls, "get_next_node", self._wrap_next(getattr(cls, "get_next_node"))))
+            else:
+                exec_name = "exec_async" if is_async else "exec"
+                patches.append((cls, exec_name, self._wrap_exec(getattr(cls, exec_name), is_async)))
+        for cls, name, wrapper in patches:
+            self._saved.append((cls, name, cls.__dict__.get(name)))
+            setattr(cls, name, wrapper)
+        return self
+
+    def __exit__(self, *exc):
+        for cls, name, own in reversed(self._saved):
+            if own is None: delattr(cls, name)
+            else: setattr(cls, name, own)
+        self._saved.clear()
+
+    def _stats_for(self, node):
+        nid = self.node_id(node)
+        return self.stats.get(nid) if nid else None
+
+    def _wrap_run(self, orig, is_async):
+        tracer = self
+        def finish(node, start, failed):
+            s = tracer._stats_for(node)
+            if s is not None:
+                with tracer._lock:
+                    s.visits += 1
+                    s.errors += failed
+                    s.times.append(time.perf_counter() - start)
+        if is_async:
+            async def run_async(self, shared):
+                start, failed = time.perf_counter(), True
+                try:
+                    result = await orig(self, shared); failed = False
+                    return result
+                finally: finish(self, start, failed)
+            return run_async
+        def run(self, shared):
+            start, failed = time.perf_counter(), True
+            try:
+                result = orig(self, shared); failed = False
+                return result
+            finally: finish(self, start, failed)
+        return run
+
+    def _wrap_exec(self, orig, is_async):
+        tracer = self
+        def count(node, failed):
+            s = tracer._stats_for(node)
+            if s is not None:
+                with tracer._lock:
+                    s.attempts += 1
+                    s.failed_attempts += failed
+        if is_async:
+            async def exec_async(self, prep_res):
+                try: result = await orig(self, prep_res)
+                except Exception: count(self, True); raise
+                count(self, False)
+                return result
+            return exec_async
+        def exec(self, prep_res):
+            try: result = orig(self, prep_res)
+            except Exception: count(self, True); raise
+            count(self, False)
+            return result
+        return exec
+
+    def _wrap_next(self, orig):
+        tracer = self
+        def get_next_node(self, curr, action):
+            nxt = orig(self, curr, action)
+            key = (tracer.node_id(curr), action or "default", tracer.node_id(nxt))
+            with tracer._lock:
+                tracer.edges[key] = tracer.edges.get(key, 0) + 1
+            return nxt
+        return get_next_node
+
+    # ---- graph data for the renderers ------------------------------------
+    def static_edges(self):
+        """Every declared edge with its traversal count (0 if never taken)."""
+        out = []
+        for node in self.nodes:
+            src = self.node_id(node)
+            for action, nxt in node.successors.items():
+                out.append((src, action, self.node_id(nxt), self.edges.get((src, action, self.node_id(nxt)), 0)))
+        return out
+
+    def children(self, parent):
+        return [self.node_id(n) for n in self.nodes if self.parent[self.node_id(n)] == parent]
+
+def _heat(value, hottest):
+    """Light yellow for cold nodes through to red for the hottest one."""
+    if hottest <= 0:
+        return "#ffffcc"
+    t = min(1.0, value / hottest)
+    cold, hot = (0xff, 0xff, 0xcc), (0xe3, 0x1a, 0x1c)
+    return "#" + "".join(f"{round(c + (h - c) * t):02x}" for c, h in zip(cold, hot))
+
+def _leaf_means(tracer):
+    """Heat is relative to the slowest non-flow node, so nested flows don't wash out the scale."""
+    return max((tracer.stats[tracer.node_id(n)].mean for n in tracer.nodes if not isinstance(n, Flow)), default=0.0)
+
+def _summary(s):
+    if not s.visits:
+        return "not visited"
+    parts = [f"n={s.visits}", f"mean {s.mean * 1000:.1f}ms", f"p99 {s.p99 * 1000:.1f}ms"]
+    if s.failed_attempts: parts.append(f"retry {s.retry_rate:.0%}")
+    if s.errors: parts.append(f"err {s.error_rate:.0%}")
+    return ", ".join(parts)
+
+def to_mermaid(tracer):
+    hottest = _leaf_means(tracer)
+    lines, styles = ["flowchart LR"], []
+
+    def emit(parent, indent):
+        for nid in tracer.children(parent):
+            s, name = tracer.stats[nid], tracer.label(nid)
+            if isinstance(tracer.nodes[int(nid[1:]) - 1], Flow):
+                lines.append(f'{indent}subgraph {nid}["{name}<br/>{_summary(s)}"]')
+                emit(nid, indent + "    ")
+                lines.append(f"{indent}end")
+            else:
+                lines.append(f'{indent}{nid}["{name}<br/>{_summary(s)}"]')
+                styles.append(f"    style {nid} fill:{_heat(s.mean, hottest) if s.visits else '#eeeeee'}")
+    emit(None, "    ")
+
+    for i, (src, action, dst, count) in enumerate(tracer.static_edges()):
+        label = f"{action} ×{count}" if action != "default" else f"×{count}"
+        lines.append(f'    {src} -->|"{label}"| {dst}')
+        if count == 0:
+            styles.append(f"    linkStyle {i} stroke:#bbbbbb,stroke-dasharray:4")
+    return "\n".join(lines + styles)
+
+def to_dot(tracer):
+    hottest = _leaf_means(tracer)
+    max_count = max((c for *_, c in tracer.static_edges()), default=0) or 1
+    lines = ["digraph flow {", "    rankdir=LR;", '    node [shape=box, style="rounded,filled", fontname="Helvetica"];']
+
+    def emit(parent, indent):
+        for nid in tracer.children(parent):
+            s, name = tracer.stats[nid], tracer.label(nid)
+            text = f"{name}\\n{_summary(s)}"
+            if isinstance(tracer.nodes[int(nid[1:]) - 1], Flow):
+                lines.append(f"{indent}subgraph cluster_{nid} {{")
+                lines.append(f'{indent}    label="{text}"; style=dashed;')
+                lines.append(f'{indent}    {nid} [label="", shape=point, style=invis];')
+                emit(nid, indent + "    ")
+                lines.append(f"{indent}}}")
+            else:
+                fill = _heat(s.mean, hottest) if s.visits else "#eeeeee"
+                lines.append(f'{indent}{nid} [label="{text}", fillcolor="{fill}"];')
+    emit(None, "    ")
+
+    for src, action, dst, count in tracer.static_edges():
+        attrs = [f'label="{action} ×{count}"', f"penwidth={1 + 4 * count / max_count:.1f}"]
+        if count == 0: attrs.append('style=dashed, color="#bbbbbb"')
+        lines.append(f"    {src} -> {dst} [{', '.join(attrs)}];")
+    lines.append("}")
+    return "\n".join(lines)
+
+def to_html(tracer, title="PocketFlow runtime heatmap"):
+    rows = []
+    for node in tracer.nodes:
+        nid = tracer.node_id(node)
+        s = tracer.stats[nid]
+        rows.append(
+            f"<tr><td>{nid}</td><td>{html.escape(tracer.label(nid))}</td><td>{s.visits}</td>"
+            f"<td>{s.mean * 1000:.1f}</td><td>{s.p99 * 1000:.1f}</td>"
+            f"<td>{s.retry_rate:.0%}</td><td>{s.error_rate:.0%}</td></tr>")
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{html.escape(title)}</title>
+<script type="module">
+import mermaid from "https://cdn.jsdelivr.net/npm/mermaid@10/dist/mermaid.esm.min.mjs";
+mermaid.initialize({{ startOnLoad: true }});
+</script>
+<style>body{{font-family:sans-serif;margin:2em}} table{{border-collapse:collapse}}
+td,th{{border:1px solid #ccc;padding:4px 8px;text-align:right}} td:nth-child(2){{text-align:left}}</style>
+</head><body>
+<h1>{html.escape(title)}</h1>
+<pre class="mermaid">
+{html.escape(to_mermaid(tracer))}
+</pre>
+<table><tr><th>id</th><th>node</th><th>visits</th><th>mean ms</th><th>p99 ms</th><th>retry rate</th><th>error rate</th></tr>
+{"".join(rows)}
+</table>
+</body></html>
+"""